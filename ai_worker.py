@@ -0,0 +1,59 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+import threading
+
+def schedule_on_ui_thread(callback) -> None:
+    # kivy only lets the main thread touch widgets, so hop back through the clock
+    from kivy.clock import Clock
+    Clock.schedule_once(lambda dt: callback(), 0)
+
+class AIWorkerPool():
+    """ Runs slow AI calls off the UI thread.
+
+    Jobs go onto a thread pool with a fixed concurrency limit and return futures. Results
+    (or errors) are handed back through `dispatch`, which defaults to the kivy clock so
+    callbacks always run on the UI thread.
+    """
+
+    def __init__(self, max_workers:int=2, dispatch=schedule_on_ui_thread):
+        self.max_workers = max_workers
+        self.dispatch = dispatch
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ai-worker")
+
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        # jobs submitted but not finished yet (queued + running)
+        with self._lock:
+            return self._pending
+
+    def submit(self, fn, *args, on_result=None, on_error=None, **kwargs) -> Future:
+        with self._lock:
+            self._pending += 1
+
+        future = self.executor.submit(fn, *args, **kwargs)
+        future.add_done_callback(lambda done: self._finished(done, on_result, on_error))
+
+        return future
+
+    def _finished(self, future:Future, on_result, on_error) -> None:
+        # runs on the worker thread
+        with self._lock:
+            self._pending -= 1
+
+        if future.cancelled():
+            return
+
+        error = future.exception()
+        if error is not None:
+            if on_error:
+                self.dispatch(lambda: on_error(error))
+            else:
+                print(f"AI job failed: {error}")
+        elif on_result:
+            result = future.result()
+            self.dispatch(lambda: on_result(result))
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,37 @@
+class PlantAnalyser():
+    """ The identify / health check pipeline, shared by the app and the headless server.
+
+    Identification asks the on-device classifier first, then the analysis cache (which only
+    calls the API for photos it hasn't answered before). Both methods raise when the API
+    can't be reached and there's no answer to fall back on, callers decide what that means.
+    No kivy in here, the service runs without a window.
+    """
+
+    def __init__(self, ai_service, cache, classifier=None):
+        self.ai_service = ai_service
+        self.cache = cache
+        self.classifier = classifier
+
+    def identify(self, frame) -> str | None:
+        local = None
+        if self.classifier is not None:
+            try:
+                local = self.classifier.classify(frame)
+            except Exception as e:
+                print(f"Local classifier failed: {e}")
+
+            answered, plant_name = self.classifier.decide(local)
+            if answered:
+                return plant_name
+
+        try:
+            return self.cache.get_or_compute(frame, "identify", self.ai_service.identify_plant, frame)
+        except Exception:
+            # offline -> the local guess is better than nothing
+            plant_name = self.classifier.offline_answer(local) if self.classifier is not None else None
+            if plant_name is None:
+                raise
+            return plant_name
+
+    def check_health(self, frame) -> str | None:
+        return self.cache.get_or_compute(frame, "health", self.ai_service.check_health, frame)
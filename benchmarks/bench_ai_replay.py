@@ -0,0 +1,112 @@
+# replays a burst of camera captures through the AI path (capture -> encode -> analyse -> parse) against the fake vision API
+# run from the repo root: python benchmarks/bench_ai_replay.py [captures] [workers] [http|inprocess] [images dir]
+# no real API calls, and the same seed gives the same answers, failures and retries every run
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+CAPTURES = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+WORKERS = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+TRANSPORT = sys.argv[3] if len(sys.argv) > 3 else "http"
+IMAGES_DIR = sys.argv[4] if len(sys.argv) > 4 else None
+LATENCY = 0.3
+CLIENT_TIMEOUT = 1.0
+
+def camera_frames(images_dir:str=None):
+    # capture(i) -> a camera sized BGR frame, photos from `images_dir` in turn or seeded synthetic ones
+    import cv2
+    import numpy as np
+
+    if images_dir:
+        paths = sorted(os.path.join(images_dir, name) for name in os.listdir(images_dir) if name.lower().endswith((".png", ".jpg", ".jpeg")))
+        photos = [cv2.imread(path) for path in paths]
+        return lambda i: photos[i % len(photos)]
+
+    def synthetic(i:int):
+        small = np.random.default_rng(i).integers(0, 255, (60, 80, 3), dtype=np.uint8)
+        return cv2.resize(small, (640, 480), interpolation=cv2.INTER_LINEAR)
+    return synthetic
+
+def replay(analyser, capture, count:int, workers:int) -> dict:
+    # the whole burst is queued at once, like a batch of photos arriving together
+    from ai_worker import AIWorkerPool
+    from frame_pipeline import CenterCrop, FramePipeline, Resize
+
+    pool = AIWorkerPool(max_workers=workers, dispatch=lambda callback: callback())
+    local = threading.local()
+
+    def job(i:int, submitted:float):
+        started = time.perf_counter()
+        # what BestBuds.capture_picture does, one pipeline per worker since pipelines reuse their buffers
+        if not hasattr(local, "pipeline"):
+            local.pipeline = FramePipeline(CenterCrop(), Resize(512))
+        image = local.pipeline.process(capture(i), copy=True)
+        try:
+            answer = analyser.identify(image)
+        except Exception as e:
+            answer = f"error: {type(e).__name__}"
+        return i, submitted, started, time.perf_counter(), answer
+
+    start = time.perf_counter()
+    futures = [pool.submit(job, i, time.perf_counter()) for i in range(count)]
+    results = sorted(future.result() for future in futures)
+    elapsed = time.perf_counter() - start
+    pool.shutdown()
+
+    return {
+        "elapsed": elapsed,
+        "latency": sorted(done - submitted for _, submitted, _, done, _ in results),
+        "queued": sorted(started - submitted for _, submitted, started, _, _ in results),
+        "answers": [answer for *_, answer in results],
+    }
+
+if __name__ == "__main__":
+    workdir = tempfile.mkdtemp(prefix="bestbuds-bench-")
+    os.chdir(workdir)      # database.py uses a relative sqlite path (the analysis cache lives there)
+    sys.path.insert(0, ROOT)
+
+    from analysis import PlantAnalyser
+    from database import AnalysisResult, session_scope
+    from fake_vision_server import FakeVision, FaultProfile, ReplayBackend, start_fake_vision_server
+    from metrics import metrics, percentile
+    from plant_ai import PlantAIService
+    from result_cache import AnalysisCache
+
+    scenarios = (
+        ("clean", FaultProfile(latency=LATENCY, jitter=0.1)),
+        ("10% 429", FaultProfile(latency=LATENCY, jitter=0.1, rate_429=0.10, retry_after=0.2)),
+        ("5% 5xx", FaultProfile(latency=LATENCY, jitter=0.1, rate_500=0.05)),
+        ("3% timeouts", FaultProfile(latency=LATENCY, jitter=0.1, rate_timeout=0.03, hang=CLIENT_TIMEOUT + 0.5)),
+        ("mixed 10/5/3%", FaultProfile(latency=LATENCY, jitter=0.1, rate_429=0.10, rate_500=0.05, rate_timeout=0.03, retry_after=0.2, hang=CLIENT_TIMEOUT + 0.5)),
+    )
+    capture = camera_frames(IMAGES_DIR)
+
+    print(f"{CAPTURES} captures, {WORKERS} workers, {TRANSPORT}, fake latency {LATENCY * 1000:.0f} ms, client timeout {CLIENT_TIMEOUT:.1f}s\n")
+    print(f"{'scenario':<16}{'per s':>7}{'p50 ms':>8}{'p99 ms':>8}{'queue p50':>10}{'queue p99':>10}{'attempts':>10}{'retries':>9}{'failed':>8}  answers")
+    for name, profile in scenarios:
+        with session_scope(write=True) as session:
+            session.query(AnalysisResult).delete()      # every scenario starts from an empty analysis cache
+        metrics.reset()
+
+        vision = FakeVision(profile=profile)
+        if TRANSPORT == "inprocess":
+            server, service = None, PlantAIService(backend=ReplayBackend(vision, timeout=CLIENT_TIMEOUT), backoff_base=0.1)
+        else:
+            server, base_url = start_fake_vision_server(vision)
+            service = PlantAIService(api_key="fake", base_url=base_url, timeout=CLIENT_TIMEOUT, max_connections=WORKERS, backoff_base=0.1)
+
+        result = replay(PlantAnalyser(service, AnalysisCache(lazy=True)), capture, CAPTURES, WORKERS)
+        service.close()
+        if server is not None:
+            server.shutdown()
+
+        latency, queued, answers = result["latency"], result["queued"], result["answers"]
+        failed = sum(answer is not None and answer.startswith("error") for answer in answers)
+        digest = hashlib.blake2b(repr(answers).encode(), digest_size=4).hexdigest()     # same digest -> same answers as the last run
+        print(f"{name:<16}{CAPTURES / result['elapsed']:>7.1f}{percentile(latency, 50) * 1000:>8.0f}{percentile(latency, 99) * 1000:>8.0f}"
+              f"{percentile(queued, 50) * 1000:>10.0f}{percentile(queued, 99) * 1000:>10.0f}{sum(vision.stats.values()):>10}"
+              f"{metrics.counters.get('ai.retries', 0):>9}{failed:>8}  {digest}")
@@ -0,0 +1,62 @@
+# per-frame cpu time and allocations of the camera preview path, old vs reused buffers
+# run from the repo root: python benchmarks/bench_camera_preview.py [frames]
+# texture upload itself needs a GL context so it isn't timed here, the old path also paid a
+# Texture.create per frame on top of these numbers
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+FRAMES = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+CAMERA_SIZE = (720, 1280)      # height, width of a typical webcam frame
+WIDGET_SIZE = 320
+
+def square_crop(frame):
+    height, width, _ = frame.shape
+    min_dim = min(height, width)
+    x_start = (width - min_dim) // 2
+    y_start = (height - min_dim) // 2
+    return frame[y_start:y_start + min_dim, x_start:x_start + min_dim]
+
+def old_preview(frame, state):
+    # resize -> flip -> tobytes, three full-frame copies
+    frame_resized = cv2.resize(square_crop(frame), (WIDGET_SIZE, WIDGET_SIZE), interpolation=cv2.INTER_AREA)
+    return cv2.flip(frame_resized, 0).tobytes()
+
+def new_preview(frame, state):
+    # resize into a reused buffer, flip is done by the texture's uv coords
+    if state.get("buffer") is None:
+        state["buffer"] = np.empty((WIDGET_SIZE, WIDGET_SIZE, 3), dtype=np.uint8)
+    cv2.resize(square_crop(frame), (WIDGET_SIZE, WIDGET_SIZE), dst=state["buffer"], interpolation=cv2.INTER_AREA)
+    return state["buffer"].reshape(-1)
+
+def run(preview, frames):
+    state = {}
+    preview(frames[0], state)   # warm up, lets the new path allocate its buffer once
+
+    tracemalloc.start()
+    allocated = 0
+
+    start = time.perf_counter()
+    for frame in frames:
+        snapshot_before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        preview(frame, state)
+        _, peak = tracemalloc.get_traced_memory()
+        allocated += peak - snapshot_before
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.stop()
+    return elapsed / len(frames), allocated / len(frames)
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 255, (*CAMERA_SIZE, 3), dtype=np.uint8) for _ in range(8)]
+    frames = [frames[i % len(frames)] for i in range(FRAMES)]
+
+    print(f"{FRAMES} frames {CAMERA_SIZE[1]}x{CAMERA_SIZE[0]} -> {WIDGET_SIZE}x{WIDGET_SIZE}")
+    for name, preview in (("old (resize+flip+tobytes)", old_preview), ("new (reused buffer, uv flip)", new_preview)):
+        per_frame, allocated = run(preview, frames)
+        print(f"{name:<30} {per_frame * 1000:7.3f} ms/frame  {allocated / 1024:9.1f} KiB allocated/frame")
@@ -0,0 +1,56 @@
+# compares the per-day python loop against the vectorised CareCalendar
+# run from the repo root: python benchmarks/bench_care_calendar.py [plants] [days]
+import os
+import sys
+import time
+import random
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from care_calendar import CareCalendar
+
+PLANTS = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+DAYS = int(sys.argv[2]) if len(sys.argv) > 2 else 365
+LOOP_SAMPLE = 2_000     # the python loop is far too slow for the full set, so time a sample and scale up
+
+def make_plants(count):
+    random.seed(1)
+    birth_dates = [date(2020, 1, 1) + timedelta(days=random.randrange(2000)) for _ in range(count)]
+    water = [random.choice([1, 2, 3, 4, 5, 7, 10, 14, 30]) for _ in range(count)]
+    fertiliser = [random.choice([None, 7, 14, 30, 60]) for _ in range(count)]
+    return list(range(1, count + 1)), birth_dates, water, fertiliser
+
+def loop_schedule(birth_dates, water, start, days):
+    # what update_plant_list does, once per day
+    due = 0
+    for i in range(days):
+        selected_date = start + timedelta(days=i)
+        for birth_date, frequency in zip(birth_dates, water):
+            delta_days = (selected_date - birth_date).days
+            if delta_days >= 0 and delta_days % frequency == 0:
+                due += 1
+    return due
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+if __name__ == "__main__":
+    plant_ids, birth_dates, water, fertiliser = make_plants(PLANTS)
+    start = date(2024, 1, 1)
+    end = start + timedelta(days=DAYS - 1)
+
+    calendar, load_time = timed(CareCalendar, plant_ids, birth_dates, water, fertiliser)
+    matrix, matrix_time = timed(calendar.due_matrix, start, end, "water")
+    (event_ids, _), events_time = timed(calendar.due_events, start, end, "water")
+    _, loop_time = timed(loop_schedule, birth_dates[:LOOP_SAMPLE], water[:LOOP_SAMPLE], start, DAYS)
+
+    assert matrix.sum() == len(event_ids)
+
+    print(f"{PLANTS} plants x {DAYS} days, {len(event_ids)} watering events")
+    print(f"load arrays:      {load_time * 1000:8.1f} ms")
+    print(f"dense due-matrix: {matrix_time * 1000:8.1f} ms")
+    print(f"sparse events:    {events_time * 1000:8.1f} ms")
+    print(f"python loop:      {loop_time * PLANTS / LOOP_SAMPLE * 1000:8.1f} ms (scaled from {LOOP_SAMPLE} plants)")
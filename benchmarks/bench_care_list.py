@@ -0,0 +1,73 @@
+# daily care list: querying the schedule every time the calendar asks vs the date keyed care list
+# run from the repo root: python benchmarks/bench_care_list.py [plants] [calls]
+# works in a temp directory with its own sqlite file, the real database is untouched
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+PLANTS = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+CALLS = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+
+def plants(count:int):
+    rng = random.Random(0)
+    for i in range(count):
+        yield {"name": f"Plant {i}", "species": "Fern", "birth_date": date(2023, 1, 1) + timedelta(days=rng.randrange(600)),
+               "water_frequency": rng.choice([1, 2, 3, 7, 14]), "fertiliser_needed": i % 3 == 0, "fertiliser_frequency": rng.choice([14, 30])}
+
+def per_call_ms(function, calls:int) -> float:
+    start = time.perf_counter()
+    for i in range(calls):
+        function(i)
+    return (time.perf_counter() - start) * 1000 / calls
+
+if __name__ == "__main__":
+    workdir = tempfile.mkdtemp(prefix="bestbuds-bench-")
+    os.chdir(workdir)      # database.py uses a relative sqlite path
+    sys.path.insert(0, ROOT)
+
+    from care_list import CareList
+    from change_events import changes
+    from database import DB
+
+    db = DB()
+    db.add_plants(plants(PLANTS))
+    today = date.today()
+    week = [today + timedelta(days=i) for i in range(7)]
+
+    care_list = CareList(db)
+    changes.subscribe("plant", care_list.on_plant_changed)
+
+    query_calls = max(CALLS // 100, 5)
+    query_ms = per_call_ms(lambda i: (db.get_plants_to_water(week[i % 7]), db.get_plants_to_fertilise(week[i % 7])), query_calls)
+    cold_ms = per_call_ms(lambda i: care_list.get(week[i]), 7)
+    cached_ms = per_call_ms(lambda i: care_list.get(week[i % 7]), CALLS)
+
+    plant = db.new_plant_record(name="New", species="Rose", birth_date=today, height=10.0, water_frequency=1, fertiliser_needed=False)
+    start = time.perf_counter()
+    db.update_plant(plant.id, water_frequency=2)
+    change_ms = (time.perf_counter() - start) * 1000
+    assert sorted(p.id for p in db.get_plants_to_water(today)) == care_list.get(today).ids["water"]
+
+    print(f"{PLANTS} plants, {len(care_list.get(today).water)} due today\n")
+    print(f"{'':<34}{'ms per call':>12}")
+    print(f"{'schedule query (before)':<34}{query_ms:>12.3f}")
+    print(f"{'care list, first time per day':<34}{cold_ms:>12.3f}")
+    print(f"{'care list, cached day switch':<34}{cached_ms:>12.4f}")
+    print(f"{'one plant edited (commit + patch)':<34}{change_ms:>12.3f}")
+
+    # a long session walking through months of dates, the cache stays at max_days
+    tracemalloc.start()
+    for i in range(40):
+        care_list.roll_over(today + timedelta(days=i))
+    settled = tracemalloc.get_traced_memory()[0]
+    for i in range(40, 120):
+        care_list.roll_over(today + timedelta(days=i))
+    grown = tracemalloc.get_traced_memory()[0] - settled
+    tracemalloc.stop()
+
+    print(f"\n120 day rollovers: {len(care_list)} days cached, memory after day 40 {grown / 1024:+.0f} KiB")
@@ -0,0 +1,71 @@
+# saving one plant into a big collection: applying the change event vs rebuilding the carousel and calendar
+# run from the repo root: python benchmarks/bench_change_events.py [plants...]
+# works in a temp directory with its own sqlite file, the real database is untouched
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+SIZES = [int(size) for size in sys.argv[1:]] or [100, 1_000, 10_000]
+EVENTS = 5      # events timed per size, the median is reported
+
+def plants(count:int, start:int=0):
+    return ({"name": f"Plant {i}", "species": "Fern", "birth_date": date(2024, 1, 1), "water_frequency": 1 + i % 7, "fertiliser_needed": False} for i in range(start, start + count))
+
+def ms(function) -> float:
+    start = time.perf_counter()
+    function()
+    Clock.tick()        # the frame that lays out whatever changed
+    return (time.perf_counter() - start) * 1000
+
+def load_everything(viewer, calendar) -> None:
+    while not viewer.all_loaded:
+        viewer.load_next_page()
+    calendar.update_plant_list(date.today().strftime("%Y-%m-%d"))
+
+def rebuild(viewer, calendar) -> None:
+    # what a refresh without change events costs: every card and every list row again
+    del viewer.data[:-1]
+    viewer.plant_ids.clear()
+    viewer.last_plant_id = 0
+    viewer.all_loaded = False
+    load_everything(viewer, calendar)
+
+if __name__ == "__main__":
+    workdir = tempfile.mkdtemp(prefix="bestbuds-bench-")
+    os.chdir(workdir)      # database.py uses a relative sqlite path
+    sys.path.insert(0, ROOT)
+    os.environ["KIVY_NO_ARGS"] = "1"
+    from kivy.config import Config
+    Config.set("graphics", "maxfps", "0")       # Clock.tick would otherwise sleep out the rest of a 60 fps frame
+
+    from kivy.resources import resource_add_path
+    resource_add_path(ROOT)         # fonts are registered by relative path
+    from kivy.clock import Clock
+
+    import main
+
+    main.BestBuds()      # kivymd widgets need an app object, it isn't run
+    db = main.db
+    viewer = main.PlantViewer()
+    calendar = main.CalendarScreen()
+    total = 0
+
+    print(f"{'plants':>8}{'event ms':>12}{'rebuild ms':>12}")
+    for size in SIZES:
+        db.add_plants(plants(size - total, total))
+        Clock.tick()        # deliver the bulk insert event before paging everything in
+        total = size
+        load_everything(viewer, calendar)
+        Clock.tick()        # lay the pages out now, or the first event pays for all of them
+
+        new_plant = {"name": "New", "species": "Rose", "birth_date": date.today(), "height": 10.0, "water_frequency": 1, "fertiliser_needed": False}
+        events = sorted(ms(lambda: (db.new_plant_record(**new_plant), Clock.tick())) for _ in range(EVENTS))     # commit -> event -> diff applied
+        event_ms = events[EVENTS // 2]
+        rebuild_ms = ms(lambda: (db.new_plant_record(**new_plant), rebuild(viewer, calendar)))
+        total += EVENTS + 1
+
+        assert viewer.plant_ids == sorted(viewer.plant_ids) and len(viewer.plant_ids) == total
+        print(f"{size:>8}{event_ms:>12.1f}{rebuild_ms:>12.1f}")
@@ -0,0 +1,57 @@
+# per-stage cost of the frame pipeline, single frames vs batch mode
+# run from the repo root: python benchmarks/bench_frame_pipeline.py [frames] [batch]
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+import cv2
+import numpy as np
+
+from frame_pipeline import FramePipeline, CenterCrop, Resize, ColourConvert, Flip, Encode
+
+FRAMES = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+BATCH = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+
+def copy_paste_version(frame):
+    # what each call site used to do on its own
+    height, width, _ = frame.shape
+    min_dim = min(height, width)
+    x_start = (width - min_dim) // 2
+    y_start = (height - min_dim) // 2
+    cropped_frame = frame[y_start:y_start + min_dim, x_start:x_start + min_dim]
+    final_image = cv2.resize(cropped_frame, (512, 512), interpolation=cv2.INTER_AREA)
+    return cv2.flip(final_image, 0).tobytes()
+
+def report(title, pipeline, elapsed, frames):
+    print(f"\n{title}: {elapsed * 1000 / frames:.3f} ms/frame")
+    for name, ms in pipeline.stage_report().items():
+        print(f"  {name:<8}{ms:8.3f} ms")
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 255, (720, 1280, 3), dtype=np.uint8) for _ in range(BATCH)]
+
+    start = time.perf_counter()
+    for i in range(FRAMES):
+        copy_paste_version(frames[i % BATCH])
+    print(f"old copy-pasted crop/resize/flip/tobytes: {(time.perf_counter() - start) * 1000 / FRAMES:.3f} ms/frame")
+
+    pipeline = FramePipeline(CenterCrop(), Resize(512), ColourConvert(), Flip(0), profile=True)
+    start = time.perf_counter()
+    for i in range(FRAMES):
+        pipeline.process(frames[i % BATCH])
+    report("single frames (crop, resize, colour, flip)", pipeline, time.perf_counter() - start, FRAMES)
+
+    pipeline = FramePipeline(CenterCrop(), Resize(512), ColourConvert(), Flip(0), profile=True)
+    start = time.perf_counter()
+    for _ in range(FRAMES // BATCH):
+        pipeline.process_batch(frames)
+    report(f"batches of {BATCH}", pipeline, time.perf_counter() - start, (FRAMES // BATCH) * BATCH)
+
+    pipeline = FramePipeline(CenterCrop(), Resize(512), Encode(), profile=True)
+    start = time.perf_counter()
+    for i in range(FRAMES):
+        pipeline.process(frames[i % BATCH])
+    report("capture + jpeg encode", pipeline, time.perf_counter() - start, FRAMES)
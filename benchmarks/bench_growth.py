@@ -0,0 +1,67 @@
+# growth analytics over years of daily heights: reading the rollups vs reading every raw measurement
+# run from the repo root: python benchmarks/bench_growth.py [plants] [days]
+# works in a temp directory with its own sqlite file, the real database is untouched
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+PLANTS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000
+DAYS = int(sys.argv[2]) if len(sys.argv) > 2 else 3 * 365
+
+def measurements(plant_ids, start, rng):
+    # one noisy, slowly growing measurement per plant per day, day by day like a real sensor feed
+    import numpy as np
+    rates = rng.uniform(0.01, 0.3, len(plant_ids))
+    for day in range(DAYS):
+        heights = 5 + rates * day + rng.normal(0, 0.5, len(plant_ids))
+        recorded = start + timedelta(days=day)
+        yield from zip(plant_ids, [recorded] * len(plant_ids), heights.tolist())
+
+if __name__ == "__main__":
+    workdir = tempfile.mkdtemp(prefix="bestbuds-bench-")
+    os.chdir(workdir)      # database.py uses a relative sqlite path
+    sys.path.insert(0, ROOT)
+
+    import numpy as np
+    from sqlalchemy import select
+    from database import DB, Height, session_scope
+    from growth import GrowthSeries, rollup_measurements
+
+    db = DB()
+    start = date(2022, 1, 1)
+    plant_ids = db.add_plants({"name": f"Plant {i}", "species": "Fern", "birth_date": start, "water_frequency": 3, "fertiliser_needed": False} for i in range(PLANTS))
+
+    begin = time.perf_counter()
+    total = db.add_height_measurements(measurements(plant_ids, start, np.random.default_rng(0)), batch_size=20_000)
+    elapsed = time.perf_counter() - begin
+    print(f"ingest {total} measurements (+ rollups): {elapsed:.1f}s, {elapsed * 1e6 / total:.1f} us each\n")
+
+    print(f"{'query':<34}{'rows read':>12}{'ms':>10}")
+    for period in ("week", "month"):
+        begin = time.perf_counter()
+        series = GrowthSeries.from_db(db, period)
+        slopes = series.trends()
+        rates = series.growth_rates()
+        ms = (time.perf_counter() - begin) * 1000
+        print(f"{f'trends from {period} rollups':<34}{len(series.means):>12}{ms:>10.0f}")
+
+    # same weekly answer, built from the raw measurements every time
+    begin = time.perf_counter()
+    with session_scope() as session:
+        raw = session.execute(select(Height.plant_id, Height.date_recorded, Height.height_value)).all()
+    rows = rollup_measurements(raw, periods=("week",))
+    rows.sort(key=lambda row: (row["plant_id"], row["bucket_start"]))
+    raw_series = GrowthSeries(*zip(*[(r["plant_id"], r["bucket_start"], r["count"], r["min_height"], r["max_height"], r["sum_height"]) for r in rows]), period="week")
+    raw_slopes = raw_series.trends()
+    ms = (time.perf_counter() - begin) * 1000
+    print(f"{'trends from raw heights (week)':<34}{len(raw):>12}{ms:>10.0f}")
+
+    begin = time.perf_counter()
+    days, means = GrowthSeries.from_db(db, "month", plant_ids=[plant_ids[0]]).series(plant_ids[0])
+    print(f"{'one plant, monthly series':<34}{len(means):>12}{(time.perf_counter() - begin) * 1000:>10.1f}")
+
+    assert np.allclose(raw_slopes, GrowthSeries.from_db(db, "week").trends())
+    print(f"\n{PLANTS} plants x {DAYS} days in {workdir}")
@@ -0,0 +1,78 @@
+# batch health scan: one request at a time vs the worker pool under a requests/minute limit
+# run from the repo root: python benchmarks/bench_health_scan.py [photos] [rpm] [latency seconds]
+# talks to a stub OpenAI server on localhost and works in a temp directory, no real API calls
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+PHOTOS = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+RPM = float(sys.argv[2]) if len(sys.argv) > 2 else 1200
+LATENCY = float(sys.argv[3]) if len(sys.argv) > 3 else 0.5     # gpt-4o vision answers take a while
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests = 0
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        StubHandler.requests += 1
+        time.sleep(LATENCY)
+
+        body = json.dumps({"id": "stub", "object": "chat.completion", "created": 0, "model": "gpt-4o",
+                           "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": "Nothing wrong here"}}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+if __name__ == "__main__":
+    workdir = tempfile.mkdtemp(prefix="bestbuds-bench-")
+    os.chdir(workdir)      # database.py uses a relative sqlite path
+    sys.path.insert(0, ROOT)
+
+    import cv2
+    import numpy as np
+    import health_scan
+    from database import DB
+    from plant_ai import PlantAIService
+    from rate_limit import TokenBucket
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}/v1"
+
+    photo_dir = os.path.join(workdir, "plants")
+    os.makedirs(photo_dir)
+    rng = np.random.default_rng(0)
+    for i in range(1, PHOTOS + 1):
+        cv2.imwrite(os.path.join(photo_dir, f"plant_{i}.png"), rng.integers(0, 255, (64, 64, 3), dtype=np.uint8))
+
+    db = DB()
+    health_scan.APP_DIR = workdir
+    stores = {"plants": photo_dir}
+    limit_rate = RPM / 60
+
+    print(f"{PHOTOS} photos, stub latency {LATENCY * 1000:.0f} ms, limit {RPM:.0f}/min ({limit_rate:.1f}/s)\n")
+    print(f"{'run':<28}{'photos':>8}{'seconds':>10}{'per s':>8}{'of limit':>10}")
+
+    serial_count = min(PHOTOS, 20)
+    for name, workers, force, limit in (("serial (1 worker), sample", 1, True, serial_count), ("16 workers + rate limit", 16, True, None), ("rerun, nothing changed", 16, False, None)):
+        service = PlantAIService(api_key="stub", base_url=base_url, max_connections=workers, rate_limiter=TokenBucket.per_minute(RPM, burst=1))
+        scanner = health_scan.HealthScanner(db, service, workers=workers, force=force)
+        summary = scanner.run(health_scan.image_files(stores), limit=limit)
+        service.close()
+
+        rate = summary["scanned"] / summary["elapsed"] if summary["scanned"] else 0
+        print(f"{name:<28}{summary['scanned']:>8}{summary['elapsed']:>10.2f}{rate:>8.1f}{rate / limit_rate:>10.0%}")
+
+    print(f"\nstub saw {StubHandler.requests} requests, {len(db.get_health_scan_index())} photos with a stored result")
+    server.shutdown()
@@ -0,0 +1,84 @@
+# payload size / latency for each vision encode setting
+# run from the repo root: python benchmarks/bench_image_encoding.py [--requests] [--base-url URL]
+#   --requests sends every image to the vision API per setting (needs OPENAI_API_KEY, or a stub via --base-url)
+#   and prints the answers side by side so identification accuracy can be compared
+import argparse
+import base64
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+import cv2
+
+from image_encoding import EncodeSettings, encode_frame
+
+SETTINGS = {
+    "png (old path)": EncodeSettings("png", detail="auto"),
+    "jpeg q95": EncodeSettings("jpeg", quality=95),
+    "jpeg q85": EncodeSettings("jpeg", quality=85),
+    "jpeg q70": EncodeSettings("jpeg", quality=70),
+    "jpeg 40KB budget": EncodeSettings("jpeg", quality=90, max_bytes=40_000),
+    "webp q80": EncodeSettings("webp", quality=80),
+    "webp q60": EncodeSettings("webp", quality=60),
+}
+
+def load_frames(pattern):
+    frames = []
+    for path in sorted(glob.glob(pattern)):
+        frame = cv2.imread(path)
+        if frame is not None:
+            frames.append((os.path.basename(path), cv2.resize(frame, (512, 512), interpolation=cv2.INTER_AREA)))
+    return frames
+
+def bench_encoding(frames, repeats=5):
+    print(f"{'setting':<20}{'bytes':>10}{'base64':>10}{'encode ms':>12}")
+    for name, settings in SETTINGS.items():
+        sizes, times = [], []
+        for _, frame in frames:
+            for _ in range(repeats):
+                start = time.perf_counter()
+                payload, _ = encode_frame(frame, settings)
+                times.append(time.perf_counter() - start)
+            sizes.append(len(payload))
+
+        mean_bytes = sum(sizes) / len(sizes)
+        mean_b64 = sum(len(base64.b64encode(b"\0" * size)) for size in sizes) / len(sizes)
+        print(f"{name:<20}{mean_bytes:>10.0f}{mean_b64:>10.0f}{sum(times) / len(times) * 1000:>12.2f}")
+
+def bench_requests(frames, base_url):
+    from plant_ai import PlantAIService
+
+    print(f"\n{'setting':<20}{'latency ms':>12}  answers")
+    for name, settings in SETTINGS.items():
+        service = PlantAIService(base_url=base_url, encode_settings=settings)
+        answers, times = [], []
+        for _, frame in frames:
+            start = time.perf_counter()
+            try:
+                answers.append(service.identify_plant(frame))
+            except Exception as e:
+                answers.append(f"error: {e}")
+            times.append(time.perf_counter() - start)
+        service.close()
+
+        print(f"{name:<20}{sum(times) / len(times) * 1000:>12.0f}  {answers}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", default="images/plants/*.png")
+    parser.add_argument("--requests", action="store_true")
+    parser.add_argument("--base-url", default=None)
+    args = parser.parse_args()
+
+    frames = load_frames(args.images)
+    if not frames:
+        sys.exit(f"no images matched {args.images}")
+
+    print(f"{len(frames)} frames at 512x512")
+    bench_encoding(frames)
+
+    if args.requests:
+        bench_requests(frames, args.base_url)
@@ -0,0 +1,45 @@
+# save latency of the image store as the collection grows, vs the old listdir-and-count numbering
+# run from the repo root: python benchmarks/bench_image_store.py [images] [block]
+# works in a temp directory with its own sqlite file, the real database/images are untouched
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+TOTAL = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+BLOCK = int(sys.argv[2]) if len(sys.argv) > 2 else 5_000
+
+if __name__ == "__main__":
+    workdir = tempfile.mkdtemp(prefix="bestbuds-bench-")
+    os.chdir(workdir)      # database.py uses a relative sqlite path
+    sys.path.insert(0, ROOT)
+
+    import numpy as np
+    from image_store import ImageStore
+
+    store = ImageStore(os.path.join(workdir, "plants"), "plants", fsync=False)
+    flat_dir = os.path.join(workdir, "flat")
+    os.makedirs(flat_dir)
+    image = np.zeros((8, 8, 3), dtype=np.uint8)
+
+    print(f"{'images':>8}{'store save ms':>16}{'old numbering ms':>18}")
+    for block_start in range(0, TOTAL, BLOCK):
+        start = time.perf_counter()
+        for _ in range(BLOCK):
+            store.save(image)
+        store_ms = (time.perf_counter() - start) * 1000 / BLOCK
+
+        # fill a flat directory to the same size and time the old way of picking a name
+        for i in range(block_start, block_start + BLOCK):
+            open(os.path.join(flat_dir, f"plant_{i + 1}.png"), "wb").close()
+
+        start = time.perf_counter()
+        for _ in range(20):
+            existing_images = [f for f in os.listdir(flat_dir) if f.endswith(".png")]
+            next_number = len(existing_images) + 1
+        old_ms = (time.perf_counter() - start) * 1000 / 20
+
+        print(f"{block_start + BLOCK:>8}{store_ms:>16.3f}{old_ms:>18.3f}")
+
+    print(f"\nfiles written under {workdir}")
@@ -0,0 +1,80 @@
+# on-device classifier: accuracy and latency against a labelled image folder, and how many calls it saves
+# run from the repo root: python benchmarks/bench_local_classifier.py <images dir> [model.onnx] [species threshold]
+# the images dir has one folder per label, e.g. images/Monstera/*.jpg, not-a-plant folders start with "_"
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+
+def labelled_images(image_dir:str) -> list[tuple[str, str]]:
+    images = []
+    for label in sorted(os.listdir(image_dir)):
+        folder = os.path.join(image_dir, label)
+        if os.path.isdir(folder):
+            images.extend((os.path.join(folder, name), label) for name in sorted(os.listdir(folder)) if name.lower().endswith(IMAGE_EXTENSIONS))
+    return images
+
+def pct(part:int, whole:int) -> str:
+    return f"{part / whole:6.1%}" if whole else "     -"
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit("usage: python benchmarks/bench_local_classifier.py <images dir> [model.onnx] [species threshold]")
+
+    sys.path.insert(0, ROOT)
+
+    import cv2
+    from frame_pipeline import FramePipeline, CenterCrop, Resize
+    from local_classifier import LocalPlantClassifier, NOT_PLANT_PREFIX
+
+    image_dir = sys.argv[1]
+    model_path = sys.argv[2] if len(sys.argv) > 2 else os.path.join(ROOT, "models", "plant_classifier.onnx")
+    classifier = LocalPlantClassifier(model_path, species_threshold=float(sys.argv[3]) if len(sys.argv) > 3 else 0.8)
+    if not classifier.available:
+        sys.exit(f"no model at {model_path} (+ {classifier.labels_path}), nothing to benchmark")
+
+    capture_pipeline = FramePipeline(CenterCrop(), Resize(512))      # the same 512x512 frame the app captures
+    images = labelled_images(image_dir)
+    if not images:
+        sys.exit(f"no labelled images under {image_dir}")
+
+    # first call loads the network, keep it out of the latency numbers
+    load_start = time.perf_counter()
+    classifier.classify(capture_pipeline.process(cv2.imread(images[0][0]), copy=True))
+    load_ms = (time.perf_counter() - load_start) * 1000
+
+    plant_correct = top1 = topk = plants = 0
+    answered = answered_correct = 0
+    latencies = []
+    for path, label in images:
+        frame = capture_pipeline.process(cv2.imread(path), copy=True)
+
+        start = time.perf_counter()
+        result = classifier.classify(frame)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        is_plant = not label.startswith(NOT_PLANT_PREFIX)
+        plant_correct += result.is_plant == is_plant
+        if is_plant:
+            plants += 1
+            top1 += result.best is not None and result.best[0] == label
+            topk += label in [name for name, _ in result.species]
+
+        local, answer = classifier.decide(result)
+        if local:
+            answered += 1
+            answered_correct += (answer == label) if is_plant else (answer is None)
+
+    latencies.sort()
+    total = len(images)
+    print(f"{total} images ({plants} plants) from {image_dir}, model {os.path.basename(model_path)}, load {load_ms:.0f} ms\n")
+    print(f"plant / not plant accuracy   {pct(plant_correct, total)}")
+    print(f"species top-1 accuracy       {pct(top1, plants)}")
+    print(f"species top-{classifier.top_k} accuracy       {pct(topk, plants)}")
+    print(f"answered on device           {pct(answered, total)}   ({answered} frames, {pct(answered_correct, answered)} correct)")
+    print(f"escalated to the api         {pct(total - answered, total)}")
+    print(f"\nlatency per frame (preprocess + inference)")
+    print(f"  median {statistics.median(latencies):7.1f} ms   p95 {latencies[int(0.95 * (total - 1))]:7.1f} ms   max {latencies[-1]:7.1f} ms")
@@ -0,0 +1,65 @@
+# plant writes: one new_plant_record per row vs DB.add_plants / the csv importer
+# run from the repo root: python benchmarks/bench_plant_import.py [plants] [per-row sample]
+# works in a temp directory with its own sqlite file, the real database is untouched
+import csv
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+PLANTS = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+SAMPLE = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+
+def make_records(count):
+    start = date(2020, 1, 1)
+    for i in range(count):
+        fertiliser = i % 3 == 0
+        yield {
+            "name": f"Plant {i}",
+            "species": f"Species {i % 250}",
+            "birth_date": start + timedelta(days=i % 1500),
+            "water_frequency": 1 + i % 14,
+            "fertiliser_needed": fertiliser,
+            "fertiliser_type": "liquid" if fertiliser else None,
+            "fertiliser_frequency": 7 + i % 21 if fertiliser else None,
+            "height": 5.0 + i % 100,
+        }
+
+if __name__ == "__main__":
+    workdir = tempfile.mkdtemp(prefix="bestbuds-bench-")
+    os.chdir(workdir)      # database.py uses a relative sqlite path
+    sys.path.insert(0, ROOT)
+
+    from database import DB, Plant, Height, session_scope
+    from plant_import import import_plants
+
+    db = DB()
+
+    start = time.perf_counter()
+    for record in make_records(SAMPLE):
+        db.new_plant_record(**record)
+    per_row = (time.perf_counter() - start) / SAMPLE
+    print(f"new_plant_record      {per_row * 1000:8.3f} ms/plant -> ~{per_row * PLANTS:.1f}s for {PLANTS}")
+
+    for batch_size in (500, 5000):
+        start = time.perf_counter()
+        db.add_plants(make_records(PLANTS), batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        print(f"add_plants batch {batch_size:<5}{elapsed * 1e6 / PLANTS:8.1f} us/plant -> {elapsed:.2f}s for {PLANTS}")
+
+    csv_path = os.path.join(workdir, "inventory.csv")
+    with open(csv_path, "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=list(next(make_records(1))))
+        writer.writeheader()
+        writer.writerows(make_records(PLANTS))
+
+    start = time.perf_counter()
+    import_plants(csv_path, db)
+    print(f"csv import            {time.perf_counter() - start:.2f}s for {PLANTS}")
+
+    with session_scope() as session:
+        plants = session.query(Plant).count()
+        heights = session.query(Height).count()
+    print(f"\n{plants} plants, {heights} heights in {workdir}")
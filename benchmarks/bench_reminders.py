@@ -0,0 +1,68 @@
+# reminder engine: per tick cost as the collection grows, heap + change log vs querying who's due every tick
+# run from the repo root: python benchmarks/bench_reminders.py [plants...]
+# works in a temp directory with its own sqlite file, the real database is untouched
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, time as day_time, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+SIZES = [int(size) for size in sys.argv[1:]] or [1_000, 10_000, 100_000]
+
+def plants(count:int, start:int=0):
+    rng = random.Random(start)
+    for i in range(start, start + count):
+        yield {"name": f"Plant {i}", "species": "Fern", "birth_date": date(2023, 1, 1) + timedelta(days=rng.randrange(600)),
+               "water_frequency": rng.choice([1, 2, 3, 7, 14]), "fertiliser_needed": i % 3 == 0, "fertiliser_frequency": rng.choice([14, 30])}
+
+def us(function, repeat:int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) * 1e6 / repeat
+
+if __name__ == "__main__":
+    workdir = tempfile.mkdtemp(prefix="bestbuds-bench-")
+    os.chdir(workdir)      # database.py uses a relative sqlite path
+    sys.path.insert(0, ROOT)
+
+    from database import DB
+    from reminders import ChangeLogFollower, ReminderEngine
+
+    db = DB()
+    today = date.today()
+    now = [datetime.combine(today, day_time(8, 0)).timestamp()]      # fake clock, 8am before the 9am reminders
+    total = 0
+
+    print(f"{'plants':>8}{'load ms':>10}{'idle tick us':>14}{'idle poll us':>14}{'fire us':>10}{'edit us':>10}{'query due ms':>14}")
+    for size in SIZES:
+        db.add_plants(plants(size - total, total))
+        total = size
+
+        fired = []
+        engine = ReminderEngine(fired.extend, clock=lambda: now[0])
+        follower = ChangeLogFollower(db, engine)
+
+        start = time.perf_counter()
+        follower.poll()
+        load_ms = (time.perf_counter() - start) * 1000
+
+        idle_tick = us(engine.tick, 10_000)
+        idle_poll = us(follower.poll, 200)
+
+        # 9:30, everything due today fires and is pushed to its next day
+        now[0] = datetime.combine(today, day_time(9, 30)).timestamp()
+        start = time.perf_counter()
+        engine.tick()
+        fire_us = (time.perf_counter() - start) * 1e6 / max(len(fired), 1)
+        now[0] = datetime.combine(today, day_time(8, 0)).timestamp()
+
+        ids = random.Random(1).sample(range(1, size + 1), 500)
+        edit = us(lambda: engine.set_plant(ids.pop(), "Edited", date(2024, 1, 1), 3, None), 500)
+
+        # without the heap, each tick has to ask the database who is due
+        query_ms = us(lambda: (db.get_plants_to_water(today), db.get_plants_to_fertilise(today)), 3) / 1000
+
+        print(f"{size:>8}{load_ms:>10.0f}{idle_tick:>14.1f}{idle_poll:>14.0f}{fire_us:>10.1f}{edit:>10.1f}{query_ms:>14.1f}")
@@ -0,0 +1,119 @@
+# load test of the headless server (server.py): p50/p99 latency and requests per second per endpoint
+# run from the repo root: python benchmarks/bench_server.py [seconds] [concurrency] [stub latency seconds]
+# the server runs as its own process on a temp database, analyses go to a stub OpenAI server, no real API calls
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+SECONDS = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+CONCURRENCY = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+LATENCY = float(sys.argv[3]) if len(sys.argv) > 3 else 0.3
+PLANTS = 10_000
+AI_WORKERS = 8
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        time.sleep(LATENCY)
+
+        body = json.dumps({"id": "stub", "object": "chat.completion", "created": 0, "model": "gpt-4o",
+                           "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": "Monstera deliciosa"}}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+async def load(session, base_url:str, request, seconds:float, concurrency:int) -> dict:
+    # `concurrency` clients sending back to back for `seconds` -> latencies and status counts
+    latencies, statuses = [], {}
+    deadline = time.perf_counter() + seconds
+
+    async def client(number:int):
+        i = number
+        while time.perf_counter() < deadline:
+            method, path, body = request(i)
+            start = time.perf_counter()
+            async with session.request(method, base_url + path, data=body) as response:
+                await response.read()
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status] = statuses.get(response.status, 0) + 1
+            i += concurrency
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(concurrency)))
+    return {"elapsed": time.perf_counter() - start, "latencies": sorted(latencies), "statuses": statuses}
+
+async def main(base_url:str, images:list) -> None:
+    import aiohttp
+    from metrics import percentile
+
+    scenarios = (
+        ("GET /plants (page of 50)", lambda i: ("GET", f"/plants?after_id={i * 37 % PLANTS}&limit=50", None)),
+        ("GET /plants/{id}", lambda i: ("GET", f"/plants/{i * 7919 % PLANTS + 1}", None)),
+        ("GET /care (today)", lambda i: ("GET", "/care", None)),
+        ("POST /analyse/identify", lambda i: ("POST", "/analyse/identify", images[i % len(images)])),
+        ("POST identify, same photo", lambda i: ("POST", "/analyse/identify", images[0])),
+    )
+
+    connector = aiohttp.TCPConnector(limit=CONCURRENCY)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        print(f"{PLANTS} plants, {CONCURRENCY} concurrent clients, {SECONDS:.0f}s per endpoint, stub latency {LATENCY * 1000:.0f} ms, {AI_WORKERS} ai workers\n")
+        print(f"{'endpoint':<28}{'requests':>10}{'rps':>9}{'p50 ms':>9}{'p99 ms':>9}  statuses")
+        for name, request in scenarios:
+            result = await load(session, base_url, request, SECONDS, CONCURRENCY)
+            latencies = result["latencies"]
+            print(f"{name:<28}{len(latencies):>10}{len(latencies) / result['elapsed']:>9.0f}{percentile(latencies, 50) * 1000:>9.1f}"
+                  f"{percentile(latencies, 99) * 1000:>9.1f}  {result['statuses']}")
+
+if __name__ == "__main__":
+    workdir = tempfile.mkdtemp(prefix="bestbuds-bench-")
+    os.chdir(workdir)      # database.py uses a relative sqlite path, the server process shares it
+    sys.path.insert(0, ROOT)
+
+    import cv2
+    import numpy as np
+    from database import DB
+
+    rng = random.Random(0)
+    DB().add_plants({"name": f"Plant {i}", "species": "Fern", "birth_date": date(2023, 1, 1) + timedelta(days=rng.randrange(600)),
+                     "water_frequency": rng.choice([1, 2, 3, 7, 14]), "fertiliser_needed": False} for i in range(PLANTS))
+
+    noise = np.random.default_rng(0)
+    images = [cv2.imencode(".jpg", noise.integers(0, 255, (256, 256, 3), dtype=np.uint8))[1].tobytes() for _ in range(2000)]
+
+    stub = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=stub.serve_forever, daemon=True).start()
+
+    port = 18000 + os.getpid() % 1000
+    server = subprocess.Popen([sys.executable, os.path.join(ROOT, "server.py"), "--port", str(port), "--ai-workers", str(AI_WORKERS), "--max-pending", str(CONCURRENCY * 2),
+                               "--base-url", f"http://127.0.0.1:{stub.server_port}/v1"],
+                              env=dict(os.environ, OPENAI_API_KEY="stub"), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        import urllib.request
+        for _ in range(100):
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/status")
+                break
+            except OSError:
+                time.sleep(0.1)
+
+        asyncio.run(main(f"http://127.0.0.1:{port}", images))
+    finally:
+        server.terminate()
+        server.wait()
+        stub.shutdown()
@@ -0,0 +1,79 @@
+# default sqlite setup (rollback journal, full sync, no height index) vs the tuned profile in database.py
+# run from the repo root: python benchmarks/bench_sqlite_profile.py [plants] [heights per plant]
+# works in a temp directory with its own sqlite files, the real database is untouched
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+PLANTS = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+HEIGHTS = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+WRITES = 300
+READS = 2_000
+
+def build(engine, tuned):
+    from sqlalchemy import text
+    from database import Base, Height, Plant, plant_row
+
+    Base.metadata.create_all(engine)
+    if not tuned:
+        with engine.begin() as connection:
+            connection.execute(text("DROP INDEX ix_height_plant_date"))
+
+    start = date(2022, 1, 1)
+    records = [{"name": f"Plant {i}", "species": "Fern", "birth_date": start, "water_frequency": 1 + i % 7, "fertiliser_needed": False} for i in range(PLANTS)]
+    heights = [{"plant_id": plant_id, "date_recorded": start + timedelta(days=day), "height_value": float(day)}
+               for day in range(HEIGHTS) for plant_id in range(1, PLANTS + 1)]     # interleaved, like real daily measurements
+
+    with engine.begin() as connection:
+        connection.execute(Plant.__table__.insert(), [plant_row(record) for record in records])
+        connection.execute(Height.__table__.insert(), heights)
+
+def run(label, engine):
+    from sqlalchemy import select
+    from sqlalchemy.orm import sessionmaker
+    from database import Height, Plant
+
+    session = sessionmaker(bind=engine)()
+    rng = random.Random(0)
+
+    start = time.perf_counter()
+    for i in range(WRITES):
+        plant = Plant(name=f"New {i}", species="Fern", birth_date=date(2024, 1, 1), water_frequency=3, fertiliser_needed=False)
+        plant.height.append(Height(date_recorded=date(2024, 1, 1), height_value=1.0))
+        session.add(plant)
+        session.commit()
+    write_ms = (time.perf_counter() - start) * 1000 / WRITES
+
+    query = select(Height.date_recorded, Height.height_value).order_by(Height.date_recorded)
+    start = time.perf_counter()
+    for _ in range(READS):
+        plant_id = rng.randint(1, PLANTS)
+        session.execute(query.where(Height.plant_id == plant_id)).all()
+    read_ms = (time.perf_counter() - start) * 1000 / READS
+
+    session.close()
+    print(f"{label:<10}{write_ms:>16.3f}{read_ms:>18.3f}")
+
+if __name__ == "__main__":
+    workdir = tempfile.mkdtemp(prefix="bestbuds-bench-")
+    os.chdir(workdir)      # database.py uses a relative sqlite path
+    sys.path.insert(0, ROOT)
+
+    from sqlalchemy import create_engine
+    from database import configure_sqlite_engine
+
+    baseline = create_engine(f"sqlite:///{os.path.join(workdir, 'baseline.db')}")
+    tuned = create_engine(f"sqlite:///{os.path.join(workdir, 'tuned.db')}")
+    configure_sqlite_engine(tuned)
+
+    build(baseline, tuned=False)
+    build(tuned, tuned=True)
+
+    print(f"{PLANTS} plants x {HEIGHTS} heights\n")
+    print(f"{'profile':<10}{'write ms/plant':>16}{'heights read ms':>18}")
+    run("default", baseline)
+    run("tuned", tuned)
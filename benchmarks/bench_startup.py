@@ -0,0 +1,52 @@
+# app startup: how long `import main` takes and how long until the first frame is on screen
+# run from the repo root: python benchmarks/bench_startup.py [runs]
+# every run is a fresh python process so nothing is already imported or cached
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+RUNS = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+# runs inside the child process, prints "import_ms first_frame_ms heavy-modules-loaded"
+PROBE = """
+import sys, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+
+from kivy.core.window import Window
+
+def on_first_frame(*args):
+    first_frame = time.perf_counter()
+    loaded = [name for name in ("cv2", "openai", "httpx", "kivymd.uix.pickers") if name in sys.modules]
+    print(f"PROBE {(imported - start) * 1000:.0f} {(first_frame - start) * 1000:.0f} {','.join(loaded) or '-'}", flush=True)
+    Window.unbind(on_flip=on_first_frame)
+    main.BestBuds.get_running_app().stop()
+
+Window.bind(on_flip=on_first_frame)
+main.BestBuds().run()
+"""
+
+def run_once():
+    env = dict(os.environ, KIVY_NO_ARGS="1", KIVY_NO_CONSOLELOG="1")
+    env.setdefault("OPENAI_API_KEY", "benchmark")
+    output = subprocess.run([sys.executable, "-c", PROBE], cwd=ROOT, env=env, capture_output=True, text=True, timeout=120).stdout
+
+    for line in output.splitlines():
+        if line.startswith("PROBE "):
+            _, import_ms, frame_ms, loaded = line.split()
+            return float(import_ms), float(frame_ms), loaded
+
+    raise RuntimeError(f"app didn't reach its first frame:\n{output}")
+
+if __name__ == "__main__":
+    results = [run_once() for _ in range(RUNS)]
+
+    import_ms = [result[0] for result in results]
+    frame_ms = [result[1] for result in results]
+    print(f"{RUNS} cold starts")
+    print(f"import main      median {statistics.median(import_ms):7.0f} ms   min {min(import_ms):7.0f} ms")
+    print(f"first frame      median {statistics.median(frame_ms):7.0f} ms   min {min(frame_ms):7.0f} ms")
+    print(f"heavy modules loaded by the first frame: {results[-1][2]}")
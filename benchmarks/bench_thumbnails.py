@@ -0,0 +1,52 @@
+# home screen card images: decoding the full saved photos vs the card thumbnails
+# run from the repo root: python benchmarks/bench_thumbnails.py [cards]
+# works in a temp directory, the real images are untouched
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+CARDS = int(sys.argv[1]) if len(sys.argv) > 1 else 30     # one PlantViewer page
+
+def decode_all(paths, load):
+    start = time.perf_counter()
+    frames = [load(path) for path in paths]
+    return (time.perf_counter() - start) * 1000, sum(frame.nbytes for frame in frames)
+
+if __name__ == "__main__":
+    workdir = tempfile.mkdtemp(prefix="bestbuds-bench-")
+    os.chdir(workdir)      # database.py (imported via image_store) uses a relative sqlite path
+    sys.path.insert(0, ROOT)
+
+    import cv2
+    import numpy as np
+    from thumbnails import THUMBNAIL_SIZES, load_thumbnail, make_thumbnails, thumbnail_path
+
+    rng = np.random.default_rng(0)
+
+    paths = []
+    for i in range(CARDS):
+        # smooth-ish noise so png/jpeg sizes look like a photo rather than pure noise
+        small = rng.integers(0, 255, (64, 64, 3), dtype=np.uint8)
+        image = cv2.resize(small, (512, 512), interpolation=cv2.INTER_CUBIC)
+        path = os.path.join(workdir, f"plant_{i + 1}.png")
+        cv2.imwrite(path, image)
+        paths.append(path)
+
+    start = time.perf_counter()
+    for path in paths:
+        make_thumbnails(cv2.imread(path), path)
+    print(f"thumbnail generation: {(time.perf_counter() - start) * 1000 / CARDS:.2f} ms/photo (once, at save time)\n")
+
+    print(f"{'source':<18}{'decode ms':>12}{'resident MB':>14}{'file KB':>10}")
+    ms, resident = decode_all(paths, cv2.imread)
+    file_kb = sum(os.path.getsize(path) for path in paths) / 1024
+    print(f"{'full 512 png':<18}{ms:>12.1f}{resident / 1e6:>14.2f}{file_kb:>10.0f}")
+
+    for size in THUMBNAIL_SIZES:
+        ms, resident = decode_all(paths, lambda path: load_thumbnail(path, size))
+        file_kb = sum(os.path.getsize(thumbnail_path(path, size)) for path in paths) / 1024
+        print(f"{f'thumb {size} jpeg':<18}{ms:>12.1f}{resident / 1e6:>14.2f}{file_kb:>10.0f}")
+
+    print(f"\n{CARDS} cards, files written under {workdir}")
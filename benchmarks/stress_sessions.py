@@ -0,0 +1,104 @@
+# many threads reading and writing through DB at once, fails on any error (e.g. "database is locked")
+# run from the repo root: python benchmarks/stress_sessions.py [readers] [writers] [seconds]
+# works in a temp directory with its own sqlite file, the real database is untouched
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from collections import Counter
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+READERS = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+WRITERS = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+SECONDS = float(sys.argv[3]) if len(sys.argv) > 3 else 10
+
+def plant_record(rng, i):
+    return {
+        "name": f"Stress {i}",
+        "species": "Fern",
+        "birth_date": date(2023, 1, 1) + timedelta(days=rng.randrange(500)),
+        "water_frequency": rng.randint(1, 14),
+        "fertiliser_needed": False,
+        "height": 10.0,
+    }
+
+if __name__ == "__main__":
+    workdir = tempfile.mkdtemp(prefix="bestbuds-stress-")
+    os.chdir(workdir)      # database.py uses a relative sqlite path
+    sys.path.insert(0, ROOT)
+
+    from database import DB, Plant, allocate_sequence, session_scope
+
+    db = DB()       # shared by every thread, like main.py's module level db
+    db.add_plants(plant_record(random.Random(0), i) for i in range(2_000))
+
+    ops = Counter()
+    errors = []
+    stop = threading.Event()
+    lock = threading.Lock()
+
+    def reader(seed):
+        rng = random.Random(seed)
+        while not stop.is_set():
+            day = date(2024, 1, 1) + timedelta(days=rng.randrange(365))
+            choice = rng.randrange(3)
+            if choice == 0:
+                db.get_plant_page(after_id=rng.randrange(2_000), limit=30)
+            elif choice == 1:
+                db.get_plants_to_water(day)
+            else:
+                db.get_care_schedule(day, day + timedelta(days=6))
+            with lock:
+                ops["read"] += 1
+
+    def writer(seed):
+        rng = random.Random(seed)
+        i = 0
+        while not stop.is_set():
+            i += 1
+            choice = rng.randrange(4)
+            if choice == 0:
+                db.new_plant_record(**plant_record(rng, i))
+            elif choice == 1:
+                db.add_plants(plant_record(rng, i) for _ in range(50))
+            elif choice == 2:
+                allocate_sequence("stress")
+            else:
+                # read then write in one unit of work, the case that used to hit SQLITE_BUSY on upgrade
+                with session_scope(write=True) as session:
+                    plant = session.get(Plant, rng.randint(1, 2_000))
+                    plant.water_frequency = rng.randint(1, 14)
+            with lock:
+                ops["write"] += 1
+
+    def guarded(target, seed):
+        try:
+            target(seed)
+        except Exception:
+            errors.append(traceback.format_exc())
+            stop.set()
+
+    threads = [threading.Thread(target=guarded, args=(reader, i)) for i in range(READERS)]
+    threads += [threading.Thread(target=guarded, args=(writer, 1000 + i)) for i in range(WRITERS)]
+
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    stop.wait(SECONDS)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    print(f"{READERS} readers, {WRITERS} writers, {elapsed:.1f}s")
+    print(f"reads  {ops['read']:>8} ({ops['read'] / elapsed:.0f}/s)")
+    print(f"writes {ops['write']:>8} ({ops['write'] / elapsed:.0f}/s)")
+
+    if errors:
+        print(f"\n{len(errors)} thread(s) failed:\n{errors[0]}")
+        sys.exit(1)
+    print("no errors")
@@ -0,0 +1,143 @@
+import threading
+import time
+
+from metrics import metrics
+
+class CameraService():
+    """ Owns the opencv camera on a background thread.
+
+    Frames are read into a small ring of reused buffers and the newest one is published by
+    swapping a single (sequence, timestamp, slot) tuple, so readers never block on camera I/O
+    or on a lock. Readers that keep a frame around for longer than a couple of frame
+    intervals should ask for a copy. The capture thread releases the camera itself when it
+    exits, so a read that's stuck in the driver never has the camera released under it.
+    """
+
+    def __init__(self, device:int=0, slots:int=3):
+        self.device = device
+        self.slots = slots
+        self.capture = None
+
+        self._buffers = [None] * slots
+        self._latest = None        # (sequence, timestamp, slot) of the newest frame
+        self._last_read = 0        # newest sequence any reader has picked up
+        self._stop = None          # threading.Event of the current capture thread
+        self._thread = None
+
+        self.frames_captured = 0
+        self.frames_dropped = 0    # frames replaced before anyone read them
+        self.fps = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._stop is not None and not self._stop.is_set()
+
+    def start(self) -> bool:
+        if self.running:
+            return True
+
+        import cv2      # only paid for once the camera is actually opened
+        capture = cv2.VideoCapture(self.device)
+        if not capture.isOpened():
+            capture.release()
+            return False
+
+        # each thread gets its own stop event, a previous one still stuck in read() can't be restarted by this
+        self.capture = capture
+        self._stop = threading.Event()
+        self._buffers = [None] * self.slots
+        self._last_read = 0
+        self._thread = threading.Thread(target=self._run, args=(capture, self._stop), name="camera-capture", daemon=True)
+        self._thread.start()
+
+        return True
+
+    def stop(self) -> None:
+        if self._stop is not None:
+            self._stop.set()
+
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            if self._thread.is_alive():
+                # blocked in the driver, it releases the capture once the read returns
+                print("camera: capture thread still in read(), it will release the camera when it returns")
+                metrics.incr("camera.slow_stop")
+            self._thread = None
+
+        self.capture = None
+        self._latest = None
+
+    def _run(self, capture, stop:threading.Event) -> None:
+        try:
+            self._capture_frames(capture, stop)
+        finally:
+            # only this thread touches the capture, so it's never released mid read
+            capture.release()
+
+    def _capture_frames(self, capture, stop:threading.Event) -> None:
+        sequence = 0
+        last_time = None
+        buffers = self._buffers
+
+        while not stop.is_set():
+            slot = (sequence + 1) % self.slots
+
+            # read into the slot's old buffer so steady state doesn't allocate
+            ret, frame = capture.read(buffers[slot])
+            if stop.is_set():
+                break       # stopped while reading, don't publish into a stopped (or restarted) service
+            if not ret:
+                time.sleep(0.01)
+                continue
+
+            now = time.perf_counter()
+            buffers[slot] = frame
+            sequence += 1
+
+            previous = self._latest
+            if previous is not None and previous[0] > self._last_read:
+                self.frames_dropped += 1
+
+            # publishing is a single reference swap
+            self._latest = (sequence, now, slot)
+            self.frames_captured += 1
+
+            if last_time is not None and now > last_time:
+                instant_fps = 1.0 / (now - last_time)
+                self.fps = instant_fps if self.fps == 0 else self.fps * 0.9 + instant_fps * 0.1
+            last_time = now
+
+    def latest_frame(self, copy:bool=False):
+        # (frame, sequence) of the newest frame, (None, 0) before the first one arrives
+        latest = self._latest
+        if latest is None:
+            return None, 0
+
+        sequence, _, slot = latest
+        if sequence > self._last_read:
+            self._last_read = sequence
+
+        frame = self._buffers[slot]
+        return (frame.copy() if copy else frame), sequence
+
+    def frame_age(self) -> float:
+        # seconds since the newest frame was captured
+        latest = self._latest
+        if latest is None:
+            return float("inf")
+
+        return time.perf_counter() - latest[1]
+
+    def stats(self) -> dict:
+        stats = {
+            "fps": round(self.fps, 1),
+            "captured": self.frames_captured,
+            "dropped": self.frames_dropped,
+            "frame_age": self.frame_age(),
+        }
+
+        metrics.set("camera.fps", stats["fps"])
+        metrics.set("camera.dropped", stats["dropped"])
+        metrics.set("camera.frame_age_ms", round(stats["frame_age"] * 1000, 1))
+
+        return stats
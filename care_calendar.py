@@ -0,0 +1,115 @@
+import numpy as np
+from datetime import date
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()     # numpy datetime64 day 0
+
+class CareCalendar():
+    """ Batch care scheduler for month/year views.
+
+    Loads every plant's birth date and care frequencies once into NumPy arrays, then
+    works out who is due on which day for a whole date range in a single vectorised pass.
+    """
+
+    def __init__(self, plant_ids, birth_dates, water_frequencies, fertiliser_frequencies):
+        self.plant_ids = np.asarray(plant_ids, dtype=np.int64)
+        self.birth_days = np.fromiter((birth_date.toordinal() for birth_date in birth_dates), dtype=np.int64, count=len(self.plant_ids))
+
+        # 0 means the plant never needs that kind of care
+        self.frequencies = {
+            "water": self._as_frequencies(water_frequencies),
+            "fertiliser": self._as_frequencies(fertiliser_frequencies),
+        }
+
+    @classmethod
+    def from_db(cls, db) -> "CareCalendar":
+        rows = db.get_schedule_columns()
+        if not rows:
+            return cls([], [], [], [])
+
+        plant_ids, birth_dates, water_frequencies, fertiliser_frequencies = zip(*rows)
+        return cls(plant_ids, birth_dates, water_frequencies, fertiliser_frequencies)
+
+    def _as_frequencies(self, frequencies) -> np.ndarray:
+        values = np.array([int(f) if f not in (None, "") else 0 for f in frequencies], dtype=np.int64)
+        values[values < 0] = 0
+        return values
+
+    def __len__(self):
+        return len(self.plant_ids)
+
+    def first_due(self, start:date, care:str="water") -> np.ndarray:
+        # day offset (from start) of each plant's first due day, -1 if it never needs this care
+        frequencies = self.frequencies[care]
+        relative_birth = self.birth_days - start.toordinal()
+
+        safe_frequencies = np.where(frequencies > 0, frequencies, 1)
+        first = np.where(relative_birth >= 0, relative_birth, relative_birth % safe_frequencies)
+        first[frequencies == 0] = -1
+
+        return first
+
+    def due_matrix(self, start:date, end:date, care:str="water") -> np.ndarray:
+        # dense (plants x days) bool matrix, due[i, d] -> plant i needs care on start + d days
+        days = max((end - start).days + 1, 0)
+        due = np.zeros((len(self), days), dtype=bool)
+        if days == 0 or len(self) == 0:
+            return due
+
+        frequencies = self.frequencies[care]
+        first = self.first_due(start, care)
+        day_range = np.arange(days)
+
+        # plants sharing a frequency share the same repeating pattern, so build it once per frequency
+        for frequency in np.unique(frequencies[frequencies > 0]):
+            rows = np.flatnonzero((frequencies == frequency) & (first < days))
+            if len(rows) == 0:
+                continue
+
+            if frequency >= days:
+                # at most one due day inside the range
+                due[rows, first[rows]] = True
+                continue
+
+            patterns = (day_range % frequency)[None, :] == np.arange(frequency)[:, None]
+            due[rows] = patterns[first[rows] % frequency]
+
+            # plants born inside the range aren't due before their birth day
+            born_late = rows[first[rows] >= frequency]
+            if len(born_late):
+                due[born_late] &= day_range[None, :] >= first[born_late][:, None]
+
+        return due
+
+    def due_events(self, start:date, end:date, care:str="water") -> tuple[np.ndarray, np.ndarray]:
+        # sparse (plant_ids, dates) pairs, one per due event, sorted by date
+        days = max((end - start).days + 1, 0)
+        frequencies = self.frequencies[care]
+        first = self.first_due(start, care)
+
+        has_event = (first >= 0) & (first < days)
+        counts = np.zeros(len(self), dtype=np.int64)
+        counts[has_event] = (days - 1 - first[has_event]) // frequencies[has_event] + 1
+
+        plant_index = np.repeat(np.arange(len(self)), counts)
+        event_number = np.arange(len(plant_index)) - np.repeat(np.cumsum(counts) - counts, counts)
+        offsets = first[plant_index] + event_number * frequencies[plant_index]
+
+        # offsets are small non-negative ints, so a stable sort on uint16 is a linear radix sort
+        sort_keys = offsets.astype(np.uint16) if days <= np.iinfo(np.uint16).max else offsets
+        order = np.argsort(sort_keys, kind="stable")
+        dates = np.datetime64("1970-01-01", "D") + (start.toordinal() - EPOCH_ORDINAL + offsets[order])
+
+        return self.plant_ids[plant_index[order]], dates
+
+    def due_on(self, day:date, care:str="water") -> np.ndarray:
+        # plant ids due on a single day
+        first = self.first_due(day, care)
+        return self.plant_ids[first == 0]
+
+    def daily_counts(self, start:date, end:date, care:str="water") -> np.ndarray:
+        # number of plants due on each day in the range, handy for calendar badges
+        days = max((end - start).days + 1, 0)
+        _, dates = self.due_events(start, end, care)
+        offsets = (dates - np.datetime64(start, "D")).astype(np.int64)
+
+        return np.bincount(offsets, minlength=days)
@@ -0,0 +1,175 @@
+from bisect import bisect_left
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+import weakref
+
+from change_events import DELETE, INSERT, UPDATE
+from database import is_due
+
+CARES = ("water", "fertiliser")
+REBUILD_ROWS = 1000     # events bigger than this (bulk imports) drop the cache instead of patching it
+
+def seconds_until_midnight(now:datetime=None) -> float:
+    now = now or datetime.now()
+    midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+    return (midnight - now).total_seconds()
+
+class CareItem():
+    """ what a care list shows for one plant """
+
+    def __init__(self, plant_id:int, name:str, water_frequency=None, fertiliser_type:str=None, fertiliser_frequency=None):
+        self.plant_id = plant_id
+        self.name = name
+        self.water_frequency = water_frequency
+        self.fertiliser_type = fertiliser_type
+        self.fertiliser_frequency = fertiliser_frequency
+
+    @classmethod
+    def from_plant(cls, plant) -> "CareItem":
+        return cls(plant.id, plant.name, plant.water_frequency, plant.fertiliser_type, plant.fertiliser_frequency)
+
+    @classmethod
+    def from_row(cls, row:dict) -> "CareItem":
+        return cls(row["id"], row["name"], row["water_frequency"], row["fertiliser_type"], row["fertiliser_frequency"])
+
+class DailyCare():
+    def __init__(self, day:date):
+        self.day = day
+        self.items = {care: [] for care in CARES}      # care -> CareItems sorted by plant id
+        self.ids = {care: [] for care in CARES}        # care -> their plant ids, for bisect
+
+    @property
+    def water(self) -> list[CareItem]:
+        return self.items["water"]
+
+    @property
+    def fertiliser(self) -> list[CareItem]:
+        return self.items["fertiliser"]
+
+    def fill(self, care:str, plants) -> None:
+        items = sorted((CareItem.from_plant(plant) for plant in plants), key=lambda item: item.plant_id)
+        self.items[care] = items
+        self.ids[care] = [item.plant_id for item in items]
+
+    def apply(self, row:dict, deleted:bool=False) -> list[tuple]:
+        # patch both lists for one changed plant row -> [(care, op, index, item)] of what moved
+        edits = []
+        for care in CARES:
+            if deleted:
+                due = False
+            elif care == "water":
+                due = is_due(self.day, row["birth_date"], row["water_frequency"])
+            else:
+                due = bool(row["fertiliser_needed"]) and is_due(self.day, row["birth_date"], row["fertiliser_frequency"])
+
+            ids, items = self.ids[care], self.items[care]
+            index = bisect_left(ids, row["id"])
+            listed = index < len(ids) and ids[index] == row["id"]
+
+            if due:
+                item = CareItem.from_row(row)
+                if listed:
+                    items[index] = item
+                    edits.append((care, UPDATE, index, item))
+                else:
+                    ids.insert(index, row["id"])
+                    items.insert(index, item)
+                    edits.append((care, INSERT, index, item))
+            elif listed:
+                del ids[index]
+                del items[index]
+                edits.append((care, DELETE, index, None))
+
+        return edits
+
+class CareList():
+    """ Water/fertiliser lists per day, each worked out once and kept until it goes stale.
+
+    Days are cached most recently used first up to `max_days`, and `roll_over` drops the
+    ones that have gone by, so memory stays the same however long the app runs. Plant
+    change events patch the cached days in place and watchers get the row edits, a full
+    rebuild only happens for bulk imports. Used from the UI thread only.
+    """
+
+    def __init__(self, db, max_days:int=31):
+        self.db = db
+        self.max_days = max_days
+
+        self.builds = 0
+        self.hits = 0
+
+        self._days = OrderedDict()      # date -> DailyCare, least recently used first
+        self._watchers = []
+
+    def __len__(self):
+        return len(self._days)
+
+    def __contains__(self, day:date):
+        return day in self._days
+
+    def get(self, day:date=None) -> DailyCare:
+        day = day or date.today()
+        daily = self._days.get(day)
+        if daily is None:
+            return self.prefetch(day, day)[day]
+
+        self.hits += 1
+        self._days.move_to_end(day)
+        return daily
+
+    def prefetch(self, start:date, end:date) -> dict[date, DailyCare]:
+        # builds the missing days in [start, end] with one schedule query per kind of care
+        days = {start + timedelta(days=i): self._days.get(start + timedelta(days=i)) for i in range((end - start).days + 1)}
+        missing = [day for day, daily in days.items() if daily is None]
+
+        if missing:
+            schedules = {care: self.db.get_care_schedule(missing[0], missing[-1], care) for care in CARES}
+            for day in missing:
+                days[day] = DailyCare(day)
+                for care in CARES:
+                    days[day].fill(care, schedules[care][day])
+                self.builds += 1
+
+        for day, daily in days.items():
+            self._days[day] = daily
+            self._days.move_to_end(day)
+        while len(self._days) > self.max_days:
+            self._days.popitem(last=False)
+
+        return days
+
+    def roll_over(self, today:date=None) -> DailyCare:
+        # new day: forget the days that have passed and have today's list ready
+        today = today or date.today()
+        for day in [day for day in self._days if day < today]:
+            del self._days[day]
+
+        return self.get(today)
+
+    def clear(self) -> None:
+        self._days.clear()
+
+    def watch(self, callback) -> None:
+        # callback(daily, edits) after a cached day is patched, callback(None, None) after the cache is dropped
+        self._watchers.append(weakref.WeakMethod(callback) if hasattr(callback, "__self__") else (lambda: callback))
+
+    def on_plant_changed(self, event) -> None:
+        if len(event.rows) > REBUILD_ROWS:
+            self.clear()
+            self._notify(None, None)
+            return
+
+        for daily in self._days.values():
+            edits = []
+            for row in event.rows:
+                edits.extend(daily.apply(row, deleted=event.op == DELETE))
+
+            if edits:
+                self._notify(daily, edits)
+
+    def _notify(self, daily:DailyCare, edits:list[tuple]) -> None:
+        callbacks = [watcher() for watcher in self._watchers]
+        self._watchers = [watcher for watcher, callback in zip(self._watchers, callbacks) if callback is not None]
+        for callback in callbacks:
+            if callback is not None:
+                callback(daily, edits)
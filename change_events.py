@@ -0,0 +1,81 @@
+from collections import defaultdict
+import threading
+import weakref
+
+INSERT = "insert"
+UPDATE = "update"
+DELETE = "delete"
+
+class ChangeEvent():
+    def __init__(self, table:str, op:str, rows:list[dict]):
+        self.table = table
+        self.op = op
+        self.rows = rows        # column values of each changed row, only "id" for deletes
+
+    @property
+    def ids(self) -> list[int]:
+        return [row["id"] for row in self.rows]
+
+    def __repr__(self):
+        return f"ChangeEvent({self.table}, {self.op}, {len(self.rows)} rows)"
+
+class ChangeBus():
+    """ Insert/update/delete notifications for database rows, published after the commit.
+
+    Writes queue their changes on the session (`record`) and `publish` hands them out once
+    the transaction has committed, so subscribers never hear about rolled back rows. Each
+    subscriber gets its events through its own `dispatch`, e.g. the kivy clock for widgets.
+    Bound methods are held weakly, so a widget that is thrown away stops receiving events
+    instead of being kept alive by its subscription.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(list)      # table -> [(callback ref, dispatch)]
+
+    def subscribe(self, table:str, callback, dispatch=None) -> None:
+        reference = weakref.WeakMethod(callback) if hasattr(callback, "__self__") else (lambda: callback)
+        with self._lock:
+            self._subscribers[table].append((reference, dispatch))
+
+    def unsubscribe(self, table:str, callback) -> None:
+        with self._lock:
+            self._subscribers[table] = [(reference, dispatch) for reference, dispatch in self._subscribers[table] if reference() not in (None, callback)]
+
+    def has_subscribers(self, table:str) -> bool:
+        # lets big bulk writes skip building events nobody listens to
+        return bool(self._subscribers.get(table))
+
+    def record(self, session, table:str, op:str, rows:list[dict]) -> None:
+        # queue a change on `session`, for writes the session events can't see (core bulk inserts)
+        if rows:
+            session.info.setdefault("changes", []).append(ChangeEvent(table, op, list(rows)))
+
+    def discard(self, session) -> None:
+        session.info.pop("changes", None)
+
+    def publish(self, session) -> None:
+        for event in session.info.pop("changes", ()):
+            self.emit(event)
+
+    def emit(self, event:ChangeEvent) -> None:
+        with self._lock:
+            subscribers = [(reference(), dispatch) for reference, dispatch in self._subscribers[event.table]]
+            self._subscribers[event.table] = [(reference, dispatch) for reference, dispatch in self._subscribers[event.table] if reference() is not None]
+
+        for callback, dispatch in subscribers:
+            if callback is None:
+                continue
+            if dispatch is None:
+                self._deliver(callback, event)
+            else:
+                dispatch(lambda callback=callback: self._deliver(callback, event))
+
+    def _deliver(self, callback, event:ChangeEvent) -> None:
+        # the write has already committed, a broken subscriber mustn't look like a failed write
+        try:
+            callback(event)
+        except Exception as e:
+            print(f"change subscriber failed on {event}: {e}")
+
+changes = ChangeBus()
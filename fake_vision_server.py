@@ -0,0 +1,227 @@
+# stand-in for the OpenAI vision API: recorded answers with configurable latency, 429s, 5xx and timeouts
+# python fake_vision_server.py [--port 8765] [--latency 0.8] [--rate-429 0.05] [--rate-timeout 0.01] [--responses recorded.json]
+# then point the app, server.py or health_scan.py at it: OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=fake
+import argparse
+from collections import Counter
+import hashlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import random
+import threading
+import time
+
+from plant_ai import HEALTH_PROMPT
+
+# answers in the shapes gpt-4o gives, a --responses file ({"identify": [...], "health": [...]}) replaces them
+DEFAULT_RESPONSES = {
+    "identify": [
+        "This looks like a Monstera deliciosa (Swiss cheese plant), recognisable by its split, heart-shaped leaves.",
+        "This appears to be a Snake plant (Dracaena trifasciata) with upright, variegated sword-shaped leaves.",
+        "It's a Pothos (Epipremnum aureum), a trailing vine with glossy heart-shaped leaves.",
+        "Unclear, but this might be a plant - possibly a young fern.",
+        "No plant detected.",
+    ],
+    "health": [
+        "Nothing wrong here.",
+        "Nothing wrong here, the leaves look green and firm.",
+        "There are brown, crispy leaf edges, which usually means underwatering or low humidity.",
+        "Yellowing lower leaves suggest overwatering, let the soil dry out between waterings.",
+        "Unclear, the photo is too dark to judge.",
+    ],
+}
+
+class FaultProfile():
+    """ How the fake behaves: answer latency (+/- jitter) and the share of requests that fail.
+
+    A timeout holds the request for `hang` seconds and then drops the connection, set the
+    client's timeout below that to see it as a timeout.
+    """
+
+    def __init__(self, latency:float=0.8, jitter:float=0.0, rate_429:float=0.0, rate_500:float=0.0, rate_timeout:float=0.0,
+                 retry_after:float=1.0, hang:float=60.0, seed:int=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_429 = rate_429
+        self.rate_500 = rate_500
+        self.rate_timeout = rate_timeout
+        self.retry_after = retry_after
+        self.hang = hang
+        self.seed = seed
+
+    def __repr__(self):
+        return f"FaultProfile(latency={self.latency}, 429={self.rate_429:.0%}, 500={self.rate_500:.0%}, timeout={self.rate_timeout:.0%})"
+
+class Outcome():
+    def __init__(self, status:str, delay:float, text:str=None, retry_after:float=None):
+        self.status = status        # "ok", "429", "500" or "timeout"
+        self.delay = delay
+        self.text = text
+        self.retry_after = retry_after
+
+class FakeVision():
+    """ Decides what each request gets back.
+
+    The outcome is drawn from the request's content and how many times that same request
+    has been seen, so a replay gets the same answers, failures and retry outcomes whatever
+    order the workers send them in. A photo always gets the same recorded answer.
+    """
+
+    def __init__(self, responses:dict=None, profile:FaultProfile=None):
+        self.responses = responses or DEFAULT_RESPONSES
+        self.profile = profile or FaultProfile()
+        self.stats = Counter()
+
+        self._seen = Counter()
+        self._lock = threading.Lock()
+
+    def kind(self, messages:list) -> str:
+        system_prompt = messages[0]["content"] if messages and messages[0].get("role") == "system" else ""
+        return "health" if system_prompt == HEALTH_PROMPT else "identify"
+
+    def respond(self, messages:list) -> Outcome:
+        digest = hashlib.blake2b(json.dumps(messages, sort_keys=True).encode(), digest_size=16).hexdigest()
+        with self._lock:
+            attempt = self._seen[digest]
+            self._seen[digest] += 1
+
+        profile = self.profile
+        rng = random.Random(f"{profile.seed}:{digest}:{attempt}")
+        roll = rng.random()
+        delay = max(0.0, profile.latency + rng.uniform(-profile.jitter, profile.jitter))
+
+        if roll < profile.rate_timeout:
+            outcome = Outcome("timeout", profile.hang)
+        elif roll < profile.rate_timeout + profile.rate_429:
+            outcome = Outcome("429", min(delay, 0.05), retry_after=profile.retry_after)      # rate limits are answered straight away
+        elif roll < profile.rate_timeout + profile.rate_429 + profile.rate_500:
+            outcome = Outcome("500", delay)
+        else:
+            answers = self.responses[self.kind(messages)]
+            outcome = Outcome("ok", delay, text=answers[int(digest, 16) % len(answers)])
+
+        with self._lock:
+            self.stats[outcome.status] += 1
+        return outcome
+
+class FakeVisionHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    vision = None       # FakeVision, set per server by start_fake_vision_server
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        # /v1/models, so openaitest.py has something to list
+        if self.path.rstrip("/").endswith("/models"):
+            self.send_json(200, {"object": "list", "data": [{"id": "gpt-4o", "object": "model", "created": 0, "owned_by": "fake"}]})
+        else:
+            self.send_json(404, {"error": {"message": "not found", "type": "invalid_request_error"}})
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if not self.path.endswith("/chat/completions"):
+            self.send_json(404, {"error": {"message": "not found", "type": "invalid_request_error"}})
+            return
+
+        outcome = self.vision.respond(request.get("messages", []))
+        time.sleep(outcome.delay)
+
+        if outcome.status == "timeout":
+            self.close_connection = True        # no response at all, the client's read timeout goes off first
+        elif outcome.status == "429":
+            self.send_json(429, {"error": {"message": "Rate limit reached for gpt-4o", "type": "requests", "code": "rate_limit_exceeded"}},
+                           {"retry-after": f"{outcome.retry_after:g}"})
+        elif outcome.status == "500":
+            self.send_json(500, {"error": {"message": "The server had an error while processing your request.", "type": "server_error"}})
+        else:
+            self.send_json(200, {
+                "id": "chatcmpl-fake", "object": "chat.completion", "created": int(time.time()), "model": request.get("model", "gpt-4o"),
+                "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": outcome.text}}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            })
+
+    def send_json(self, status:int, payload:dict, headers:dict=None) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+def start_fake_vision_server(vision:FakeVision, host:str="127.0.0.1", port:int=0) -> tuple[ThreadingHTTPServer, str]:
+    # serves on a background thread -> (server, base_url for OPENAI_BASE_URL / PlantAIService)
+    handler = type("BoundFakeVisionHandler", (FakeVisionHandler,), {"vision": vision})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="fake-vision", daemon=True).start()
+
+    return server, f"http://{host}:{server.server_port}/v1"
+
+class FakeAPIError(Exception):
+    def __init__(self, message:str, retry_after:float=None):
+        super().__init__(message)
+        # same shape as an openai error, so PlantAIService.backoff_delay finds the retry-after hint
+        self.response = type("FakeResponse", (), {"headers": {"retry-after": f"{retry_after:g}"} if retry_after else {}})()
+
+class ReplayBackend():
+    """ In-process vision backend for PlantAIService: the fake's answers and failures without sockets or openai. """
+
+    retryable = (FakeAPIError,)
+
+    def __init__(self, vision:FakeVision, timeout:float=30.0):
+        self.vision = vision
+        self.timeout = timeout
+
+    def complete(self, model:str, messages:list, max_tokens:int) -> str:
+        outcome = self.vision.respond(messages)
+        time.sleep(min(outcome.delay, self.timeout))
+
+        if outcome.status == "timeout" or outcome.delay > self.timeout:
+            raise FakeAPIError("Request timed out.")
+        if outcome.status == "429":
+            raise FakeAPIError("Rate limit reached for gpt-4o", retry_after=outcome.retry_after)
+        if outcome.status == "500":
+            raise FakeAPIError("The server had an error while processing your request.")
+        return outcome.text
+
+    def close(self) -> None:
+        pass
+
+def load_responses(path:str) -> dict:
+    with open(path) as file:
+        responses = json.load(file)
+
+    missing = [kind for kind in DEFAULT_RESPONSES if not responses.get(kind)]
+    if missing:
+        raise ValueError(f"{path} has no recorded {' or '.join(missing)} answers")
+    return responses
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OpenAI compatible stand-in for the vision API, with recorded answers and injected failures.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.8, help="seconds per answer")
+    parser.add_argument("--jitter", type=float, default=0.2, help="+/- seconds of random latency")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="share of requests rate limited")
+    parser.add_argument("--rate-500", type=float, default=0.0, help="share of requests failing with a server error")
+    parser.add_argument("--rate-timeout", type=float, default=0.0, help="share of requests that never get an answer")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="retry-after seconds sent with 429s")
+    parser.add_argument("--hang", type=float, default=60.0, help="seconds a timed out request is held")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--responses", default=None, help="json file of recorded answers, {\"identify\": [...], \"health\": [...]}")
+    args = parser.parse_args()
+
+    profile = FaultProfile(latency=args.latency, jitter=args.jitter, rate_429=args.rate_429, rate_500=args.rate_500, rate_timeout=args.rate_timeout,
+                           retry_after=args.retry_after, hang=args.hang, seed=args.seed)
+    vision = FakeVision(load_responses(args.responses) if args.responses else None, profile)
+    server, base_url = start_fake_vision_server(vision, args.host, args.port)
+    print(f"fake vision API on {base_url} - {profile}", flush=True)
+
+    try:
+        while True:
+            time.sleep(10)
+            print(f"{sum(vision.stats.values())} requests: {dict(vision.stats)}", flush=True)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,180 @@
+import time
+
+import numpy as np
+
+from image_encoding import EncodeSettings, encode_frame
+
+class Stage():
+    """ One step of a FramePipeline.
+
+    `output_shape` tells the pipeline what to preallocate, `apply` writes into `out` when it
+    can. Stages that only slice (crop) return views and don't need a buffer.
+    """
+    name = "stage"
+    needs_buffer = True
+
+    def output_shape(self, shape:tuple) -> tuple:
+        return shape
+
+    def apply(self, frame, out):
+        raise NotImplementedError
+
+class CenterCrop(Stage):
+    # largest centred square, as a view
+    name = "crop"
+    needs_buffer = False
+
+    def output_shape(self, shape):
+        min_dim = min(shape[0], shape[1])
+        return (min_dim, min_dim) + tuple(shape[2:])
+
+    def apply(self, frame, out):
+        height, width = frame.shape[:2]
+        min_dim = min(height, width)
+        x_start = (width - min_dim) // 2  # Center crop horizontally
+        y_start = (height - min_dim) // 2  # Center crop vertically
+        return frame[y_start:y_start + min_dim, x_start:x_start + min_dim]
+
+class Resize(Stage):
+    name = "resize"
+
+    def __init__(self, width:int, height:int=None, interpolation:int=None):
+        self.width = width
+        self.height = height or width
+        self.interpolation = interpolation      # None -> cv2.INTER_AREA
+
+    def output_shape(self, shape):
+        return (self.height, self.width) + tuple(shape[2:])
+
+    def apply(self, frame, out):
+        import cv2
+
+        interpolation = cv2.INTER_AREA if self.interpolation is None else self.interpolation
+        return cv2.resize(frame, (self.width, self.height), dst=out, interpolation=interpolation)
+
+class ColourConvert(Stage):
+    name = "colour"
+
+    def __init__(self, code:int=None, channels:int=3):
+        self.code = code        # None -> cv2.COLOR_BGR2RGB
+        self.channels = channels
+
+    def output_shape(self, shape):
+        return (shape[0], shape[1]) if self.channels == 1 else (shape[0], shape[1], self.channels)
+
+    def apply(self, frame, out):
+        import cv2
+
+        code = cv2.COLOR_BGR2RGB if self.code is None else self.code
+        return cv2.cvtColor(frame, code, dst=out)
+
+class Flip(Stage):
+    # 0 -> vertical, 1 -> horizontal (same as cv2.flip)
+    name = "flip"
+
+    def __init__(self, axis:int=0):
+        self.axis = axis
+
+    def apply(self, frame, out):
+        import cv2
+
+        return cv2.flip(frame, self.axis, dst=out)
+
+class Encode(Stage):
+    # terminal stage, returns compressed bytes
+    name = "encode"
+    needs_buffer = False
+
+    def __init__(self, settings:EncodeSettings=None):
+        self.settings = settings or EncodeSettings()
+
+    def apply(self, frame, out):
+        payload, _ = encode_frame(frame, self.settings)
+        return payload
+
+class FramePipeline():
+    """ Chain of frame stages sharing preallocated output buffers.
+
+    Each stage writes into a buffer sized for its output shape, created the first time that
+    shape is seen and reused after that. The returned array is that reused buffer, so pass
+    `copy=True` if the result needs to outlive the next call. `process_batch` runs N frames
+    into one reused (N, ...) array.
+    """
+
+    def __init__(self, *stages:Stage, profile:bool=False):
+        self.stages = list(stages)
+        self.profile = profile
+
+        self._buffers = {}          # (stage index, shape, dtype) -> array
+        self._batch_buffers = {}    # (shape, dtype) -> (N, ...) array
+        self.stage_times = {stage.name: 0.0 for stage in self.stages}
+        self.frames_processed = 0
+
+    def _buffer(self, index:int, shape:tuple, dtype):
+        key = (index, shape, dtype)
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            buffer = self._buffers[key] = np.empty(shape, dtype=dtype)
+        return buffer
+
+    def output_shape(self, shape:tuple) -> tuple:
+        for stage in self.stages:
+            shape = stage.output_shape(shape)
+        return shape
+
+    def process(self, frame, copy:bool=False, out=None):
+        # run one frame through every stage, `out` overrides the last stage's buffer
+        last = len(self.stages) - 1
+
+        for index, stage in enumerate(self.stages):
+            buffer = None
+            if stage.needs_buffer:
+                if index == last and out is not None:
+                    buffer = out
+                else:
+                    buffer = self._buffer(index, stage.output_shape(frame.shape), frame.dtype)
+
+            if self.profile:
+                start = time.perf_counter()
+                frame = stage.apply(frame, buffer)
+                self.stage_times[stage.name] += time.perf_counter() - start
+            else:
+                frame = stage.apply(frame, buffer)
+
+        self.frames_processed += 1
+
+        if isinstance(frame, np.ndarray):
+            if out is not None and frame is not out:
+                out[...] = frame
+                frame = out
+            elif copy:
+                frame = frame.copy()
+
+        return frame
+
+    def process_batch(self, frames, copy:bool=False):
+        # N frames in one go, image results land in a single reused (N, ...) array
+        frames = list(frames)
+        if not frames:
+            return []
+
+        if isinstance(self.stages[-1], Encode):
+            return [self.process(frame) for frame in frames]
+
+        shape = self.output_shape(frames[0].shape)
+        key = ((len(frames),) + shape, frames[0].dtype)
+        batch = self._batch_buffers.get(key)
+        if batch is None:
+            self._batch_buffers.clear()     # only keep the latest batch size around
+            batch = self._batch_buffers[key] = np.empty(*key)
+
+        for i, frame in enumerate(frames):
+            self.process(frame, out=batch[i])
+
+        return batch.copy() if copy else batch
+
+    def stage_report(self) -> dict:
+        # average ms per frame for each stage (profile=True only)
+        if not self.frames_processed:
+            return {}
+        return {name: total * 1000 / self.frames_processed for name, total in self.stage_times.items()}
@@ -0,0 +1,146 @@
+import numpy as np
+from datetime import date
+
+from care_calendar import EPOCH_ORDINAL
+
+ROLLUP_PERIODS = ("day", "week", "month")
+
+def bucket_starts(days:np.ndarray, period:str) -> np.ndarray:
+    # first day of the day/week (monday)/month bucket each datetime64[D] day falls in
+    if period == "day":
+        return days
+    if period == "week":
+        # 1970-01-01 was a thursday, +3 makes monday weekday 0
+        return days - (days.astype(np.int64) + 3) % 7
+    if period == "month":
+        return days.astype("datetime64[M]").astype("datetime64[D]")
+
+    raise ValueError(f"Unknown rollup period: {period}")
+
+def rollup_measurements(measurements, periods=ROLLUP_PERIODS) -> list[dict]:
+    """ (plant_id, date, height) measurements -> one height_rollup row per (period, plant, bucket).
+
+    Rows carry count/min/max/sum rather than a mean, so they can be merged into existing
+    buckets without going back to the raw measurements.
+    """
+    measurements = list(measurements)
+    if not measurements:
+        return []
+
+    plant_ids, dates, values = zip(*measurements)
+    plant_ids = np.asarray(plant_ids, dtype=np.int64)
+    days = np.asarray(dates, dtype="datetime64[D]")
+    values = np.asarray(values, dtype=np.float64)
+
+    rows = []
+    for period in periods:
+        buckets = bucket_starts(days, period).astype(np.int64)
+        keys, inverse = np.unique(np.stack([plant_ids, buckets], axis=1), axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+
+        counts = np.bincount(inverse)
+        sums = np.bincount(inverse, weights=values)
+        mins = np.full(len(keys), np.inf)
+        maxs = np.full(len(keys), -np.inf)
+        np.minimum.at(mins, inverse, values)
+        np.maximum.at(maxs, inverse, values)
+
+        rows.extend({
+            "period": period,
+            "plant_id": int(plant_id),
+            "bucket_start": date.fromordinal(EPOCH_ORDINAL + int(bucket)),
+            "count": int(count),
+            "min_height": float(low),
+            "max_height": float(high),
+            "sum_height": float(total),
+        } for (plant_id, bucket), count, low, high, total in zip(keys.tolist(), counts, mins, maxs, sums))
+
+    return rows
+
+class GrowthSeries():
+    """ Height rollups for many plants as flat NumPy columns.
+
+    Rows are sorted by plant then bucket, and `offsets` marks where each plant's run starts
+    (plant i is rows offsets[i]:offsets[i + 1]), so per-plant maths happens in one vectorised
+    pass over the whole collection instead of a Python loop per plant.
+    """
+
+    def __init__(self, plant_ids, bucket_starts, counts, min_heights, max_heights, sum_heights, period:str="week"):
+        self.period = period
+        self.plant_ids = np.asarray(plant_ids, dtype=np.int64)
+        self.days = np.asarray(bucket_starts, dtype="datetime64[D]")
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self.mins = np.asarray(min_heights, dtype=np.float64)
+        self.maxs = np.asarray(max_heights, dtype=np.float64)
+        self.means = np.asarray(sum_heights, dtype=np.float64) / np.maximum(self.counts, 1)
+
+        boundaries = np.flatnonzero(np.diff(self.plant_ids)) + 1
+        self.offsets = np.concatenate(([0], boundaries, [len(self.plant_ids)])) if len(self.plant_ids) else np.zeros(1, dtype=np.int64)
+        self.plants = self.plant_ids[self.offsets[:-1]]
+
+    @classmethod
+    def from_db(cls, db, period:str="week", plant_ids=None, start:date=None, end:date=None) -> "GrowthSeries":
+        rows = db.get_height_rollups(period, plant_ids, start, end)
+        if not rows:
+            return cls([], [], [], [], [], [], period)
+
+        return cls(*zip(*rows), period=period)
+
+    def __len__(self):
+        return len(self.plants)
+
+    def series(self, plant_id:int) -> tuple[np.ndarray, np.ndarray]:
+        # (bucket start days, mean heights) for one plant
+        index = np.searchsorted(self.plants, plant_id)
+        if index >= len(self.plants) or self.plants[index] != plant_id:
+            return self.days[:0], self.means[:0]
+
+        rows = slice(self.offsets[index], self.offsets[index + 1])
+        return self.days[rows], self.means[rows]
+
+    def growth_rates(self) -> np.ndarray:
+        # cm/day between each bucket and the plant's previous one, NaN on every plant's first bucket
+        rates = np.full(len(self.means), np.nan)
+        if len(self.means) < 2:
+            return rates
+
+        elapsed = np.diff(self.days).astype(np.float64)
+        change = np.diff(self.means)
+        same_plant = np.diff(self.plant_ids) == 0
+
+        rates[1:] = np.where(same_plant, change / np.where(elapsed > 0, elapsed, np.nan), np.nan)
+        return rates
+
+    def trends(self) -> np.ndarray:
+        # least squares slope of mean height against time for every plant, cm/day (NaN with < 2 buckets)
+        if not len(self.plants):
+            return np.zeros(0)
+
+        group = np.repeat(np.arange(len(self.plants)), np.diff(self.offsets))
+        x = (self.days - self.days[self.offsets[:-1]][group]).astype(np.float64)     # days since the plant's first bucket
+        y = self.means
+
+        n = np.diff(self.offsets).astype(np.float64)
+        sum_x = np.bincount(group, weights=x)
+        sum_y = np.bincount(group, weights=y)
+        sum_xx = np.bincount(group, weights=x * x)
+        sum_xy = np.bincount(group, weights=x * y)
+
+        denominator = n * sum_xx - sum_x * sum_x
+        with np.errstate(divide="ignore", invalid="ignore"):
+            slopes = (n * sum_xy - sum_x * sum_y) / denominator
+        slopes[denominator == 0] = np.nan
+
+        return slopes
+
+    def total_growth(self) -> np.ndarray:
+        # last bucket mean minus first bucket mean, per plant
+        if not len(self.plants):
+            return np.zeros(0)
+        return self.means[self.offsets[1:] - 1] - self.means[self.offsets[:-1]]
+
+    def latest(self) -> np.ndarray:
+        # most recent mean height per plant
+        if not len(self.plants):
+            return np.zeros(0)
+        return self.means[self.offsets[1:] - 1]
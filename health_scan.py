@@ -0,0 +1,222 @@
+# batch health check of every saved photo, headless (no kivy window)
+# python health_scan.py [--rpm 500] [--workers 16] [--force] [--limit N] [dirs...]
+import argparse
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import hashlib
+import os
+import re
+import time
+
+from metrics import metrics
+
+APP_DIR = os.path.dirname(os.path.realpath(__file__))
+SCAN_STORES = {
+    "plants": os.path.join(APP_DIR, "images", "plants"),
+    "health": os.path.join(APP_DIR, "images", "health"),
+}
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp")
+IMAGE_NUMBER = re.compile(r"_(\d+)\.\w+$")
+
+def image_files(stores:dict):
+    # (store, path) for every photo, skipping the card thumbnails and half-written temp files
+    for store, root in stores.items():
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = sorted(name for name in dirnames if name != "thumbs")
+            for filename in sorted(filenames):
+                if filename.lower().endswith(IMAGE_EXTENSIONS) and not filename.startswith(".tmp-"):
+                    yield store, os.path.join(dirpath, filename)
+
+def file_digest(path:str) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as file:
+        while chunk := file.read(1024 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def scan_record(store:str, path:str, result:str=None, error:str=None, digest:str=None, scanned_at:float=None) -> dict:
+    # health_scan row for one photo
+    # a photo deleted or moved since it was listed -> an error row (size/mtime/digest blank), which the next run retries
+    try:
+        stat = os.stat(path)
+        size, mtime = stat.st_size, stat.st_mtime
+        digest = digest or file_digest(path)
+    except OSError as e:
+        size, mtime, digest = 0, 0.0, digest or ""
+        result, error = None, error or f"{type(e).__name__}: {e}"
+
+    number = IMAGE_NUMBER.search(os.path.basename(path))
+
+    return {
+        "image_path": os.path.relpath(path, APP_DIR),
+        "store": store,
+        "image_number": int(number.group(1)) if number else None,
+        "file_size": size,
+        "file_mtime": mtime,
+        "digest": digest,
+        "result": result,
+        "error": error,
+        "scanned_at": scanned_at or time.time(),
+    }
+
+class HealthScanner():
+    """ Runs the health check over a whole photo collection.
+
+    Photos are analysed on `workers` threads, and every API attempt waits on the service's
+    shared rate limiter, so a big scan runs at the API limit rather than one request at a
+    time. Results are committed every `commit_every` photos. A scan that is interrupted or
+    crashes picks up where it stopped: photos whose size and mtime (or, failing that,
+    content digest) match their last successful scan are skipped. Failures are recorded
+    with their error and retried by the next run.
+    """
+
+    def __init__(self, db, ai_service, workers:int=16, commit_every:int=25, force:bool=False):
+        self.db = db
+        self.ai_service = ai_service
+        self.workers = workers
+        self.commit_every = commit_every
+        self.force = force
+
+    def plan(self, images) -> tuple[list[tuple], int]:
+        # ([(store, path, digest)] still to scan, number skipped as unchanged)
+        scanned = {} if self.force else self.db.get_health_scan_index()
+        todo = []
+        skipped = 0
+
+        for store, path in images:
+            previous = scanned.get(os.path.relpath(path, APP_DIR))
+            if previous is None:
+                todo.append((store, path, None))
+                continue
+
+            size, mtime, digest = previous
+            try:
+                stat = os.stat(path)
+                if stat.st_size == size and stat.st_mtime == mtime:
+                    skipped += 1
+                    continue
+
+                # touched, maybe changed -> only the content decides
+                current = file_digest(path)
+            except OSError:
+                todo.append((store, path, None))        # gone since it was listed, analyse records why
+                continue
+
+            if current == digest:
+                skipped += 1
+            else:
+                todo.append((store, path, current))
+
+        return todo, skipped
+
+    def analyse(self, store:str, path:str, digest:str=None) -> dict:
+        # runs on a worker thread
+        import cv2
+
+        try:
+            if not os.path.isfile(path):
+                raise FileNotFoundError(f"No such file: {path!r}")      # imread would only say it's unreadable
+            frame = cv2.imread(path)
+        except OSError as e:
+            metrics.incr("health_scan.failed")
+            return scan_record(store, path, error=f"{type(e).__name__}: {e}", digest=digest)
+
+        if frame is None:
+            metrics.incr("health_scan.failed")
+            return scan_record(store, path, error="unreadable image", digest=digest)
+
+        try:
+            with metrics.timer("health_scan.analyse"):
+                result = self.ai_service.check_health(frame)
+        except Exception as e:
+            metrics.incr("health_scan.failed")
+            return scan_record(store, path, error=f"{type(e).__name__}: {e}", digest=digest)
+
+        metrics.incr("health_scan.scanned")
+        return scan_record(store, path, result=result, digest=digest)
+
+    def run(self, images, limit:int=None, progress=None) -> dict:
+        todo, skipped = self.plan(images)
+        if limit is not None:
+            todo = todo[:limit]
+
+        summary = {"queued": len(todo), "skipped": skipped, "scanned": 0, "failed": 0}
+        pending_rows = []
+        start = time.perf_counter()
+
+        def record(rows:list) -> None:
+            self.db.record_health_scans(rows)
+            rows.clear()
+
+        def result_row(future, job:tuple) -> dict:
+            # anything analyse didn't turn into a row itself still becomes an error row, so one photo can't stop the scan
+            try:
+                return future.result()
+            except Exception as e:
+                metrics.incr("health_scan.failed")
+                store, path, digest = job
+                return scan_record(store, path, error=f"{type(e).__name__}: {e}", digest=digest)
+
+        # a bounded window of futures, so thousands of photos aren't all queued (and decoded) up front
+        jobs = iter(todo)
+        in_flight = {}      # future -> (store, path, digest)
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="health-scan")
+        try:
+            while True:
+                while len(in_flight) < self.workers * 2 and (job := next(jobs, None)) is not None:
+                    in_flight[executor.submit(self.analyse, *job)] = job
+                if not in_flight:
+                    break
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    row = result_row(future, in_flight.pop(future))
+                    pending_rows.append(row)
+                    summary["failed" if row["error"] else "scanned"] += 1
+
+                if len(pending_rows) >= self.commit_every:
+                    record(pending_rows)
+                if progress:
+                    progress(summary, time.perf_counter() - start)
+        finally:
+            # ctrl-c -> drop what hasn't started, keep whatever finished
+            executor.shutdown(wait=True, cancel_futures=True)
+            pending_rows.extend(result_row(future, job) for future, job in in_flight.items() if future.done() and not future.cancelled())
+            record(pending_rows)
+
+        summary["elapsed"] = time.perf_counter() - start
+        return summary
+
+def print_progress(summary:dict, elapsed:float) -> None:
+    done = summary["scanned"] + summary["failed"]
+    if done % 25 == 0 or done == summary["queued"]:
+        print(f"{done}/{summary['queued']} photos, {summary['failed']} failed, {done / max(elapsed, 1e-9) * 60:.0f}/min", flush=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Health check every saved plant photo, resuming where the last scan stopped.")
+    parser.add_argument("dirs", nargs="*", help="photo directories to scan instead of images/plants and images/health")
+    parser.add_argument("--rpm", type=float, default=float(os.getenv("HEALTH_SCAN_RPM", 500)), help="API requests per minute, retries included")
+    parser.add_argument("--workers", type=int, default=16, help="analyses in flight at once")
+    parser.add_argument("--limit", type=int, default=None, help="scan at most this many photos")
+    parser.add_argument("--force", action="store_true", help="rescan photos that haven't changed")
+    parser.add_argument("--base-url", default=os.getenv("OPENAI_BASE_URL"), help="OpenAI compatible endpoint")
+    args = parser.parse_args()
+
+    from database import DB
+    from image_encoding import EncodeSettings
+    from plant_ai import PlantAIService
+    from rate_limit import TokenBucket
+
+    stores = {os.path.basename(os.path.normpath(path)): path for path in args.dirs} if args.dirs else SCAN_STORES
+    ai_service = PlantAIService(max_connections=args.workers, base_url=args.base_url, encode_settings=EncodeSettings.from_env(),
+                                rate_limiter=TokenBucket.per_minute(args.rpm))
+    scanner = HealthScanner(DB(), ai_service, workers=args.workers, force=args.force)
+
+    try:
+        summary = scanner.run(image_files(stores), limit=args.limit, progress=print_progress)
+    except KeyboardInterrupt:
+        print("stopped, finished photos are saved - run again to resume")
+        raise SystemExit(130)
+    finally:
+        ai_service.close()
+
+    print(f"{summary['scanned']} scanned, {summary['failed']} failed, {summary['skipped']} unchanged in {summary['elapsed']:.1f}s")
@@ -0,0 +1,67 @@
+import base64
+import os
+
+# format -> (file extension, opencv quality flag name, mime type)
+IMAGE_FORMATS = {
+    "jpeg": (".jpg", "IMWRITE_JPEG_QUALITY", "image/jpeg"),
+    "webp": (".webp", "IMWRITE_WEBP_QUALITY", "image/webp"),
+    "png": (".png", None, "image/png"),
+}
+
+class EncodeSettings():
+    """ How frames are packed for the vision API.
+
+    `max_bytes` is a soft budget - quality steps down until the payload fits or hits
+    `min_quality`. `detail` is passed straight through as the image_url detail hint
+    ("low" is a fixed 512px tile, which is already the size of our captures).
+    """
+
+    def __init__(self, image_format:str="jpeg", quality:int=85, max_bytes:int=None, max_side:int=512, min_quality:int=40, detail:str="low"):
+        if image_format not in IMAGE_FORMATS:
+            raise ValueError(f"Unknown image format {image_format}, pick one of {list(IMAGE_FORMATS)}")
+
+        self.image_format = image_format
+        self.quality = quality
+        self.max_bytes = max_bytes
+        self.max_side = max_side
+        self.min_quality = min_quality
+        self.detail = detail
+
+    @classmethod
+    def from_env(cls) -> "EncodeSettings":
+        # jpeg at 512px with the low detail hint is plenty for identification, AI_IMAGE_* overrides
+        return cls(image_format=os.getenv("AI_IMAGE_FORMAT", "jpeg"), quality=int(os.getenv("AI_IMAGE_QUALITY", 85)),
+                   max_bytes=int(os.getenv("AI_IMAGE_MAX_BYTES", 120_000)), detail=os.getenv("AI_IMAGE_DETAIL", "low"))
+
+    def __repr__(self):
+        return f"EncodeSettings({self.image_format}, quality={self.quality}, max_bytes={self.max_bytes}, detail={self.detail})"
+
+def encode_frame(frame, settings:EncodeSettings) -> tuple[bytes, str]:
+    # numpy BGR frame -> (compressed bytes, mime type), never touches the disk
+    import cv2
+
+    extension, quality_flag, mime_type = IMAGE_FORMATS[settings.image_format]
+    quality_flag = getattr(cv2, quality_flag) if quality_flag else None
+
+    height, width = frame.shape[:2]
+    if settings.max_side and max(height, width) > settings.max_side:
+        scale = settings.max_side / max(height, width)
+        frame = cv2.resize(frame, (round(width * scale), round(height * scale)), interpolation=cv2.INTER_AREA)
+
+    quality = settings.quality
+    while True:
+        params = [quality_flag, quality] if quality_flag is not None else []
+        ok, encoded = cv2.imencode(extension, frame, params)
+        if not ok:
+            raise ValueError(f"Could not encode frame as {settings.image_format}")
+
+        payload = encoded.tobytes()
+
+        # step the quality down until we fit the byte budget
+        if quality_flag is None or settings.max_bytes is None or len(payload) <= settings.max_bytes or quality <= settings.min_quality:
+            return payload, mime_type
+
+        quality = max(settings.min_quality, quality - 10)
+
+def data_url(payload:bytes, mime_type:str) -> str:
+    return f"data:{mime_type};base64,{base64.b64encode(payload).decode()}"
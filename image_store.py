@@ -0,0 +1,97 @@
+import os
+import re
+import tempfile
+
+from database import allocate_sequence
+
+SHARD_SIZE = 1000       # images per sub-directory
+
+class ImageStore():
+    """ Numbered plant photos on disk.
+
+    Numbers come from an atomic sequence in the database, so saving doesn't list the
+    directory, deleted files don't cause reused names, and concurrent saves can't collide.
+    Files go into sharded sub-directories (plant_1234.png -> 0001/plant_1234.png) and are
+    written to a temp file then renamed, so a half-written photo is never visible.
+    Photos saved before sharding, straight in `root`, are still found by `find`.
+    """
+
+    def __init__(self, root:str, kind:str, prefix:str="plant", extension:str=".png", fsync:bool=True):
+        self.root = root
+        self.kind = kind
+        self.prefix = prefix
+        self.extension = extension
+        self.fsync = fsync
+
+    def shard_dir(self, number:int) -> str:
+        return os.path.join(self.root, f"{number // SHARD_SIZE:04d}")
+
+    def path_for(self, number:int) -> str:
+        return os.path.join(self.shard_dir(number), f"{self.prefix}_{number}{self.extension}")
+
+    def legacy_path_for(self, number:int) -> str:
+        return os.path.join(self.root, f"{self.prefix}_{number}{self.extension}")
+
+    def find(self, number:int) -> str | None:
+        # where photo `number` actually lives, sharded or legacy flat layout
+        for path in (self.path_for(number), self.legacy_path_for(number)):
+            if os.path.exists(path):
+                return path
+        return None
+
+    def next_number(self) -> int:
+        # the first allocation for a store seeds the sequence from whatever is already on disk
+        return allocate_sequence(self.kind, seed=self._highest_on_disk)
+
+    def _highest_on_disk(self) -> int:
+        # one-off scan, only used when the sequence doesn't exist yet
+        if not os.path.isdir(self.root):
+            return 0
+
+        pattern = re.compile(rf"^{re.escape(self.prefix)}_(\d+){re.escape(self.extension)}$")
+        highest = 0
+
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                match = pattern.match(filename)
+                if match:
+                    highest = max(highest, int(match.group(1)))
+
+        return highest
+
+    def save(self, image, number:int=None) -> tuple[int, str]:
+        # (number, path) of the newly written photo
+        number = self.next_number() if number is None else number
+        path = self.path_for(number)
+        self.write_atomic(path, image)
+
+        return number, path
+
+    def write_atomic(self, path:str, image) -> None:
+        write_image_atomic(path, image, fsync=self.fsync)
+
+def write_image_atomic(path:str, image, params:list=None, fsync:bool=True) -> None:
+    # encode, write to a temp file next to `path`, then rename over it
+    import cv2
+
+    extension = os.path.splitext(path)[1]
+    ok, encoded = cv2.imencode(extension, image, params or [])
+    if not ok:
+        raise ValueError(f"Could not encode image for {path}")
+
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=extension)
+    try:
+        with os.fdopen(fd, "wb") as temp_file:
+            temp_file.write(encoded.tobytes())
+            if fsync:
+                temp_file.flush()
+                os.fsync(temp_file.fileno())
+
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
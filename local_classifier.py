@@ -0,0 +1,144 @@
+# on-device first pass for "add a plant!": a small CPU model answers the easy frames,
+# only the ones it isn't sure about go on to gpt-4o
+import os
+import threading
+import time
+
+import numpy as np
+
+from metrics import metrics
+
+NOT_PLANT_PREFIX = "_"     # labels like "_background" / "_not_plant" are the not-a-plant classes
+
+def load_labels(path:str) -> list[str]:
+    # one label per line, in the model's output order
+    with open(path, encoding="utf8") as file:
+        return [line.strip() for line in file if line.strip()]
+
+def softmax(scores:np.ndarray) -> np.ndarray:
+    scores = scores - scores.max()
+    exp = np.exp(scores)
+    return exp / exp.sum()
+
+class Classification():
+    def __init__(self, plant_confidence:float, species:list[tuple[str, float]], elapsed:float):
+        self.plant_confidence = plant_confidence       # 1 - probability of every not-a-plant class
+        self.species = species                         # top k (label, confidence), best first
+        self.elapsed = elapsed
+
+    @property
+    def is_plant(self) -> bool:
+        return self.plant_confidence >= 0.5
+
+    @property
+    def best(self) -> tuple[str, float] | None:
+        return self.species[0] if self.species else None
+
+    def __repr__(self):
+        return f"Classification(plant={self.plant_confidence:.2f}, species={self.species})"
+
+class LocalPlantClassifier():
+    """ Plant/not-plant and top-k species from a CPU-only ONNX model run through OpenCV DNN.
+
+    The model is optional. Without the model or labels file `available` is False and
+    `classify` returns None, so every frame is escalated to the API exactly as before.
+    The network is loaded on first use and calls are serialised, cv2.dnn nets aren't
+    thread safe and the ai pool runs more than one worker.
+
+    `decide` only answers locally when the model is sure: a confident "no plant", or a
+    plant whose top species clears `species_threshold`. Everything else is escalated.
+    """
+
+    def __init__(self, model_path:str, labels_path:str=None, input_size:int=224, top_k:int=3,
+                 mean:tuple=(0.485, 0.456, 0.406), std:tuple=(0.229, 0.224, 0.225),
+                 not_plant_threshold:float=0.1, species_threshold:float=0.8):
+        self.model_path = model_path
+        self.labels_path = labels_path or os.path.splitext(model_path)[0] + ".labels.txt"
+        self.input_size = input_size
+        self.top_k = top_k
+        self.mean = np.asarray(mean, dtype=np.float32).reshape(1, 3, 1, 1)      # imagenet normalisation by default
+        self.std = np.asarray(std, dtype=np.float32).reshape(1, 3, 1, 1)
+        self.not_plant_threshold = not_plant_threshold
+        self.species_threshold = species_threshold
+
+        self.labels = None
+        self._net = None
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return os.path.exists(self.model_path) and os.path.exists(self.labels_path)
+
+    def _load(self):
+        import cv2
+
+        start = time.perf_counter()
+        self.labels = load_labels(self.labels_path)
+        self._plant_classes = np.array([not label.startswith(NOT_PLANT_PREFIX) for label in self.labels])
+
+        net = cv2.dnn.readNet(self.model_path)
+        net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)     # plain cpu, the default target
+
+        metrics.observe("local.model_load", time.perf_counter() - start)
+        return net
+
+    def preprocess(self, frame) -> np.ndarray:
+        # BGR uint8 frame (the 512x512 capture) -> normalised NCHW RGB float blob
+        import cv2
+
+        blob = cv2.dnn.blobFromImage(frame, scalefactor=1 / 255, size=(self.input_size, self.input_size), swapRB=True, crop=False)
+        return (blob - self.mean) / self.std
+
+    def classify(self, frame) -> Classification | None:
+        if not self.available:
+            return None
+
+        blob = self.preprocess(frame)
+
+        with self._lock:
+            if self._net is None:
+                self._net = self._load()
+
+            start = time.perf_counter()
+            self._net.setInput(blob)
+            scores = self._net.forward().reshape(-1).astype(np.float64)
+            elapsed = time.perf_counter() - start
+
+        if len(scores) != len(self.labels):
+            raise ValueError(f"Model has {len(scores)} outputs but {self.labels_path} has {len(self.labels)} labels")
+
+        # accept models that end in a softmax as well as ones that return logits
+        probabilities = scores if np.all(scores >= 0) and abs(scores.sum() - 1) < 1e-3 else softmax(scores)
+
+        plant_confidence = float(probabilities[self._plant_classes].sum())
+        species_probabilities = np.where(self._plant_classes, probabilities, 0) / max(plant_confidence, 1e-9)
+        top = np.argsort(species_probabilities)[::-1][:self.top_k]
+        species = [(self.labels[i], float(species_probabilities[i])) for i in top if self._plant_classes[i]]
+
+        metrics.observe("local.inference", elapsed)
+        return Classification(plant_confidence, species, elapsed)
+
+    def decide(self, result:Classification | None) -> tuple[bool, str | None]:
+        # (answered locally?, answer) where the answer follows identify_plant: None means "not a plant"
+        if result is None:
+            return False, None
+
+        if result.plant_confidence <= self.not_plant_threshold:
+            metrics.incr("local.answered")
+            return True, None
+
+        best = result.best
+        if result.is_plant and best is not None and best[1] * result.plant_confidence >= self.species_threshold:
+            metrics.incr("local.answered")
+            return True, best[0]
+
+        metrics.incr("local.escalated")
+        return False, None
+
+    def offline_answer(self, result:Classification | None) -> str | None:
+        # best local guess for when the escalation couldn't reach the api
+        if result is None or not result.is_plant:
+            return None
+        if result.best is None:
+            return "Possible plant, but unclear"
+        return f"Possibly {result.best[0]} ({result.best[1]:.0%} sure, offline)"
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, time
 from kivy.clock import Clock        # for scheduling when to update time for greeting
 
 from kivy.app import App
@@ -6,6 +6,9 @@ from kivy.metrics import dp
 from kivy.uix.image import Image
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.scrollview import ScrollView
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.factory import Factory
 from kivy.uix.textinput import TextInput
 from kivy.uix.spinner import Spinner
 from kivy.uix.checkbox import CheckBox
@@ -15,7 +18,6 @@ from kivy.lang import Builder
 from kivy.uix.label import Label
 from kivy.uix.button import Button
 from kivy.uix.widget import Widget
-from kivy.uix.camera import Camera  # for taking photos
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.behaviors import ButtonBehavior
 from kivy.uix.screenmanager import ScreenManager, Screen    # for the diff screens
@@ -28,28 +30,54 @@ from kivy.lang import Builder
 from kivymd.app import MDApp
 from kivymd.uix.boxlayout import MDBoxLayout
 from kivymd.uix.button import MDFillRoundFlatButton
-from kivymd.uix.pickers import MDDatePicker
 from kivymd.uix.textfield import MDTextField
 from kivymd.uix.label import MDLabel
-from kivymd.uix.list import MDList, OneLineListItem
+from kivymd.uix.list import OneLineListItem
 from kivy.core.text import LabelBase    # for fonts
 from kivy.graphics.texture import Texture   # for camera screen display?
 
 import os
-from PIL import Image as PILImage  # for image manipulation
-import cv2      # for camera display
-
-import openai
-import base64
-
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-
-if not OPENAI_API_KEY:
-    raise ValueError("Missing OpenAI API key! Set it into your environment w/ 'export OPENAI_API_KEY=""'")
-
-from database import DB
+from bisect import bisect_left
+import numpy as np
+
+# cv2, openai/httpx and the date picker are imported where they're first used, not here,
+# so none of them are paid for before the first frame
+
+from database import DB, warm_up_in_background
+from ai_worker import AIWorkerPool, schedule_on_ui_thread
+from change_events import DELETE, INSERT, UPDATE, changes
+from care_list import CareList, seconds_until_midnight
+from reminders import ReminderEngine
+from camera_service import CameraService
+from frame_pipeline import FramePipeline, CenterCrop, Resize
+from image_store import ImageStore
+from plant_ai import PlantAIService
+from image_encoding import EncodeSettings
+from metrics import metrics
+from result_cache import AnalysisCache
+from thumbnails import TextureCache, make_thumbnails, THUMBNAIL_SIZES
+from recycle_layout import FixedSizeRecycleBoxLayout
+from local_classifier import LocalPlantClassifier
+from analysis import PlantAnalyser
 dir_path = os.path.dirname(os.path.realpath(__file__))
 db = DB()
+warm_up_in_background()     # schema checks + first connection while kivy sets up the window
+
+AI_MAX_WORKERS = int(os.getenv("AI_MAX_WORKERS", 2))     # how many openai requests can be in flight at once
+ai_pool = AIWorkerPool(max_workers=AI_MAX_WORKERS)
+AI_IMAGE_SETTINGS = EncodeSettings.from_env()      # vision payload settings
+ai_service = PlantAIService(max_connections=AI_MAX_WORKERS, encode_settings=AI_IMAGE_SETTINGS)    # one pooled client shared by every request, built on the first one
+analysis_cache = AnalysisCache(lazy=True)
+care_list = CareList(db)        # each day's water/fertiliser list, patched by plant changes instead of requeried
+changes.subscribe("plant", care_list.on_plant_changed, dispatch=schedule_on_ui_thread)
+# water/fertiliser reminders while the app is open, runs on its own thread (reminders.py has the headless version)
+reminders = ReminderEngine(lambda fired: schedule_on_ui_thread(lambda: MDApp.get_running_app().show_reminders(fired)),
+                           remind_at=time.fromisoformat(os.getenv("BESTBUDS_REMIND_AT", "09:00")))
+changes.subscribe("plant", reminders.on_plant_changed)
+# optional on-device model, frames it's sure about never reach openai. without the model file every frame is escalated
+plant_classifier = LocalPlantClassifier(os.getenv("PLANT_MODEL_PATH", os.path.join(dir_path, "models", "plant_classifier.onnx")),
+                                        species_threshold=float(os.getenv("PLANT_MODEL_THRESHOLD", 0.8)))
+analyser = PlantAnalyser(ai_service, analysis_cache, plant_classifier)      # same pipeline the headless server uses
 
 LabelBase.register(name="MainFont", fn_regular="static/fonts/EB_Garamond_static/EBGaramond-SemiBold.ttf")
 LabelBase.register(name="SecondaryFont", fn_regular="static/fonts/Comfortaa_static/Comfortaa-Light.ttf")
@@ -59,6 +87,9 @@ if not os.path.exists("images"):
     
 KV_FILES = ["home.kv", "calendar.kv", "camera.kv", "settings.kv"]   # load in the diff screens
 
+CAPTURE_SIZE = 512      # captured photos are square crops resized to this
+NO_PHOTO_ICON = f"{dir_path}/static/icons/camera_icon.png"     # plant cards without a (readable) photo
+
 COLOURS = {
     "active": (0.576, 0.749, 0.51, 1),        # dark green
     "inactive": (0.659, 0.859, 0.576, 1),         # light green
@@ -69,6 +100,33 @@ Window.size = (720/2, 1280/2)
 Window.resizable = False
 
 
+# numbered photo stores, numbering comes from the database rather than counting files
+plant_images = ImageStore(os.path.join(dir_path, "images", "plants"), "plants")
+health_images = ImageStore(os.path.join(dir_path, "images", "health"), "health")
+plant_textures = TextureCache(max_bytes=int(os.environ.get("TEXTURE_CACHE_BYTES", 32 * 1024 * 1024)))     # decoded card thumbnails
+
+capture_pipeline = FramePipeline(CenterCrop(), Resize(CAPTURE_SIZE))     # photos sent for identification / saved
+
+def save_plant_photo(image) -> tuple[int, str]:
+    # runs on the worker pool: write + fsync + rename and both thumbnail encodes stay out of the UI frame
+    number, filename = plant_images.save(image)
+    make_thumbnails(image, filename)
+    return number, filename
+
+def attach_plant_photo(plant_id:int, image) -> str:
+    # worker pool: the new plant form's photo, linked to the plant once it's saved (its card picks it up from the change event)
+    number, filename = save_plant_photo(image)
+    db.update_plant(plant_id, image_number=number)
+    return filename
+
+def frame_to_texture(frame):
+    # opencv BGR frame -> kivy texture, flipped through the uv coords rather than copying pixels
+    texture = Texture.create(size=(frame.shape[1], frame.shape[0]), colorfmt='bgr')
+    texture.flip_vertical()
+    texture.blit_buffer(np.ascontiguousarray(frame).reshape(-1), colorfmt='bgr', bufferfmt='ubyte')
+    return texture
+
+
 class CustomImageButton(RelativeLayout):
     image_source = StringProperty("")
     screen_name = StringProperty("")
@@ -90,10 +148,13 @@ class HomeScreen(Screen):
         self.add_widget(self.layout)
 
 class CalendarScreen(Screen):
+    ROW_HEIGHT = dp(48)     # a OneLineListItem
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
-        self.plants_needing_water = []
+        self.care = None        # DailyCare of the date being shown
+        self.showing_empty = False      # the list holds the "no plants" row
         
         self.layout = MDBoxLayout(orientation="vertical", spacing=10, padding=10)
         
@@ -101,44 +162,91 @@ class CalendarScreen(Screen):
         self.title_label = MDLabel(text="Plants to Water Today:", font_style="H5", size_hint_y=None, height=50)
         self.layout.add_widget(self.title_label)
 
-        self.scroll_view = ScrollView()
-        self.plant_list = MDList()
-        self.scroll_view.add_widget(self.plant_list)
-        self.layout.add_widget(self.scroll_view)
+        # recycled fixed height rows like the plant carousel, only the ones on screen exist as widgets
+        # and a changed plant doesn't relayout every row
+        self.plant_list = RecycleView()
+        rows = FixedSizeRecycleBoxLayout(orientation="vertical", size_hint_y=None, default_size=(None, self.ROW_HEIGHT), default_size_hint=(1, None))
+        rows.bind(minimum_height=rows.setter("height"))
+        self.plant_list.add_widget(rows)
+        self.plant_list.viewclass = OneLineListItem     # after the layout is added, so it reaches it
+        self.layout.add_widget(self.plant_list)
 
         self.add_widget(self.layout)
 
-        self.update_plant_list(datetime.today().strftime("%Y-%m-%d"))
+        # saved / edited / deleted plants come through as row edits on the cached day
+        care_list.watch(self.on_care_changed)
 
-    def update_plant_list(self, selected_date_str:str):
-        #clear previous list
-        self.plant_list.clear_widgets()
+    def on_pre_enter(self):
+        self.show_today()
 
-        #get the plants for the selected date
-        user_plants = db.get_user_plants()
+    def show_today(self):
+        # the shown list is kept up to date while it's cached, so only a new day needs work
+        today = datetime.today().date()
+        if self.care is None or self.care.day != today:
+            self.update_plant_list(today.strftime("%Y-%m-%d"))
 
+    def update_plant_list(self, selected_date_str:str):
         selected_date = datetime.strptime(selected_date_str, "%Y-%m-%d").date()
 
-        for plant in user_plants:
-            delta_days = (selected_date - plant.birth_date).days
+        #get the plants for the selected date, worked out once per day by the care list
+        self.care = care_list.get(selected_date)
+        self.showing_empty = not self.care.water
+        self.plant_list.data = [self.watering_row(item) for item in self.care.water] or [self.empty_row()]
 
-            if delta_days >= 0 and delta_days % plant.water_frequency == 0:
-                self.plants_needing_water.append(plant)
+    def watering_row(self, item) -> dict:
+        return {"text": f"{item.name} - Water every {item.water_frequency} days"}
 
-        if len(self.plants_needing_water) > 0:
-            for plant in self.plants_needing_water:
-                self.plant_list.add_widget(OneLineListItem(text=f"{plant.name} - Water every {plant.water_frequency} days"))
-        else:
-            self.plant_list.add_widget(OneLineListItem(text="No plants need watering."))
+    def empty_row(self) -> dict:
+        return {"text": "No plants need watering."}
+
+    def on_care_changed(self, daily, edits):
+        if self.care is None:
+            return      # not shown yet, on_pre_enter will fill it
+        if daily is None:
+            # bulk import, the cached days were dropped
+            self.update_plant_list(self.care.day.strftime("%Y-%m-%d"))
+            return
+        if daily is not self.care:
+            return
+
+        # only the changed plants' rows are added, relabelled or removed
+        data = self.plant_list.data
+        for care, op, index, item in edits:
+            if care != "water":
+                continue
+
+            if op == UPDATE:
+                data[index] = self.watering_row(item)
+            elif op == INSERT:
+                if self.showing_empty:
+                    data.pop()
+                    self.showing_empty = False
+                data.insert(index, self.watering_row(item))
+            else:
+                del data[index]
+
+        if not data:
+            self.showing_empty = True
+            data.append(self.empty_row())
 
 
 class CameraScreen(Screen):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+
+        # camera is read on its own thread, the preview just picks up the newest frame
+        self.camera = CameraService()
+        self.last_preview_sequence = 0
+
+        # preview resources, created once per widget size and reused every frame
+        self.preview_texture = None
+        self.preview_pipeline = None
+        self.preview_buffer = None
+
     def on_enter(self):
         # start the opencv camera feed when entering the screen
-        self.capture = cv2.VideoCapture(0)
-        
         # check if cam opens properly
-        if not self.capture.isOpened():
+        if not self.camera.start():
             print("Error: unable to access camera")
             return
         
@@ -146,33 +254,40 @@ class CameraScreen(Screen):
         
     def on_leave(self):
         # stop camera when leaving
-        self.capture.release()
         Clock.unschedule(self.update_camera)
+        self.camera.stats()         # fps / dropped frames / frame age into metrics for the report on exit
+        self.camera.stop()
     
     def update_camera(self, dt):
-        # Capture frame from OpenCV
-        ret, frame = self.capture.read()
-        if ret:
-            # Get frame dimensions
-            height, width, _ = frame.shape
-
-            # Determine the smaller dimension to create a square crop
-            min_dim = min(height, width)
-            x_start = (width - min_dim) // 2  # Center crop horizontally
-            y_start = (height - min_dim) // 2  # Center crop vertically
-            cropped_frame = frame[y_start:y_start + min_dim, x_start:x_start + min_dim]
+        # newest frame from the capture thread, never blocks
+        frame, sequence = self.camera.latest_frame()
+        if frame is not None and sequence != self.last_preview_sequence:
+            self.last_preview_sequence = sequence
 
             # Resize to match widget size without distortion
             square_size = int(min(self.ids.camera_widget.size))
-            frame_resized = cv2.resize(cropped_frame, (square_size, square_size), interpolation=cv2.INTER_AREA)
+            if square_size <= 0:
+                return
+
+            texture = self.get_preview_texture(square_size)
+            self.preview_pipeline.process(frame, out=self.preview_buffer)
 
-            # Convert frame to texture
-            buf = cv2.flip(frame_resized, 0).tobytes()
-            texture = Texture.create(size=(frame_resized.shape[1], frame_resized.shape[0]), colorfmt='bgr')
-            texture.blit_buffer(buf, colorfmt='bgr', bufferfmt='ubyte')
+            # upload straight from the reused buffer into the existing texture
+            texture.blit_buffer(self.preview_buffer.reshape(-1), colorfmt='bgr', bufferfmt='ubyte')
+            self.ids.camera_widget.canvas.ask_update()
+
+    def get_preview_texture(self, square_size):
+        # only rebuilt when the widget changes size
+        if self.preview_texture is None or self.preview_texture.width != square_size:
+            self.preview_texture = Texture.create(size=(square_size, square_size), colorfmt='bgr')
+            self.preview_texture.flip_vertical()    # opencv rows run top-down, flip the uv coords instead of the pixels
+            self.preview_pipeline = FramePipeline(CenterCrop(), Resize(square_size))
+            self.preview_buffer = np.empty((square_size, square_size, 3), dtype=np.uint8)
 
             # Assign the texture to the camera widget
-            self.ids.camera_widget.texture = texture
+            self.ids.camera_widget.texture = self.preview_texture
+
+        return self.preview_texture
 
 
 class SettingsScreen(Screen):
@@ -194,12 +309,9 @@ class BestBuds(MDApp):
         self.root = root
 
         screen_manager = root.ids.screen_manager
-        screen_manager.clear_widgets()
-    
-        screen_manager.add_widget(HomeScreen(name="home"))
-        screen_manager.add_widget(CalendarScreen(name="calendar"))
-        screen_manager.add_widget(CameraScreen(name="camera"))
-        screen_manager.add_widget(SettingsScreen(name="settings"))
+
+        # only the home screen is built up front, the rest on their first visit (see get_screen)
+        self.get_screen("home")
 
         self.buttons = {
             "home": self.root.ids.home_button,
@@ -213,9 +325,21 @@ class BestBuds(MDApp):
         
         self.update_greeting()
         Clock.schedule_once(self.update_greeting, 0.5)  # makes sure it updates after the UI loads
+        self.schedule_midnight()
+        reminders.start(db)
         self.change_user_name("Tara")
         return root
     
+    def on_stop(self):
+        # drop any analyses still queued when the window closes
+        reminders.stop()
+        ai_pool.shutdown()
+        ai_service.close()
+        analysis_cache.flush()      # last_used of this session's cache hits
+        plant_textures.shutdown()
+
+        print(metrics.report())
+
     def load_kv_files(self):
         # load the kv files
         for kv_file in KV_FILES:
@@ -226,9 +350,19 @@ class BestBuds(MDApp):
             else:
                 print(f"NOOOOOOOO: this {kv_file} not found!")
 
+    def get_screen(self, screen_name):
+        # the named screen, built and added to the screen manager the first time it's asked for
+        screen_manager = self.root.ids.screen_manager
+        if not screen_manager.has_screen(screen_name):
+            if screen_name not in SCREENS:
+                return None
+            screen_manager.add_widget(SCREENS[screen_name](name=screen_name))
+
+        return screen_manager.get_screen(screen_name)
+
     def change_screen(self, screen_name, button):
         
-        if screen_name in self.root.ids.screen_manager.screen_names:
+        if self.get_screen(screen_name) is not None:
             self.current_screen = screen_name           # updates current screen
             self.root.ids.screen_manager.current = screen_name      # updates current screen
             # self.update_button_colour()
@@ -264,6 +398,21 @@ class BestBuds(MDApp):
 
         self.root.ids.greeting_label.text = self.greeting_text
 
+    def schedule_midnight(self):
+        # the date changes under a long running app too, so move everything on just after midnight
+        Clock.schedule_once(self.on_midnight, seconds_until_midnight() + 1)
+
+    def on_midnight(self, dt):
+        # yesterday's lists are dropped and today's is built once, here rather than on the next visit
+        care_list.roll_over()
+        self.update_greeting()
+
+        screen_manager = self.root.ids.screen_manager
+        if screen_manager.has_screen("calendar"):
+            screen_manager.get_screen("calendar").show_today()
+
+        self.schedule_midnight()        # rescheduled every time, a slept device may wake late or early
+
     def update_button_colour(self):
         pass
         # print(self.current_screen)
@@ -281,195 +430,107 @@ class BestBuds(MDApp):
         self.username = new_name  
         self.update_greeting()    
         
-        # if settings screen is open, update textinput value
-        if self.root:
+        # if settings screen has been built, update textinput value (a new one picks up app.username itself)
+        if self.root and self.root.ids.screen_manager.has_screen("settings"):
             settings_screen = self.root.ids.screen_manager.get_screen("settings")
-            if settings_screen:
-                settings_screen.ids.username_input.text = new_name
+            settings_screen.ids.username_input.text = new_name
             
     def capture_picture(self, identify=True):
         # take piccy
-        camera_screen = self.root.ids.screen_manager.get_screen("camera")
+        camera_screen = self.get_screen("camera")
         
-        #get piccy from opencv
-        ret, frame = camera_screen.capture.read()
-        if not ret:
+        #get piccy from the camera thread
+        frame, _ = camera_screen.camera.latest_frame()
+        if frame is None:
             print("No photo captured :(")
             return
         
-        # Get frame dimensions
-        height, width, _ = frame.shape
-
-        # Determine the smaller dimension for cropping to a square
-        min_dim = min(height, width)
-        x_start = (width - min_dim) // 2  # Center crop horizontally
-        y_start = (height - min_dim) // 2  # Center crop vertically
-        cropped_frame = frame[y_start:y_start + min_dim, x_start:x_start + min_dim]  # Crop square region
-
-        # Resize (optional) - Keeps the image consistent in size
-        final_size = 512  # Example size, adjust as needed
-        final_image = cv2.resize(cropped_frame, (final_size, final_size), interpolation=cv2.INTER_AREA)
-
-        # Convert OpenCV image to Kivy Texture
-        buf = cv2.flip(final_image, 0).tobytes()
-        texture = Texture.create(size=(final_image.shape[1], final_image.shape[0]), colorfmt='bgr')
-        texture.blit_buffer(buf, colorfmt='bgr', bufferfmt='ubyte')
+        # square crop + resize to 512, copied out since the popup and ai worker hold onto it
+        final_image = capture_pipeline.process(frame, copy=True)
+        texture = frame_to_texture(final_image)
 
         # Show confirmation popup with the generated texture
         self.show_confirmation_popup(final_image, texture, identify)
 
     def save_captured_image(self, image, popup, identify=True):
         # print(f"✅ save_captured_image() called. Identify = {identify}")
-        
-        #check if directory exists yet
-        if not os.path.exists("images"):
-            os.makedirs("images")
-            
-        save_dir = "images/plants" if identify else "images/health"
-        
-        # check how many already exist in the folder to number then sequentially number them
-        existing_images = [f for f in os.listdir(save_dir) if f.endswith(".png")]
-        next_number = len(existing_images) + 1
-        
-        # create the filename first - but don't save yet
-        filename = f"{save_dir}/plant_{next_number}.png"
-        cv2.imwrite(filename, image)  # save the cropped image
-        
-        if not os.path.exists(save_dir):
-            os.makedirs(save_dir)
-        
-        plant_name, health_status = None, None      # initialise to prevent unboundlocalerror
+        popup.dismiss()
 
+        # the openai call runs on the worker pool so the camera preview keeps going
+        # the frame is sent straight from memory, it only gets written to disk (on the same worker) once we know we're keeping it
         if identify:
-            # print("🟢 Calling identify_plant_with_openai()...")
-            plant_name = self.identify_plant_with_openai(filename)
-            print(f"🔍 Plant name received: {plant_name}")
-            if plant_name: 
-                message = f"Identified Plant: {plant_name}"
-            else:
-                message = "This does not appear to be a plant :("  
+            pending_popup = self.show_pending_popup("Identifying your plant...")
+            ai_pool.submit(self.identify_and_save, image, on_result=lambda result: self.on_identify_result(*result, pending_popup),
+                           on_error=lambda error: self.on_save_failed(error, pending_popup))
         else:
-            health_status = self.check_plant_health(filename)        
-            if health_status:
-                message = f"Health status: {health_status}"
-            else:
-                message = "No issues detected - you have a healthy plant!"
-                
-        if identify and plant_name is None:
-            popup.dismiss()
+            pending_popup = self.show_pending_popup("Checking your plant's health...")
+            ai_pool.submit(self.check_and_save, image, on_result=lambda result: self.on_health_result(*result, pending_popup),
+                           on_error=lambda error: self.on_save_failed(error, pending_popup))
+
+    def identify_and_save(self, image):
+        # worker thread -> (plant name, saved photo), only plants are kept
+        plant_name = self.identify_plant_with_openai(image)
+        return plant_name, save_plant_photo(image)[1] if plant_name is not None else None
+
+    def check_and_save(self, image):
+        # worker thread -> (health status, saved photo)
+        health_status = self.check_plant_health(image)
+        _, filename = health_images.save(image)
+        return health_status, filename
+
+    def on_identify_result(self, plant_name, filename, pending_popup):
+        # back on the UI thread once identify_and_save finishes
+        pending_popup.dismiss()
+        print(f"🔍 Plant name received: {plant_name}")
+
+        if plant_name is None:
             msg = "This is not a plant, image will not be saved!"
             self.not_a_plant_popup(msg)
-            return  # exit function without saving
-        
+            return  # nothing was saved
+
+        self.show_saved_result(f"Identified Plant: {plant_name}", filename)
+
+    def on_health_result(self, health_status, filename, pending_popup):
+        # back on the UI thread once check_and_save finishes
+        pending_popup.dismiss()
+
+        if health_status:
+            message = f"Health status: {health_status}"
+        else:
+            message = "No issues detected - you have a healthy plant!"
+
+        self.show_saved_result(message, filename)
+
+    def on_save_failed(self, error, pending_popup):
+        # the photo couldn't be written (disk full, permissions...), the analysis errors are handled in the workers
+        pending_popup.dismiss()
+        print(f"Saving photo failed: {error}")
+        self.show_ai_result_popup(f"Couldn't save the photo: {error}")
+
+    def show_saved_result(self, message, filename):
         if os.path.exists(filename):
             print(f"{filename} picture saved!")
         else:
             print(f"where'd my photo go")
-            
-        popup.dismiss()
-        # wait for user confirmation
-        # Convert OpenCV image to Kivy Texture
-        # buf = cv2.flip(final_image, 0).tobytes()
-        # texture = Texture.create(size=(final_image.shape[1], final_image.shape[0]), colorfmt='bgr')
-        # texture.blit_buffer(buf, colorfmt='bgr', bufferfmt='ubyte')
-        
-        
+
         # print to terminal
         print(message)
         
         #show in a popup
         self.show_ai_result_popup(message)
     
-    def identify_plant_with_openai(self, image_path):
-        
-        client = openai.OpenAI(api_key=OPENAI_API_KEY)
-        # openai.api_key = OPENAI_API_KEY   # deprecated..
-        
+    def identify_plant_with_openai(self, image):
+        # runs on the ai worker pool, the local model gets first go, then the cache, then openai
         try:
-            # read file in binary code
-            with open(image_path, "rb") as image_file:
-                image_data = image_file.read()
-                print(f"image size: {len(image_data)} bytes")
-                if len(image_data) < 1000:
-                    print("Image file is too small! Check if it's being saved correctly.")
-                base64_image = base64.b64encode(image_data).decode()
-                
-            response = client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert botanist. Identify the plant in the given image.\n"
-                                    "If the image contains leaves, stems, flowers, or any other plant part, describe the most likely plant.\n"
-                                    "If the image contains no plant, say 'No plant detected'.\n"
-                                    "If unsure, say 'Unclear, but this might be a plant"
-                    },
-                    {
-                        "role": "user",
-                        "content": [
-                            {"type": "text", "text": "Is there a plant? If so, what plant is this?"},
-                            {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{base64_image}"}}
-                        ]
-                    }
-                ],
-                max_tokens=100
-            )
-            
-            # print(f"🟢 OpenAI Raw Response: {response}")
-            result = response.choices[0].message.content.strip()
-            
-            if "no plant" in result.lower() or "not a plant" in result.lower():
-                return None
-            if "unclear" in result.lower():
-                return "Possible plant, but unclear"
-            # else
-            return result
-        
+            return analyser.identify(image)
         except Exception as e:
             print(f"Error identifying plant: {e}")
             return None
 
-    def check_plant_health(self, image_path):
-        
-        client = openai.OpenAI(api_key=OPENAI_API_KEY)
-        # openai.api_key = OPENAI_API_KEY   # deprecated..
-        
+    def check_plant_health(self, image):
+        # runs on the ai worker pool, the same (or a near identical) photo is answered from the cache
         try:
-            # read file in binary code
-            with open(image_path, "rb") as image_file:
-                base64_image = base64.b64encode(image_file.read()).decode()
-                
-            response = client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a plant health expert. Check for any disease, damage, or concerns in the plant image."
-                                    "If the of the plant is healthy, say 'Nothing wrong here'"
-                                    "If unsure, say 'Unclear"
-                    },
-                    {
-                        "role": "user", "content": [
-                            {"type": "text", "text": "Does this plant look healhty?"},
-                            {
-                                "type": "image_url",
-                                "image_url": {"url": f"data:image/png;base64,{base64_image}"}
-                            }
-                        ]
-                    }
-                ],
-                max_tokens=50
-            )
-                
-            result = response.choices[0].message.content.strip()
-            
-            if "nothing wrong" in result.lower():
-                return None
-            if "unclear" in result.lower():
-                return "Possible damage, but unsure"
-            # else
-            return result
-        
+            return analyser.check_health(image)
         except Exception as e:
             print(f"Error identifying health: {e}")
             return None
@@ -525,6 +586,34 @@ class BestBuds(MDApp):
         popup.background_color = (1,1,1,1)
         popup.open()
 
+    def show_reminders(self, fired):
+        # one popup for everything that came due together
+        lines = []
+        for care, verb in (("water", "Water"), ("fertiliser", "Fertilise")):
+            names = [reminder.name for reminder in fired if reminder.care == care]
+            if names:
+                more = f" and {len(names) - 5} more" if len(names) > 5 else ""
+                lines.append(f"{verb}: {', '.join(names[:5])}{more}")
+
+        self.show_ai_result_popup("\n".join(lines))
+
+    def show_pending_popup(self, message):
+        # shown while an ai request is in flight, closed by the result callback
+        layout = BoxLayout(orientation="vertical", spacing=10, padding=10)
+
+        pending_label = Label(text=message, color=(0,0,0,1), font_size=25, font_name="SecondaryFont", halign="center", valign="center")
+        pending_label.bind(size=pending_label.setter("text_size"))
+
+        layout.add_widget(pending_label)
+
+        popup = Popup(title="Analysing", content=layout, size_hint=(0.8, 0.3), auto_dismiss=True)
+        popup.background = ""
+        popup.title_size = 0
+        popup.background_color = (1,1,1,1)
+        popup.open()
+
+        return popup
+
     def not_a_plant_popup(self, msg):
         # popup for when no plant is detected
         layout = BoxLayout(orientation="vertical", spacing=10, padding=10)
@@ -545,34 +634,119 @@ class BestBuds(MDApp):
         popup.open()
         
 
-class PlantViewer(ScrollView):
+class PlantViewer(RecycleView):
+    PAGE_SIZE = 30          # plants pulled from the db at a time
+    CARD_SIZE = (200, 300)
+    CARD_SPACING = 30
+    PREFETCH_CARDS = 5      # load the next page once we scroll within this many cards of the end
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        
-        self.layout = BoxLayout(orientation="horizontal", padding=10, spacing=30, size_hint=(None, 1))
+        self.do_scroll_x = True
+        self.do_scroll_y = False
+
+        # only the cards in view (+ a little overscan) exist as widgets, they get recycled as you scroll
+        # fixed card width -> adding/removing a card costs the same with 30 or 10k plants
+        self.layout = FixedSizeRecycleBoxLayout(orientation="horizontal", padding=10, spacing=self.CARD_SPACING, size_hint=(None, 1),
+                                                default_size=self.CARD_SIZE, default_size_hint=(None, 0.5))
         self.layout.bind(minimum_width=self.layout.setter("width"))
+        self.add_widget(self.layout)
 
-        plants = db.get_user_plants()
-        self.populate_plants(plants)
+        self.viewclass = PlantWidget
+        self.key_viewclass = "viewclass"
 
-        #add new plant button
-        create_plant_btn = NewPlant(size_hint=(None, None), size=(200, 300))
-        create_plant_btn.size_hint_y = 0.5
-        self.layout.add_widget(create_plant_btn)
-        self.add_widget(self.layout)
-    
-    def populate_plants(self, plants:list) -> None:
-        for i in range(len(plants)):
-            btn = PlantWidget(size_hint=(None, None), size=(200, 300))
-            btn.set_image(plants[i].id)
-            btn.set_name(plants[i].name, plants[i].species)
-            self.layout.add_widget(btn)
+        self.last_plant_id = 0
+        self.plant_ids = []         # plant id of each card in self.data, ascending
+        self.all_loaded = False
+        self.scroll_anchor = None   # pixel offset to hold while a new page is laid out
+
+        #add new plant button, always the last card
+        self.data = [{"viewclass": "NewPlant", "size_hint_y": 0.25}]
+        Clock.schedule_once(self.load_next_page)    # after the first frame, not while the app is being built
 
+        self.bind(scroll_x=self.check_load_more, width=self.check_load_more)
+        self.layout.bind(width=self.keep_scroll_position)
 
-class PlantWidget(ButtonBehavior, BoxLayout):
+        changes.subscribe("plant", self.on_plant_changed, dispatch=schedule_on_ui_thread)
+
+    def load_next_page(self, *args) -> None:
+        if self.all_loaded:
+            return
+
+        plants = db.get_plant_page(after_id=self.last_plant_id, limit=self.PAGE_SIZE)
+        if len(plants) < self.PAGE_SIZE:
+            self.all_loaded = True
+
+        if plants:
+            self.last_plant_id = plants[-1].id
+            self.scroll_anchor = self.scroll_x * max(self.layout.width - self.width, 0)
+            self.populate_plants(plants)
+
+    def populate_plants(self, plants:list) -> None:
+        self.append_cards([self.card(plant.id, plant.name, plant.species, plant.image_number) for plant in plants])
+
+    def append_cards(self, cards:list) -> None:
+        # slot the new cards in before the new plant button
+        # (pop + extend are applied incrementally by the recycleview, a slice assignment isn't)
+        new_plant_card = self.data.pop()
+        self.data.extend(cards + [new_plant_card])
+        self.plant_ids.extend(card["plant_id"] for card in cards)
+
+    def card(self, plant_id, name, species, image_number) -> dict:
+        return {"plant_id": plant_id, "name": name, "species": species, "image_number": image_number}
+
+    def on_plant_changed(self, event):
+        # patch just the affected cards, the recycleview re-lays out only what changed
+        appended = []
+
+        for row in event.rows:
+            plant_id = row["id"]
+            index = bisect_left(self.plant_ids, plant_id)
+            shown = index < len(self.plant_ids) and self.plant_ids[index] == plant_id
+
+            if event.op == DELETE:
+                if shown:
+                    del self.plant_ids[index]
+                    del self.data[index]
+            elif shown:
+                self.data[index] = self.card(plant_id, row["name"], row["species"], row["image_number"])
+            elif event.op == INSERT and plant_id > self.last_plant_id:
+                # past the loaded pages -> it'll turn up with them, unless everything is loaded already
+                if self.all_loaded:
+                    appended.append(row)
+            elif event.op == INSERT:
+                self.plant_ids.insert(index, plant_id)
+                self.data.insert(index, self.card(plant_id, row["name"], row["species"], row["image_number"]))
+
+        if len(appended) > self.PAGE_SIZE:
+            # a bulk import -> let the pager pull them in as the user scrolls
+            self.all_loaded = False
+            self.check_load_more()
+        elif appended:
+            self.append_cards([self.card(row["id"], row["name"], row["species"], row["image_number"]) for row in sorted(appended, key=lambda row: row["id"])])
+            self.last_plant_id = self.plant_ids[-1]
+
+    def keep_scroll_position(self, *args) -> None:
+        # scroll_x is a fraction, so without this the view would jump when the content gets wider
+        hidden_width = self.layout.width - self.width
+        if self.scroll_anchor is not None and hidden_width > 0:
+            self.scroll_x = min(1, self.scroll_anchor / hidden_width)
+        self.scroll_anchor = None
+
+    def check_load_more(self, *args) -> None:
+        # pixels of cards still hidden off the right hand side
+        hidden_width = self.layout.width - self.width
+        remaining = (1 - self.scroll_x) * hidden_width if hidden_width > 0 else 0
+
+        if remaining < self.PREFETCH_CARDS * (self.CARD_SIZE[0] + self.CARD_SPACING):
+            self.load_next_page()
+
+
+class PlantWidget(RecycleDataViewBehavior, ButtonBehavior, BoxLayout):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.size_hint_y = 0.5
+        self.plant_id = None
 
         with self.canvas.before:
             Color(0.8, 0.8, 0.8, 1)
@@ -597,8 +771,33 @@ class PlantWidget(ButtonBehavior, BoxLayout):
         self.background.pos = (self.x + 2, self.y + 2)
         self.background.size = (self.width - 4, self.height - 4)
 
-    def set_image(self, plant_id):
-        self.image.source = f"{dir_path}/images/plants/plant_{plant_id}.png"
+    def refresh_view_attrs(self, rv, index, data):
+        # a recycled card being pointed at a different plant
+        self.plant_id = data["plant_id"]
+        self.set_image(data["plant_id"], data["image_number"])
+        self.set_name(data["name"], data["species"])
+
+    def set_image(self, plant_id, image_number):
+        # card sized thumbnail decoded off the UI thread, the HiDPI one on dense screens
+        self.image.source = ""
+        self.image.texture = None
+        path = plant_images.find(image_number) if image_number is not None else None
+        if path is None:
+            self.image.source = NO_PHOTO_ICON
+            return
+
+        size = THUMBNAIL_SIZES[1] if dp(1) > 1 else THUMBNAIL_SIZES[0]
+        plant_textures.request(path, size, lambda texture: self.on_texture_loaded(plant_id, texture))
+
+    def on_texture_loaded(self, plant_id, texture):
+        # the card may have been recycled for another plant while this was decoding
+        if plant_id != self.plant_id:
+            return
+
+        if texture is None:
+            self.image.source = NO_PHOTO_ICON       # the photo couldn't be read
+        else:
+            self.image.texture = texture
 
     def set_name(self, name, species):
         self.label.text = f"{name} - {species}"
@@ -607,7 +806,7 @@ class PlantWidget(ButtonBehavior, BoxLayout):
         print("Rounded button pressed!")
 
 
-class NewPlant(ButtonBehavior, BoxLayout):
+class NewPlant(RecycleDataViewBehavior, ButtonBehavior, BoxLayout):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.size_hint_y = 0.25
@@ -633,12 +832,16 @@ class NewPlant(ButtonBehavior, BoxLayout):
         self.background.pos = (self.x + 2, self.y + 2)
         self.background.size = (self.width - 4, self.height - 4)
 
-    def set_image(self, plant_id):
-        self.image.source = f"{dir_path}/images/plants/plant_{plant_id}.png"
+    def set_image(self, image_number):
+        self.image.source = plant_images.find(image_number) or ""
 
     def set_name(self, name):
         self.label.text = name
 
+    def refresh_view_attrs(self, rv, index, data):
+        # nothing plant specific to show, just the plus icon
+        pass
+
     def on_press(self):
         content = PlantForm(size_hint=(1,1))
         popup = CustomPopup(content=content, auto_dismiss=True, size_hint=(0.8,0.8), title="Add new plant to your collection!", background="", background_color=(0,0,0,0), separator_color=(0,0,0,0))
@@ -701,6 +904,8 @@ class PlantForm(BoxLayout):
         self.submit_btn = Button(text="Submit", size_hint_y=None, height=50)
         self.submit_btn.bind(on_press=self.submit_form)
 
+        self.captured_image = None      # photo taken for this plant, saved on submit
+
         #add widgets to layout
         self.layout.add_widget(self.image_label)
         self.layout.add_widget(self.image_icon)
@@ -735,28 +940,19 @@ class PlantForm(BoxLayout):
         """ This function will trigger the camera to take a picture. """
         
         # Open the camera screen to capture an image
-        camera_screen = self.parent.parent.ids.screen_manager.get_screen("camera")
+        camera_screen = App.get_running_app().get_screen("camera")
         
-        # Capture the image (camera capture code, modify according to your camera class)
-        ret, frame = camera_screen.capture.read()
-        if not ret:
+        # Capture the image from the camera thread
+        frame, _ = camera_screen.camera.latest_frame()
+        if frame is None:
             print("Failed to capture image.")
             return
         
-        # Resize the image to be square and save it
-        height, width, _ = frame.shape
-        min_dim = min(height, width)
-        x_start = (width - min_dim) // 2
-        y_start = (height - min_dim) // 2
-        cropped_frame = frame[y_start:y_start + min_dim, x_start:x_start + min_dim]
-        
-        final_size = 512
-        final_image = cv2.resize(cropped_frame, (final_size, final_size), interpolation=cv2.INTER_AREA)
+        # square crop + resize to 512
+        final_image = capture_pipeline.process(frame, copy=True)
 
         # Convert the OpenCV image to a Kivy Texture for preview
-        buf = cv2.flip(final_image, 0).tobytes()
-        texture = Texture.create(size=(final_image.shape[1], final_image.shape[0]), colorfmt='bgr')
-        texture.blit_buffer(buf, colorfmt='bgr', bufferfmt='ubyte')
+        texture = frame_to_texture(final_image)
 
         # Update the image preview with the captured picture
         self.image_preview.texture = texture
@@ -765,20 +961,16 @@ class PlantForm(BoxLayout):
         self.save_captured_image(final_image)
     
     def save_captured_image(self, image):
-        """ Save the captured image to the local folder. """
-        # Check how many images already exist and name this one accordingly
-        existing_images = [f for f in os.listdir("images") if f.endswith(".png")]
-        next_number = len(existing_images) + 1
-
-        filename = f"images/plant_{next_number}.png"
-        cv2.imwrite(filename, image)  # Save the image to the filesystem
-        
-        print(f"Picture saved as {filename}")
+        """ Keep the captured image for the plant being entered. """
+        # written to disk when the form is submitted, the photo's number goes on the plant record (see attach_plant_photo)
+        self.captured_image = image
 
     def show_date_picker(self, instance, focus):
         if not focus:
             return
 
+        from kivymd.uix.pickers import MDDatePicker     # heavy, only needed once someone opens the picker
+
         date_dialog = MDDatePicker(size_hint=(0.8,0.4), pos_hint={"x":0.1, "y":0.2})
         date_dialog.bind(on_save=self.confirm_date)
         date_dialog.open()
@@ -843,7 +1035,13 @@ class PlantForm(BoxLayout):
 
         if len(error) <= 0:
             #no error detected in input fields
-            db.new_plant_record(name=name, species=species, birth_date=self.birth_date, water_frequency=water_frequency, fertiliser_needed=fertiliser_needed, fertiliser_type=fertiliser_type, fertiliser_frequency=fertiliser_freq)
+            plant = db.new_plant_record(name=name, species=species, birth_date=self.birth_date, height=float(height), water_frequency=water_frequency, fertiliser_needed=fertiliser_needed, fertiliser_type=fertiliser_type, fertiliser_frequency=fertiliser_freq)
+
+            if self.captured_image is not None:
+                # on the worker pool, nothing waits on the disk
+                ai_pool.submit(attach_plant_photo, plant.id, self.captured_image, on_result=lambda filename: print(f"Picture saved as {filename}"),
+                               on_error=lambda error: print(f"Saving picture failed: {error}"))
+                self.captured_image = None
 
             #clear form after submission
             self.name_input.text = ''
@@ -874,6 +1072,16 @@ class CustomPopup(Popup):
         self.rect.pos = self.pos
         self.rect.size = self.size
 
+Factory.register("NewPlant", cls=NewPlant)    # so the carousel can ask for it by name
+
+# screen name -> class, built lazily by BestBuds.get_screen
+SCREENS = {
+    "home": HomeScreen,
+    "calendar": CalendarScreen,
+    "camera": CameraScreen,
+    "settings": SettingsScreen,
+}
+
 if __name__ == "__main__":
     app = BestBuds()
     app.run()
@@ -0,0 +1,94 @@
+from collections import defaultdict, deque
+from contextlib import contextmanager
+import threading
+import time
+
+class Metrics():
+    """ Tiny in-process metrics registry: counters, gauges and timing samples.
+
+    Timings keep the most recent `window` samples per name so long sessions don't grow memory.
+    Safe to call from worker threads.
+    """
+
+    def __init__(self, window:int=1000):
+        self.window = window
+        self._lock = threading.Lock()
+        self.counters = defaultdict(int)
+        self.gauges = {}
+        self.timings = defaultdict(lambda: deque(maxlen=self.window))
+
+    def incr(self, name:str, amount:int=1) -> None:
+        with self._lock:
+            self.counters[name] += amount
+
+    def set(self, name:str, value) -> None:
+        with self._lock:
+            self.gauges[name] = value
+
+    def observe(self, name:str, seconds:float) -> None:
+        with self._lock:
+            self.timings[name].append(seconds)
+
+    @contextmanager
+    def timer(self, name:str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def summary(self, name:str) -> dict:
+        # count/mean/p50/p99/max for one timing, in seconds
+        with self._lock:
+            samples = sorted(self.timings.get(name, ()))
+
+        if not samples:
+            return {"count": 0}
+
+        return {
+            "count": len(samples),
+            "mean": sum(samples) / len(samples),
+            "p50": percentile(samples, 50),
+            "p99": percentile(samples, 99),
+            "max": samples[-1],
+        }
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counters = dict(self.counters)
+            gauges = dict(self.gauges)
+            timing_names = list(self.timings)
+
+        return {
+            "counters": counters,
+            "gauges": gauges,
+            "timings": {name: self.summary(name) for name in timing_names},
+        }
+
+    def report(self) -> str:
+        snapshot = self.snapshot()
+        lines = [f"{name}: {value}" for name, value in sorted(snapshot["counters"].items())]
+        lines += [f"{name}: {value}" for name, value in sorted(snapshot["gauges"].items())]
+
+        for name, summary in sorted(snapshot["timings"].items()):
+            if summary["count"]:
+                lines.append(f"{name}: n={summary['count']} p50={summary['p50'] * 1000:.1f}ms p99={summary['p99'] * 1000:.1f}ms max={summary['max'] * 1000:.1f}ms")
+
+        return "\n".join(lines)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.timings.clear()
+
+def percentile(sorted_samples:list, pct:float) -> float:
+    # nearest-rank percentile of an already sorted list
+    if not sorted_samples:
+        return 0.0
+
+    rank = max(0, min(len(sorted_samples) - 1, round(pct / 100 * len(sorted_samples)) - 1))
+    return sorted_samples[rank]
+
+# shared registry for the whole app
+metrics = Metrics()
@@ -0,0 +1,210 @@
+import importlib.util
+import os
+import random
+import threading
+import time
+
+from image_encoding import EncodeSettings, data_url, encode_frame
+from metrics import metrics
+
+IDENTIFY_PROMPT = ("You are an expert botanist. Identify the plant in the given image.\n"
+                   "If the image contains leaves, stems, flowers, or any other plant part, describe the most likely plant.\n"
+                   "If the image contains no plant, say 'No plant detected'.\n"
+                   "If unsure, say 'Unclear, but this might be a plant")
+
+HEALTH_PROMPT = ("You are a plant health expert. Check for any disease, damage, or concerns in the plant image."
+                 "If the of the plant is healthy, say 'Nothing wrong here'"
+                 "If unsure, say 'Unclear")
+
+class EmptyResponseError(Exception):
+    """ The API answered without any text (a refusal, or cut off by max_tokens). """
+
+def retryable_errors() -> tuple:
+    # 429, 5xx, timeouts/dropped connections (APITimeoutError is an APIConnectionError)
+    import openai
+    return (openai.RateLimitError, openai.InternalServerError, openai.APIConnectionError)
+
+def http2_available() -> bool:
+    # httpx only speaks HTTP/2 when the h2 package is installed
+    return importlib.util.find_spec("h2") is not None
+
+class OpenAIBackend():
+    """ Vision backend that talks to the OpenAI chat completions API.
+
+    Any backend has `complete(model, messages, max_tokens) -> str`, a `retryable` tuple of
+    the exceptions worth retrying and `close()`. This one owns one pooled HTTP client
+    (keep-alive, HTTP/2 when available), and with `base_url` (or OPENAI_BASE_URL) it talks
+    to anything that speaks the same API, fake_vision_server.py included.
+    openai/httpx are only imported, and the client only built, on the first request.
+    """
+
+    def __init__(self, api_key:str=None, base_url:str=None, timeout:float=30.0, connect_timeout:float=5.0, max_connections:int=10):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_connections = max_connections
+
+        self.http_client = None
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self):
+        # built by whichever worker gets here first
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = self._create_client()
+        return self._client
+
+    @property
+    def retryable(self) -> tuple:
+        return retryable_errors()
+
+    def _create_client(self):
+        api_key = self.api_key or os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise ValueError("Missing OpenAI API key! Set it into your environment w/ 'export OPENAI_API_KEY=\"\"'")
+
+        start = time.perf_counter()
+
+        import httpx
+        import openai
+
+        self.http_client = httpx.Client(
+            http2=http2_available(),
+            timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+            limits=httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections, keepalive_expiry=120),
+        )
+
+        # retries are handled by PlantAIService so they show up in metrics
+        client = openai.OpenAI(api_key=api_key, base_url=self.base_url, http_client=self.http_client, max_retries=0)
+
+        metrics.observe("ai.client_setup", time.perf_counter() - start)
+        return client
+
+    def complete(self, model:str, messages:list, max_tokens:int) -> str:
+        response = self.client.chat.completions.create(model=model, messages=messages, max_tokens=max_tokens)
+        choice = response.choices[0]
+        if choice.message.content is None:
+            refusal = getattr(choice.message, "refusal", None)
+            raise EmptyResponseError(f"no answer from {model} (finish_reason={choice.finish_reason}{f', refusal: {refusal}' if refusal else ''})")
+        return choice.message.content
+
+    def close(self) -> None:
+        if self.http_client is not None:
+            self.http_client.close()
+
+class PlantAIService():
+    """ The plant identification and health checks on top of a vision backend.
+
+    The backend defaults to an OpenAIBackend built from the connection arguments, one
+    long-lived client for the whole app. Pass `backend` to swap in another one (e.g.
+    fake_vision_server.ReplayBackend). 429s, 5xx responses and timeouts are retried with
+    exponential backoff. Setup cost and request latency go to `metrics`.
+    With a `rate_limiter` (rate_limit.TokenBucket) every attempt, retries included, waits
+    for a token first, so many workers can share one API quota.
+    """
+
+    def __init__(self, api_key:str=None, model:str="gpt-4o", timeout:float=30.0, connect_timeout:float=5.0,
+                 max_retries:int=3, backoff_base:float=0.5, backoff_max:float=8.0, max_connections:int=10, base_url:str=None,
+                 encode_settings:EncodeSettings=None, rate_limiter=None, backend=None):
+        self.model = model
+        self.encode_settings = encode_settings or EncodeSettings()
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.rate_limiter = rate_limiter
+        self.backend = backend or OpenAIBackend(api_key=api_key, base_url=base_url, timeout=timeout, connect_timeout=connect_timeout, max_connections=max_connections)
+
+    def close(self) -> None:
+        self.backend.close()
+
+    def complete(self, system_prompt:str, user_content:list, max_tokens:int) -> str:
+        # one chat completion with retry + exponential backoff (with jitter)
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_content},
+        ]
+
+        retryable = self.backend.retryable
+
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter is not None:
+                metrics.observe("ai.rate_limited", self.rate_limiter.acquire())
+
+            start = time.perf_counter()
+            try:
+                content = self.backend.complete(self.model, messages, max_tokens)
+                if content is None:
+                    raise EmptyResponseError(f"no answer from {self.model}")
+
+                metrics.observe("ai.request", time.perf_counter() - start)
+                metrics.incr("ai.requests")
+                return content.strip()
+
+            except retryable as e:
+                metrics.observe("ai.request_failed", time.perf_counter() - start)
+                if attempt == self.max_retries:
+                    metrics.incr("ai.errors")
+                    raise
+
+                metrics.incr("ai.retries")
+                time.sleep(self.backoff_delay(attempt, e))
+
+            except Exception:
+                # not worth retrying (bad request, auth, no answer) but still a failed request
+                metrics.observe("ai.request_failed", time.perf_counter() - start)
+                metrics.incr("ai.errors")
+                raise
+
+    def backoff_delay(self, attempt:int, error:Exception=None) -> float:
+        # honour the server's retry-after hint if there is one
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                return min(self.backoff_max, float(retry_after))
+            except ValueError:
+                pass
+
+        return min(self.backoff_max, self.backoff_base * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+    def image_content(self, frame, question:str) -> list:
+        # frame is encoded in memory, no PNG round trip through the disk
+        with metrics.timer("ai.encode"):
+            payload, mime_type = encode_frame(frame, self.encode_settings)
+
+        metrics.incr("ai.upload_bytes", len(payload))
+        metrics.set("ai.last_upload_bytes", len(payload))
+
+        return [
+            {"type": "text", "text": question},
+            {"type": "image_url", "image_url": {"url": data_url(payload, mime_type), "detail": self.encode_settings.detail}}
+        ]
+
+    # both analyses raise on failure so callers (and the result cache) can tell errors apart from answers
+    def identify_plant(self, frame) -> str | None:
+        result = self.complete(IDENTIFY_PROMPT, self.image_content(frame, "Is there a plant? If so, what plant is this?"), max_tokens=100)
+        return parse_identification(result)
+
+    def check_health(self, frame) -> str | None:
+        result = self.complete(HEALTH_PROMPT, self.image_content(frame, "Does this plant look healhty?"), max_tokens=50)
+        return parse_health(result)
+
+def parse_identification(result:str) -> str | None:
+    if "no plant" in result.lower() or "not a plant" in result.lower():
+        return None
+    if "unclear" in result.lower():
+        return "Possible plant, but unclear"
+    # else
+    return result
+
+def parse_health(result:str) -> str | None:
+    if "nothing wrong" in result.lower():
+        return None
+    if "unclear" in result.lower():
+        return "Possible damage, but unsure"
+    # else
+    return result
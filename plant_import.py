@@ -0,0 +1,105 @@
+# bulk import a plant inventory from csv or json
+# python plant_import.py inventory.csv [--batch-size 5000]
+#
+# csv needs a header row, json is a list of objects (or one object per line, .jsonl)
+# columns / keys: name, species, birth_date (YYYY-MM-DD), water_frequency, fertiliser_needed,
+# fertiliser_type, fertiliser_frequency, height -> the last three are optional
+import argparse
+import csv
+import json
+import os
+import time
+from datetime import date
+
+TRUE_VALUES = {"1", "true", "yes", "y", "t"}
+
+def optional(value):
+    # empty csv cells / json nulls -> None
+    if value is None or (isinstance(value, str) and value.strip() == ""):
+        return None
+    return value
+
+def parse_record(raw:dict, line:int) -> dict:
+    # one raw csv/json row -> new_plant_record style dict, raising ValueError with the line number
+    try:
+        name = str(raw["name"]).strip()
+        species = str(raw["species"]).strip()
+        if not name or not species:
+            raise ValueError("name and species can't be empty")
+
+        birth_date = raw["birth_date"]
+        if not isinstance(birth_date, date):
+            birth_date = date.fromisoformat(str(birth_date).strip())
+
+        water_frequency = int(raw["water_frequency"])
+        if water_frequency <= 0:
+            raise ValueError("water_frequency must be positive")
+
+        fertiliser_needed = optional(raw.get("fertiliser_needed"))
+        if isinstance(fertiliser_needed, str):
+            fertiliser_needed = fertiliser_needed.strip().lower() in TRUE_VALUES
+        fertiliser_needed = bool(fertiliser_needed)
+
+        fertiliser_frequency = optional(raw.get("fertiliser_frequency"))
+        fertiliser_frequency = int(fertiliser_frequency) if fertiliser_frequency is not None else None
+        if fertiliser_needed and (fertiliser_frequency is None or fertiliser_frequency <= 0):
+            raise ValueError("fertiliser_frequency must be positive when fertiliser is needed")
+
+        height = optional(raw.get("height"))
+        height = float(height) if height is not None else None
+    except KeyError as e:
+        raise ValueError(f"line {line}: missing {e.args[0]}") from None
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"line {line}: {e}") from None
+
+    return {
+        "name": name,
+        "species": species,
+        "birth_date": birth_date,
+        "water_frequency": water_frequency,
+        "fertiliser_needed": fertiliser_needed,
+        "fertiliser_type": optional(raw.get("fertiliser_type")) if fertiliser_needed else None,
+        "fertiliser_frequency": fertiliser_frequency if fertiliser_needed else None,
+        "height": height,
+    }
+
+def read_plants(path:str):
+    # yields parsed records one at a time so big csv files are never fully in memory
+    extension = os.path.splitext(path)[1].lower()
+
+    with open(path, newline="", encoding="utf-8") as file:
+        if extension == ".csv":
+            # DictReader line_num counts the header, so it matches the line in the file
+            reader = csv.DictReader(file)
+            for raw in reader:
+                yield parse_record(raw, reader.line_num)
+
+        elif extension in (".jsonl", ".ndjson"):
+            for line, text in enumerate(file, start=1):
+                if text.strip():
+                    yield parse_record(json.loads(text), line)
+
+        elif extension == ".json":
+            for index, raw in enumerate(json.load(file), start=1):
+                yield parse_record(raw, index)
+
+        else:
+            raise ValueError(f"Unsupported inventory format: {extension}")
+
+def import_plants(path:str, db=None, batch_size:int=5000) -> list[int]:
+    # everything or nothing -> a bad row rolls the whole import back
+    if db is None:
+        from database import DB
+        db = DB()
+
+    return db.add_plants(read_plants(path), batch_size=batch_size)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import a plant inventory into the Best Buds database.")
+    parser.add_argument("path", help="inventory file, .csv, .json or .jsonl")
+    parser.add_argument("--batch-size", type=int, default=5000, help="rows per executemany batch")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    plant_ids = import_plants(args.path, batch_size=args.batch_size)
+    print(f"imported {len(plant_ids)} plants in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,40 @@
+import threading
+import time
+
+class TokenBucket():
+    """ Thread-safe token bucket: `rate` tokens a second, bursts of up to `capacity`.
+
+    `acquire` reserves its tokens straight away and sleeps until they would have been
+    available, so waiting threads are served in the order they asked and the long run
+    rate never goes over `rate`, however many workers share the bucket.
+    """
+
+    def __init__(self, rate:float, capacity:float=None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)      # about a second's worth of burst
+        self.tokens = self.capacity
+
+        self._lock = threading.Lock()
+        self._updated = time.monotonic()
+
+    @classmethod
+    def per_minute(cls, requests:float, burst:float=None) -> "TokenBucket":
+        # api limits are quoted per minute
+        return cls(requests / 60, burst)
+
+    def acquire(self, tokens:float=1) -> float:
+        # blocks until `tokens` may be spent, returns how long it waited
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+            self.tokens -= tokens
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
@@ -0,0 +1,124 @@
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
+from kivy.uix.recyclelayout import RecycleLayout
+
+class FixedSizeRecycleBoxLayout(RecycleBoxLayout):
+    """ RecycleBoxLayout for items that all take `default_size` along the layout's axis.
+
+    The stock layout re-solves the position of every item whenever the data changes, so
+    inserting one card into 10k costs a pass over all 10k. With a fixed step, item i sits at
+    padding + i * (size + spacing), so a change only costs the views that are on screen.
+    Sizes across the axis (size_hint_y of a horizontal carousel) still come from each item.
+    Likewise only new or changed items are sized, not every item after each change.
+    """
+
+    @property
+    def horizontal(self) -> bool:
+        return self.orientation == "horizontal"
+
+    @property
+    def step(self) -> float:
+        return self.default_size[0 if self.horizontal else 1] + self.spacing
+
+    def compute_sizes_from_data(self, data, flags):
+        # same bookkeeping as RecycleLayout's, which then walks every item in python looking for
+        # the ones to size, here they're found with list.index and only those are sized
+        if [f for f in flags if not f]:
+            RecycleLayout.compute_sizes_from_data(self, data, flags)      # changed unpredictably, everything again
+            return
+
+        opts = self.view_opts
+        changed = False
+        for flag in flags:
+            for kind, value in flag.items():
+                changed = True
+                if kind == "removed":
+                    del opts[value]
+                elif kind == "appended":
+                    opts.extend([None] * (value.stop - value.start))
+                elif kind == "inserted":
+                    opts.insert(value, None)
+                elif kind == "modified":
+                    for i in range(value.start, value.stop, value.step or 1):
+                        opts[i] = None
+                else:
+                    raise Exception(f"Unrecognized data flag {kind}")
+
+        if changed:
+            self.clear_layout()
+
+        missing = []
+        try:
+            index = opts.index(None)
+            while True:
+                missing.append(index)
+                index = opts.index(None, index + 1)
+        except ValueError:
+            pass
+
+        if missing:
+            # the stock code sizes a list of just those items
+            self.view_opts = [None] * len(missing)
+            RecycleLayout.compute_sizes_from_data(self, [data[i] for i in missing], [])
+            for index, opt in zip(missing, self.view_opts):
+                opts[index] = opt
+            self.view_opts = opts
+
+    def compute_layout(self, data, flags):
+        # RecycleLayout's part only looks at the views on screen, RecycleBoxLayout's part is the O(n) one
+        RecycleLayout.compute_layout(self, data, flags)
+        if self._changed_views is None:
+            return
+
+        self.clear_layout()
+
+        left, top, right, bottom = self.padding
+        length = len(data) * self.step - self.spacing if data else 0
+        if self.horizontal:
+            self.minimum_size = left + right + length, top + bottom
+        else:
+            self.minimum_size = left + right, top + bottom + length
+
+    def place(self, index:int) -> None:
+        # position (and across-axis size) of one item, worked out when it scrolls into view
+        opt = self.view_opts[index]
+        left, top, right, bottom = self.padding
+        width, height = opt["size"]
+        hint_x, hint_y = opt["size_hint"]
+
+        if self.horizontal:
+            if hint_y is not None:
+                height = hint_y * max(0, self.height - top - bottom)
+            opt["pos"] = self.x + left + index * self.step, self.y + bottom
+        else:
+            if hint_x is not None:
+                width = hint_x * max(0, self.width - left - right)
+            opt["pos"] = self.x + left, self.top - top - (index + 1) * self.step + self.spacing
+
+        opt["size"] = [width, height]
+
+    def get_view_index_at(self, pos):
+        count = len(self.view_opts)
+        if not count:
+            return 0
+
+        left, top, right, bottom = self.padding
+        if self.horizontal:
+            index = (pos[0] - self.x - left) // self.step
+        else:
+            index = (self.top - top - pos[1]) // self.step
+        return min(max(int(index), 0), count - 1)
+
+    def compute_visible_views(self, data, viewport):
+        if not data:
+            return []
+
+        x, y, w, h = viewport
+        if self.horizontal:
+            first, last = self.get_view_index_at((x, y)), self.get_view_index_at((x + w, y))
+        else:
+            first, last = self.get_view_index_at((x, y + h)), self.get_view_index_at((x, y))
+
+        indices = list(range(first, last + 1))
+        for index in indices:
+            self.place(index)
+        return indices
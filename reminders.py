@@ -0,0 +1,262 @@
+# care reminders: a min-heap of every plant's next water/fertiliser time
+# headless daemon over the sqlite file: python reminders.py [--at 09:00] [--poll 5]
+import argparse
+from datetime import date, datetime, time as day_time, timedelta
+import heapq
+import threading
+import time
+
+from change_events import DELETE
+from database import schedule_phase
+
+CARES = ("water", "fertiliser")
+MAX_SLEEP = 60      # seconds, wakes at least this often so a changed system clock is noticed
+
+def next_due_day(birth_date:date, frequency, after:date) -> date | None:
+    # first day on or after `after` that the plant needs this care, same rule as the schedule index
+    phase = schedule_phase(birth_date, frequency)
+    if phase is None:
+        return None
+
+    first = max(after, birth_date)
+    return first + timedelta(days=(phase - first.toordinal()) % int(frequency))
+
+class Reminder():
+    def __init__(self, due_at:datetime, plant_id:int, name:str, care:str):
+        self.due_at = due_at
+        self.plant_id = plant_id
+        self.name = name
+        self.care = care
+
+    def __repr__(self):
+        return f"Reminder({self.care} {self.name} at {self.due_at:%Y-%m-%d %H:%M})"
+
+class ReminderEngine():
+    """ Fires a reminder when a plant's next water or fertiliser time comes round.
+
+    Every (plant, care) pair has one live entry in a min-heap of due timestamps, so the
+    runner only ever looks at the head: sleeping until it's due costs nothing per plant,
+    and firing one reminder and scheduling its next occurrence is O(log n). Edits replace
+    a plant's entries in O(log n) too, the old ones are left in the heap and skipped when
+    they surface. Reminders are due at `remind_at` on each due day; ones already past
+    when the engine starts are not fired, the calendar has those.
+
+    `notify(reminders)` gets everything that came due in one tick, on the runner thread.
+    """
+
+    def __init__(self, notify, remind_at:day_time=day_time(9, 0), clock=time.time):
+        self.notify = notify
+        self.remind_at = remind_at
+        self.clock = clock
+
+        self._heap = []             # (due timestamp, plant id, care), stale entries included
+        self._due = {}              # (plant id, care) -> due timestamp of its live heap entry
+        self._plants = {}           # plant id -> (name, birth_date, {care: frequency})
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __len__(self):
+        return len(self._due)
+
+    def due_timestamp(self, day:date) -> float:
+        return datetime.combine(day, self.remind_at).timestamp()
+
+    def first_day(self, now:float) -> date:
+        # today, unless today's reminder time has already gone by
+        today = datetime.fromtimestamp(now).date()
+        return today if self.due_timestamp(today) >= now else today + timedelta(days=1)
+
+    def load(self, rows) -> None:
+        # (id, name, birth_date, water_frequency, fertiliser_frequency) rows -> the whole heap, built in O(n)
+        after = self.first_day(self.clock())
+        with self._lock:
+            self._plants.clear()
+            self._due.clear()
+            for plant_id, name, birth_date, water_frequency, fertiliser_frequency in rows:
+                self._plants[plant_id] = (name, birth_date, {"water": water_frequency, "fertiliser": fertiliser_frequency})
+                for care in CARES:
+                    day = next_due_day(birth_date, self._plants[plant_id][2][care], after)
+                    if day is not None:
+                        self._due[(plant_id, care)] = self.due_timestamp(day)
+
+            self._heap = [(due, plant_id, care) for (plant_id, care), due in self._due.items()]
+            heapq.heapify(self._heap)
+
+        self._wake.set()
+
+    def set_plant(self, plant_id:int, name:str, birth_date:date, water_frequency, fertiliser_frequency) -> None:
+        after = self.first_day(self.clock())
+        with self._lock:
+            self._plants[plant_id] = (name, birth_date, {"water": water_frequency, "fertiliser": fertiliser_frequency})
+            for care, frequency in self._plants[plant_id][2].items():
+                day = next_due_day(birth_date, frequency, after)
+                if day is None:
+                    self._due.pop((plant_id, care), None)
+                elif self._due.get((plant_id, care)) != self.due_timestamp(day):
+                    self._due[(plant_id, care)] = self.due_timestamp(day)
+                    heapq.heappush(self._heap, (self._due[(plant_id, care)], plant_id, care))
+            self._compact()
+
+        self._wake.set()       # the head may have moved earlier
+
+    def remove_plant(self, plant_id:int) -> None:
+        with self._lock:
+            self._plants.pop(plant_id, None)
+            for care in CARES:
+                self._due.pop((plant_id, care), None)
+            self._compact()
+
+    def on_plant_changed(self, event) -> None:
+        # change bus subscriber for the plant table (in process writes)
+        for row in event.rows:
+            if event.op == DELETE:
+                self.remove_plant(row["id"])
+            else:
+                fertiliser_frequency = row["fertiliser_frequency"] if row["fertiliser_needed"] else None
+                self.set_plant(row["id"], row["name"], row["birth_date"], row["water_frequency"], fertiliser_frequency)
+
+    def _compact(self) -> None:
+        # edits leave stale entries behind, rebuild once they outnumber the live ones
+        if len(self._heap) > 2 * len(self._due) + 64:
+            self._heap = [(due, plant_id, care) for (plant_id, care), due in self._due.items()]
+            heapq.heapify(self._heap)
+
+    def next_due(self) -> float | None:
+        with self._lock:
+            while self._heap and self._due.get(self._heap[0][1:]) != self._heap[0][0]:
+                heapq.heappop(self._heap)
+            return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now:float=None) -> list[Reminder]:
+        # everything due by `now`, each one rescheduled for its next occurrence
+        now = self.clock() if now is None else now
+        fired = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                due, plant_id, care = self._heap[0]
+                if self._due.get((plant_id, care)) != due:
+                    heapq.heappop(self._heap)       # stale, the plant was edited or deleted
+                    continue
+
+                name, birth_date, frequencies = self._plants[plant_id]
+                due_at = datetime.fromtimestamp(due)
+                fired.append(Reminder(due_at, plant_id, name, care))
+
+                # next occurrence after now, a device that slept through several gets one reminder not a pile
+                after = max(self.first_day(now), due_at.date() + timedelta(days=1))
+                next_due = self.due_timestamp(next_due_day(birth_date, frequencies[care], after))
+                self._due[(plant_id, care)] = next_due
+                heapq.heapreplace(self._heap, (next_due, plant_id, care))
+
+        return fired
+
+    def tick(self) -> float:
+        # fire whatever is due -> seconds to sleep before the next tick
+        fired = self.pop_due()
+        if fired:
+            try:
+                self.notify(fired)
+            except Exception as e:
+                print(f"reminder notification failed: {e}")
+
+        next_due = self.next_due()
+        return MAX_SLEEP if next_due is None else min(max(next_due - self.clock(), 0), MAX_SLEEP)
+
+    def run(self, poll=None, poll_interval:float=None) -> None:
+        # runner loop until stop(), `poll()` is called every `poll_interval` seconds to pick up outside edits
+        while not self._stop.is_set():
+            if poll is not None:
+                poll()
+
+            sleep = self.tick()
+            if poll_interval is not None:
+                sleep = min(sleep, poll_interval)
+
+            self._wake.wait(sleep)
+            self._wake.clear()
+
+    def start(self, db) -> threading.Thread:
+        # load every plant and run on a background thread
+        def run():
+            self.load(db.get_reminder_rows())
+            self.run()
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=run, name="reminders", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+class ChangeLogFollower():
+    """ Feeds plant edits made by other processes into an engine, through the plant_change log.
+
+    Each poll is one index seek past the last seq seen, so an idle poll costs the same
+    however many plants there are. Falls behind by more than `reload_after` changes (a bulk
+    import, or the log was pruned past us) and it reloads everything instead.
+    """
+
+    def __init__(self, db, engine:ReminderEngine, reload_after:int=1000):
+        self.db = db
+        self.engine = engine
+        self.reload_after = reload_after
+        self.last_seq = None
+
+    def reload(self) -> None:
+        self.last_seq = self.db.get_latest_plant_change()
+        self.engine.load(self.db.get_reminder_rows())
+
+    def poll(self) -> int:
+        # apply the edits since the last poll -> how many plants changed
+        if self.last_seq is None:
+            self.reload()
+            return len(self.engine)
+
+        changes = self.db.get_plant_changes(self.last_seq, limit=self.reload_after)
+        if not changes:
+            return 0
+        if len(changes) >= self.reload_after or changes[0][0] != self.last_seq + 1:
+            self.reload()
+            return len(self.engine)
+
+        self.last_seq = changes[-1][0]
+        plant_ids = {plant_id for _, plant_id in changes}
+        rows = self.db.get_reminder_rows(plant_ids)
+
+        for row in rows:
+            self.engine.set_plant(*row)
+        for plant_id in plant_ids - {row[0] for row in rows}:
+            self.engine.remove_plant(plant_id)
+
+        return len(plant_ids)
+
+def print_reminders(reminders:list[Reminder]) -> None:
+    for care in CARES:
+        names = [reminder.name for reminder in reminders if reminder.care == care]
+        if names:
+            more = f" and {len(names) - 10} more" if len(names) > 10 else ""
+            print(f"{datetime.now():%Y-%m-%d %H:%M} {care}: {', '.join(names[:10])}{more}", flush=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Print care reminders as plants come due, following edits made in the app.")
+    parser.add_argument("--at", default="09:00", help="time of day reminders are due, HH:MM")
+    parser.add_argument("--poll", type=float, default=5, help="seconds between checks for edits made elsewhere")
+    args = parser.parse_args()
+
+    from database import DB
+
+    engine = ReminderEngine(print_reminders, remind_at=day_time.fromisoformat(args.at))
+    follower = ChangeLogFollower(DB(), engine)
+    follower.poll()
+
+    next_due = engine.next_due()
+    print(f"{len(engine)} reminders scheduled, next at {datetime.fromtimestamp(next_due):%Y-%m-%d %H:%M}" if next_due else "no reminders scheduled", flush=True)
+
+    try:
+        engine.run(poll=follower.poll, poll_interval=args.poll)
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,261 @@
+from collections import OrderedDict
+from concurrent.futures import Future
+import hashlib
+import threading
+import time
+
+import numpy as np
+from sqlalchemy import bindparam, update
+
+from database import AnalysisResult, session_scope
+from metrics import metrics
+
+DAY = 24 * 60 * 60
+
+def frame_digest(frame) -> str:
+    # exact content hash -> identical frames always map to the same entry
+    return hashlib.blake2b(frame.tobytes(), digest_size=16).hexdigest()
+
+def dhash(frame, hash_size:int=8) -> int:
+    # 64-bit difference hash, nearly identical photos land a few bits apart
+    import cv2
+
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = small[:, 1:] > small[:, :-1]
+
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+def hamming_distance(a:int, b:int) -> int:
+    return (a ^ b).bit_count()
+
+class CacheEntry():
+    def __init__(self, row_id:int, kind:str, digest:str, phash:int, result, created_at:float, last_used:float):
+        self.row_id = row_id
+        self.kind = kind
+        self.digest = digest
+        self.phash = phash
+        self.result = result
+        self.created_at = created_at
+        self.last_used = last_used
+
+class AnalysisCache():
+    """ Persistent cache of identify/health answers keyed by the captured frame.
+
+    Exact frames are matched by content digest, near-identical ones by dhash within
+    `max_distance` bits. Entries expire after a per-kind TTL and the least recently used
+    are evicted past `max_entries`. Requests for a frame that is already in flight wait
+    for that request instead of sending another one. With `lazy=True` the stored entries
+    are read from the database on first use rather than in the constructor.
+
+    The lock only ever guards the in-memory index, database writes happen after it's
+    released. Hits update `last_used` in memory, those are written in one batch with the
+    next store and by flush(), call that on shutdown.
+    """
+
+    def __init__(self, max_entries:int=1000, max_distance:int=4, ttl:dict=None, lazy:bool=False):
+        self.max_entries = max_entries
+        self.max_distance = max_distance
+        self.ttl = ttl or {"identify": 30 * DAY, "health": 1 * DAY}    # health can change, species can't
+
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()       # (kind, digest) -> CacheEntry, least recently used first
+        self._in_flight = {}                # (kind, digest) -> Future
+        self._touched = {}                  # row id -> last_used not written yet
+
+        self._loaded = threading.Event()
+        self._load_lock = threading.Lock()
+        if not lazy:
+            self._ensure_loaded()
+
+    def _ensure_loaded(self) -> None:
+        if not self._loaded.is_set():
+            with self._load_lock:
+                if not self._loaded.is_set():
+                    self._load()
+                    self._loaded.set()
+
+    def _load(self) -> None:
+        with session_scope() as session:
+            rows = session.query(AnalysisResult).order_by(AnalysisResult.last_used).all()
+
+        with self._lock:
+            for row in rows:
+                entry = CacheEntry(row.id, row.kind, row.frame_digest, int(row.frame_hash, 16), row.result, row.created_at, row.last_used)
+                self._entries[(row.kind, row.frame_digest)] = entry
+
+            expired = self._evict(self._expired(time.time()))
+
+        self._delete_rows(expired)
+
+    def __len__(self):
+        self._ensure_loaded()
+        return len(self._entries)
+
+    def lookup(self, frame, kind:str, digest:str=None, phash:int=None) -> tuple[bool, object]:
+        # (hit, result) - result can legitimately be None, so check hit
+        self._ensure_loaded()
+        digest = digest or frame_digest(frame)
+        now = time.time()
+        expired = []
+
+        with self._lock:
+            entry = self._entries.get((kind, digest))
+
+            if entry is None:
+                phash = dhash(frame) if phash is None else phash
+                entry = self._nearest(kind, phash)
+
+            if entry is not None and now - entry.created_at > self.ttl.get(kind, DAY):
+                expired = self._evict([entry])
+                entry = None
+
+            if entry is not None:
+                self._entries.move_to_end((entry.kind, entry.digest))
+                entry.last_used = now
+                self._touched[entry.row_id] = now       # written with the next store or flush
+                self.hits += 1
+                metrics.incr("cache.hit")
+            else:
+                self.misses += 1
+                metrics.incr("cache.miss")
+
+        self._delete_rows(expired)
+        return (True, entry.result) if entry is not None else (False, None)
+
+    def _nearest(self, kind:str, phash:int) -> CacheEntry | None:
+        best, best_distance = None, self.max_distance + 1
+
+        for entry in self._entries.values():
+            if entry.kind != kind:
+                continue
+
+            distance = hamming_distance(entry.phash, phash)
+            if distance < best_distance:
+                best, best_distance = entry, distance
+
+        return best
+
+    def store(self, frame, kind:str, result, digest:str=None, phash:int=None) -> None:
+        self._ensure_loaded()
+        digest = digest or frame_digest(frame)
+        phash = dhash(frame) if phash is None else phash
+        now = time.time()
+
+        with session_scope(write=True) as session:
+            row = AnalysisResult(kind=kind, frame_digest=digest, frame_hash=f"{phash:016x}", result=result, created_at=now, last_used=now)
+            session.add(row)
+            session.flush()
+            row_id = row.id
+
+        with self._lock:
+            old_entry = self._entries.pop((kind, digest), None)
+            self._entries[(kind, digest)] = CacheEntry(row_id, kind, digest, phash, result, now, now)
+
+            stale = [old_entry] if old_entry else []
+            while len(self._entries) > self.max_entries:
+                _, oldest = self._entries.popitem(last=False)
+                stale.append(oldest)
+
+            stale_ids = self._evict(stale)
+
+        self._delete_rows(stale_ids)
+        self.flush()
+
+    def get_or_compute(self, frame, kind:str, compute, *args):
+        # cached answer if there is one, otherwise compute(*args) once and remember it
+        digest = frame_digest(frame)
+        phash = dhash(frame)
+
+        hit, result = self.lookup(frame, kind, digest, phash)
+        if hit:
+            return result
+
+        expired = []
+        with self._lock:
+            # another thread may have stored this exact frame since the lookup, unless it's past its ttl as well
+            entry = self._entries.get((kind, digest))
+            if entry is not None and time.time() - entry.created_at > self.ttl.get(kind, DAY):
+                expired = self._evict([entry])
+                entry = None
+
+            if entry is None:
+                pending = self._in_flight.get((kind, digest))
+                if pending is None:
+                    owner = True
+                    pending = self._in_flight[(kind, digest)] = Future()
+                else:
+                    owner = False
+
+        if entry is not None:
+            return entry.result
+
+        if not owner:
+            metrics.incr("cache.coalesced")
+            return pending.result()
+
+        try:
+            result = compute(*args)
+        except Exception as e:
+            # failures aren't cached, the next attempt goes back to the network
+            pending.set_exception(e)
+            raise
+        else:
+            # waiters get the answer before the write, a locked or full database mustn't leave them hanging
+            pending.set_result(result)
+            try:
+                self._delete_rows(expired)
+                self.store(frame, kind, result, digest, phash)
+            except Exception as e:
+                # still a good (and paid for) answer, it just won't be remembered
+                metrics.incr("cache.store_failed")
+                print(f"Analysis cache: couldn't store the {kind} result: {e}")
+            return result
+        finally:
+            if not pending.done():
+                pending.set_exception(RuntimeError(f"{kind} analysis was interrupted"))
+            with self._lock:
+                self._in_flight.pop((kind, digest), None)
+
+    def _expired(self, now:float) -> list:
+        # caller holds the lock
+        return [entry for entry in self._entries.values() if now - entry.created_at > self.ttl.get(entry.kind, DAY)]
+
+    def _evict(self, entries:list) -> list:
+        # caller holds the lock, only drops the entries from memory -> row ids for _delete_rows once it's released
+        for entry in entries:
+            if self._entries.get((entry.kind, entry.digest)) is entry:
+                del self._entries[(entry.kind, entry.digest)]
+            self._touched.pop(entry.row_id, None)
+
+        if entries:
+            metrics.incr("cache.evicted", len(entries))
+        return [entry.row_id for entry in entries]
+
+    def _delete_rows(self, row_ids:list) -> None:
+        # outside the lock, a writer holding the database up only holds up this call and not every lookup
+        if not row_ids:
+            return
+
+        with session_scope(write=True) as session:
+            session.query(AnalysisResult).filter(AnalysisResult.id.in_(row_ids)).delete(synchronize_session=False)
+
+    def flush(self) -> None:
+        # writes the last_used times of hits since the last flush in one transaction
+        with self._lock:
+            touched, self._touched = self._touched, {}
+        if not touched:
+            return
+
+        with session_scope(write=True) as session:
+            # core executemany, a row evicted meanwhile just matches nothing
+            table = AnalysisResult.__table__
+            touch = update(table).where(table.c.id == bindparam("row_id")).values(last_used=bindparam("used"))
+            session.execute(touch, [{"row_id": row_id, "used": last_used} for row_id, last_used in touched.items()])
+
+    def stats(self) -> dict:
+        self._ensure_loaded()
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
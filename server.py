@@ -0,0 +1,278 @@
+# headless http api over the plant database and the AI analyses, no kivy and no window
+# python server.py [--host 127.0.0.1] [--port 8080] [--ai-workers 4] [--max-pending 32] [--rpm 500]
+import argparse
+import asyncio
+from datetime import date
+import json
+import os
+import time
+import traceback
+
+from aiohttp import web
+import numpy as np
+
+from ai_worker import AIWorkerPool
+from care_list import CareList
+from database import PLANT_FIELDS
+from growth import ROLLUP_PERIODS
+from metrics import metrics
+
+UPLOAD_CHUNK = 64 * 1024
+MAX_UPLOAD = 20 * 1024 * 1024      # bytes, a phone photo is a few MB
+MAX_PAGE = 500
+
+def plant_json(plant) -> dict:
+    fields = {field: getattr(plant, field) for field in PLANT_FIELDS}
+    fields["birth_date"] = plant.birth_date.isoformat()
+    return {"id": plant.id, **fields}
+
+def query_int(request, name:str, default:int, low:int=0, high:int=None) -> int:
+    try:
+        value = int(request.query.get(name, default))
+    except ValueError:
+        raise web.HTTPBadRequest(text=f"{name} must be a whole number")
+    return max(low, min(value, high)) if high is not None else max(low, value)
+
+def query_date(request, name:str, default:date=None) -> date | None:
+    value = request.query.get(name)
+    if value is None:
+        return default
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise web.HTTPBadRequest(text=f"{name} must be a YYYY-MM-DD date")
+
+def decode_image(data:bytes):
+    import cv2
+
+    frame = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if frame is None:
+        raise ValueError("upload isn't an image opencv can read")
+    return frame
+
+@web.middleware
+async def json_errors(request, handler):
+    # every response is json, errors included, and each route's latency goes to metrics
+    start = time.perf_counter()
+    try:
+        return await handler(request)
+    except web.HTTPException as e:
+        if e.status < 400:
+            raise
+        return web.json_response({"error": e.text or e.reason}, status=e.status, headers={k: v for k, v in e.headers.items() if k == "Retry-After"})
+    except Exception as e:
+        # a bug or a database error, the details stay in the server log
+        metrics.incr("server.errors")
+        print(f"{request.method} {request.path} failed: {e!r}")
+        traceback.print_exc()
+        return web.json_response({"error": "internal error"}, status=500)
+    finally:
+        route = request.match_info.route.resource
+        metrics.observe(f"server.{request.method} {route.canonical if route else 'unmatched'}", time.perf_counter() - start)
+
+class PlantServer():
+    """ Request handlers for the headless service.
+
+    Database calls run on the default thread pool so a slow query never stalls the event
+    loop. Analyses go through the app's PlantAnalyser on a bounded AIWorkerPool: past
+    `max_pending` analyses in progress new ones get a 503 with Retry-After instead of
+    piling up. Uploads are read in chunks straight off the socket, as a raw image body or
+    an "image" multipart field, and refused once they pass `max_upload` bytes. /care comes
+    from the app's CareList with each day's response encoded once, both dropped whenever
+    the plant change log moves so edits made by the app or anyone else show up.
+    """
+
+    def __init__(self, db, analyser, ai_workers:int=4, max_pending:int=32, max_upload:int=MAX_UPLOAD):
+        self.db = db
+        self.analyser = analyser
+        self.max_pending = max_pending
+        self.max_upload = max_upload
+        self.ai_pool = AIWorkerPool(max_workers=ai_workers, dispatch=None)     # futures only, no ui thread to call back to
+        self.admitted = 0       # analyses past the admission check, uploading, queued or running
+
+        self.care_list = CareList(db)
+        self._care_bodies = {}      # date -> encoded /care response
+        self._care_seq = None
+        self._care_lock = asyncio.Lock()
+
+    def routes(self) -> list:
+        return [
+            web.get("/status", self.status),
+            web.get("/metrics", self.get_metrics),
+            web.get("/plants", self.list_plants),
+            web.get("/plants/{plant_id:\\d+}", self.get_plant),
+            web.get("/plants/{plant_id:\\d+}/heights", self.get_heights),
+            web.get("/care", self.get_care),
+            web.post("/analyse/identify", self.identify),
+            web.post("/analyse/health", self.check_health),
+        ]
+
+    async def close(self, app=None) -> None:
+        self.ai_pool.shutdown()
+
+    async def status(self, request):
+        return web.json_response({"status": "ok", "analyses": self.admitted})
+
+    async def get_metrics(self, request):
+        return web.json_response(metrics.snapshot())
+
+    async def list_plants(self, request):
+        # keyset pages, pass the returned next_after_id back for the next one
+        after_id = query_int(request, "after_id", 0)
+        limit = query_int(request, "limit", 50, low=1, high=MAX_PAGE)
+        rows = await asyncio.to_thread(self.db.get_plant_page, after_id, limit)
+
+        plants = [{"id": row.id, "name": row.name, "species": row.species} for row in rows]
+        return web.json_response({"plants": plants, "next_after_id": rows[-1][0] if len(rows) == limit else None})
+
+    async def get_plant(self, request):
+        plant = await asyncio.to_thread(self.db.get_plant, int(request.match_info["plant_id"]))
+        if plant is None:
+            raise web.HTTPNotFound(text="no such plant")
+        return web.json_response(plant_json(plant))
+
+    async def get_heights(self, request):
+        plant_id = int(request.match_info["plant_id"])
+        period = request.query.get("period", "week")
+        if period not in ROLLUP_PERIODS:
+            raise web.HTTPBadRequest(text=f"period must be one of {', '.join(ROLLUP_PERIODS)}")
+
+        rows = await asyncio.to_thread(self.db.get_height_rollups, period, [plant_id], query_date(request, "start"), query_date(request, "end"))
+        buckets = [{"start": start.isoformat(), "count": count, "min": low, "max": high, "mean": total / count}
+                   for _, start, count, low, high, total in rows]
+        return web.json_response({"plant_id": plant_id, "period": period, "buckets": buckets})
+
+    async def get_care(self, request):
+        day = query_date(request, "date", date.today())
+        async with self._care_lock:
+            body = await asyncio.to_thread(self._care_body, day)
+
+        return web.Response(body=body, content_type="application/json")
+
+    def _care_body(self, day:date) -> bytes:
+        # one thread at a time (the care lock), a day's list is built and encoded once and kept until the next plant edit
+        seq = self.db.get_latest_plant_change()
+        if seq != self._care_seq:
+            self.care_list.clear()
+            self._care_bodies.clear()
+            self._care_seq = seq
+
+        body = self._care_bodies.get(day)
+        if body is None:
+            daily = self.care_list.get(day)
+            body = json.dumps({
+                "date": day.isoformat(),
+                "water": [{"id": item.plant_id, "name": item.name, "water_frequency": item.water_frequency} for item in daily.water],
+                "fertiliser": [{"id": item.plant_id, "name": item.name, "fertiliser_type": item.fertiliser_type, "fertiliser_frequency": item.fertiliser_frequency}
+                               for item in daily.fertiliser],
+            }).encode()
+
+            if len(self._care_bodies) >= self.care_list.max_days:
+                self._care_bodies.clear()
+            self._care_bodies[day] = body
+
+        return body
+
+    async def identify(self, request):
+        name = await self.analyse(request, self.analyser.identify)
+        return web.json_response({"plant": name is not None, "name": name})
+
+    async def check_health(self, request):
+        issue = await self.analyse(request, self.analyser.check_health)
+        return web.json_response({"healthy": issue is None, "issue": issue})
+
+    async def analyse(self, request, analysis):
+        # refused before the upload is read when the pool is already full
+        # (counted here on the event loop, the pool's own count only starts once the upload is in)
+        if self.admitted >= self.max_pending:
+            metrics.incr("server.rejected")
+            raise web.HTTPServiceUnavailable(text="too many analyses in progress", headers={"Retry-After": "1"})
+
+        self.admitted += 1
+        try:
+            data = await self.read_upload(request)
+            try:
+                frame = await asyncio.to_thread(decode_image, data)
+            except ValueError as e:
+                raise web.HTTPBadRequest(text=str(e))
+
+            try:
+                return await asyncio.wrap_future(self.ai_pool.submit(analysis, frame))
+            except Exception as e:
+                raise web.HTTPBadGateway(text=f"analysis failed: {e}")
+        finally:
+            self.admitted -= 1
+
+    async def read_upload(self, request) -> bytes:
+        if request.content_length is not None and request.content_length > self.max_upload:
+            raise web.HTTPRequestEntityTooLarge(self.max_upload, request.content_length)
+
+        if request.content_type.startswith("multipart/"):
+            reader = await request.multipart()
+            part = await reader.next()
+            while part is not None and part.name != "image":
+                part = await reader.next()
+            if part is None:
+                raise web.HTTPBadRequest(text="multipart upload needs an \"image\" field")
+            read_chunk = lambda: part.read_chunk(UPLOAD_CHUNK)
+        else:
+            read_chunk = lambda: request.content.read(UPLOAD_CHUNK)
+
+        data = bytearray()
+        while chunk := await read_chunk():
+            data += chunk
+            if len(data) > self.max_upload:
+                raise web.HTTPRequestEntityTooLarge(self.max_upload, len(data))
+
+        if not data:
+            raise web.HTTPBadRequest(text="no image uploaded")
+        metrics.incr("server.upload_bytes", len(data))
+        return bytes(data)
+
+def create_app(server:PlantServer) -> web.Application:
+    app = web.Application(middlewares=[json_errors])
+    app.add_routes(server.routes())
+    app.on_cleanup.append(server.close)
+    return app
+
+def default_analyser(ai_workers:int, base_url:str=None, rpm:float=None):
+    # the same pieces main.py puts together for the app
+    from analysis import PlantAnalyser
+    from image_encoding import EncodeSettings
+    from local_classifier import LocalPlantClassifier
+    from plant_ai import PlantAIService
+    from rate_limit import TokenBucket
+    from result_cache import AnalysisCache
+
+    app_dir = os.path.dirname(os.path.realpath(__file__))
+    ai_service = PlantAIService(max_connections=ai_workers, base_url=base_url, encode_settings=EncodeSettings.from_env(),
+                                rate_limiter=TokenBucket.per_minute(rpm) if rpm else None)
+    classifier = LocalPlantClassifier(os.getenv("PLANT_MODEL_PATH", os.path.join(app_dir, "models", "plant_classifier.onnx")),
+                                      species_threshold=float(os.getenv("PLANT_MODEL_THRESHOLD", 0.8)))
+
+    return PlantAnalyser(ai_service, AnalysisCache(lazy=True), classifier)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="JSON API over the plant database and the identify/health analyses.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--ai-workers", type=int, default=int(os.getenv("AI_MAX_WORKERS", 4)), help="analyses running at once")
+    parser.add_argument("--max-pending", type=int, default=32, help="analyses queued or running before new ones get a 503")
+    parser.add_argument("--max-upload-mb", type=float, default=MAX_UPLOAD / 1024 / 1024)
+    parser.add_argument("--rpm", type=float, default=None, help="cap on OpenAI requests per minute")
+    parser.add_argument("--base-url", default=os.getenv("OPENAI_BASE_URL"), help="OpenAI compatible endpoint")
+    args = parser.parse_args()
+
+    from database import DB, warm_up_in_background
+
+    warm_up_in_background()
+    analyser = default_analyser(args.ai_workers, args.base_url, args.rpm)
+    server = PlantServer(DB(), analyser, ai_workers=args.ai_workers, max_pending=args.max_pending, max_upload=int(args.max_upload_mb * 1024 * 1024))
+
+    async def close_ai_service(app):
+        analyser.ai_service.close()
+        analyser.cache.flush()
+
+    app = create_app(server)
+    app.on_cleanup.append(close_ai_service)
+    web.run_app(app, host=args.host, port=args.port)
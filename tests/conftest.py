@@ -0,0 +1,29 @@
+# shared test setup: the repo root importable and a throwaway sqlite file instead of ./database.db
+# run from the repo root: python -m pytest tests
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, ROOT)
+
+# read by database.py when it's imported, which is after this file
+TEST_DB_DIR = tempfile.mkdtemp(prefix="bestbuds-test-")
+os.environ["BESTBUDS_DATABASE_URL"] = f"sqlite:///{os.path.join(TEST_DB_DIR, 'test.db')}"
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(TEST_DB_DIR, ignore_errors=True)
+
+@pytest.fixture(scope="module", autouse=True)
+def empty_database():
+    # every test module starts from empty tables
+    from database import Base, PlantChange, prepare_database, session_scope
+
+    prepare_database()
+    with session_scope(write=True) as session:
+        for table in reversed(Base.metadata.sorted_tables):
+            session.execute(table.delete())
+        session.execute(PlantChange.__table__.delete())     # rows the plant delete trigger just added
@@ -0,0 +1,100 @@
+# CareList patched by plant change events against one rebuilt from the database, and the day roll over
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from care_list import REBUILD_ROWS, CareList, seconds_until_midnight
+from change_events import changes
+from database import DB
+
+TODAY = date(2026, 6, 15)
+DAYS = [TODAY + timedelta(days=offset) for offset in range(10)]
+
+def plant(name:str, birth_date:date, water_frequency, fertiliser_frequency=None) -> dict:
+    return {
+        "name": name,
+        "species": "Fern",
+        "birth_date": birth_date,
+        "height": 10.0,
+        "water_frequency": water_frequency,
+        "fertiliser_needed": fertiliser_frequency is not None,
+        "fertiliser_type": "Liquid" if fertiliser_frequency is not None else None,
+        "fertiliser_frequency": fertiliser_frequency,
+    }
+
+def listed(daily) -> dict[str, list[tuple]]:
+    return {care: [(item.plant_id, item.name, item.water_frequency, item.fertiliser_type, item.fertiliser_frequency) for item in items]
+            for care, items in daily.items.items()}
+
+@pytest.fixture
+def care_list():
+    # subscribed straight to the bus, events arrive synchronously after each commit
+    db = DB()
+    db.add_plants([plant(f"Plant {i}", TODAY - timedelta(days=i), i % 4 + 1, [None, 3, 7][i % 3]) for i in range(30)])
+
+    care_list = CareList(db)
+    care_list.prefetch(DAYS[0], DAYS[-1])
+    changes.subscribe("plant", care_list.on_plant_changed)
+    yield care_list
+    changes.unsubscribe("plant", care_list.on_plant_changed)
+
+def test_patched_days_match_a_rebuild(care_list):
+    db = DB()
+    ids = [row[0] for row in db.get_reminder_rows()]
+    builds = care_list.builds
+
+    db.new_plant_record(**plant("Monstera", TODAY, 2, 5))
+    db.add_plants([plant("Cactus", TODAY - timedelta(days=3), 3), plant("Ivy", TODAY + timedelta(days=4), 1, 1)])
+    db.update_plant(ids[0], water_frequency=3)                  # moves its due days
+    db.update_plant(ids[1], name="Renamed")                     # stays due, the item changes
+    db.update_plant(ids[2], fertiliser_needed=False)            # drops out of the fertiliser lists
+    db.update_plant(ids[3], birth_date=TODAY + timedelta(days=30))      # not due at all any more
+    db.delete_plant(ids[4])
+
+    assert care_list.builds == builds       # every change was patched in, nothing rebuilt
+    rebuilt = CareList(db)
+    for day in DAYS:
+        assert listed(care_list.get(day)) == listed(rebuilt.get(day)), day
+
+def test_watchers_get_the_edits(care_list):
+    db = DB()
+    seen = []
+    care_list.watch(lambda daily, edits: seen.append((daily.day, edits)))
+
+    plant_id = db.new_plant_record(**plant("Monstera", TODAY, 7)).id
+    db.delete_plant(plant_id)
+
+    inserts = [day for day, edits in seen if [(care, op) for care, op, _, _ in edits] == [("water", "insert")]]
+    deletes = [day for day, edits in seen if [(care, op) for care, op, _, _ in edits] == [("water", "delete")]]
+    assert inserts == deletes == [TODAY, TODAY + timedelta(days=7)]
+
+def test_bulk_import_drops_the_cache(care_list):
+    seen = []
+    care_list.watch(lambda daily, edits: seen.append((daily, edits)))
+
+    DB().add_plants([plant(f"Import {i}", TODAY, 7) for i in range(REBUILD_ROWS + 1)])
+    assert len(care_list) == 0
+    assert seen == [(None, None)]
+
+def test_roll_over_at_midnight():
+    db = DB()
+    care_list = CareList(db, max_days=31)
+    care_list.prefetch(TODAY - timedelta(days=2), TODAY + timedelta(days=2))
+    builds = care_list.builds
+
+    tomorrow = TODAY + timedelta(days=1)
+    daily = care_list.roll_over(tomorrow)
+    assert daily.day == tomorrow
+    assert sorted(care_list._days) == [tomorrow, tomorrow + timedelta(days=1)]
+    assert care_list.builds == builds       # tomorrow was already cached
+
+    # a long running app rolls over every night, the cache stays bounded
+    for offset in range(2, 60):
+        care_list.get(TODAY + timedelta(days=offset + 1))
+        care_list.roll_over(TODAY + timedelta(days=offset))
+    assert len(care_list) <= 31
+    assert min(care_list._days) == TODAY + timedelta(days=59)
+
+def test_seconds_until_midnight():
+    assert seconds_until_midnight(datetime(2026, 6, 15, 23, 59, 30)) == 30
+    assert seconds_until_midnight(datetime(2026, 6, 15, 0, 0)) == 24 * 60 * 60
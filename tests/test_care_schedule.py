@@ -0,0 +1,105 @@
+# the care schedule (phase buckets in the database, CareCalendar's numpy version) against the plain rule:
+# a plant is due on `day` when day >= birth_date and (day - birth_date).days % frequency == 0
+# run from the repo root: python -m pytest tests
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from care_calendar import CareCalendar
+from database import DB
+
+PLANTS = 2000
+FREQUENCIES = [0, 1, 2, 3, 5, 7, 13, 14, 30, 90]
+TODAY = date(2026, 6, 15)
+RANGES = [
+    (TODAY, TODAY),
+    (TODAY, TODAY + timedelta(days=9)),
+    (TODAY - timedelta(days=20), TODAY + timedelta(days=24)),       # longer than most frequencies
+    (date(2025, 1, 1), date(2026, 2, 5)),       # longer than all of them, plants born inside it
+    (TODAY, TODAY - timedelta(days=3)),     # reversed -> nothing
+]
+
+def random_plants(count:int, seed:int=0) -> list[dict]:
+    rng = random.Random(seed)
+    plants = []
+    for i in range(count):
+        fertiliser_needed = rng.random() < 0.5
+        plants.append({
+            "name": f"Plant {i}",
+            "species": "Fern",
+            "birth_date": date(2024, 1, 1) + timedelta(days=rng.randrange(1000)),      # some are born after the ranges start
+            "height": 10.0,
+            "water_frequency": rng.choice(FREQUENCIES),
+            "fertiliser_needed": fertiliser_needed,
+            "fertiliser_type": "Liquid" if fertiliser_needed else None,
+            "fertiliser_frequency": rng.choice(FREQUENCIES + [None]),
+        })
+    return plants
+
+def frequency_of(plant:dict, care:str) -> int:
+    if care == "water":
+        return plant["water_frequency"] or 0
+    return (plant["fertiliser_frequency"] or 0) if plant["fertiliser_needed"] else 0
+
+def brute_force(plants:dict, start:date, end:date, care:str) -> dict[date, list[int]]:
+    schedule = {}
+    for offset in range((end - start).days + 1):
+        day = start + timedelta(days=offset)
+        schedule[day] = sorted(plant_id for plant_id, plant in plants.items()
+                               if frequency_of(plant, care) > 0 and day >= plant["birth_date"] and (day - plant["birth_date"]).days % frequency_of(plant, care) == 0)
+    return schedule
+
+@pytest.fixture(scope="module")
+def plants() -> dict[int, dict]:
+    # plant id -> record, most through the bulk insert and some through the ORM path (the mapper event fills in the phases there)
+    db = DB()
+    records = random_plants(PLANTS)
+    bulk, single = records[:-100], records[-100:]
+
+    ids = db.add_plants(bulk)
+    ids += [db.new_plant_record(**record).id for record in single]
+
+    return dict(zip(ids, records))
+
+@pytest.fixture(scope="module")
+def calendar(plants) -> CareCalendar:
+    return CareCalendar.from_db(DB())
+
+@pytest.mark.parametrize("care", ["water", "fertiliser"])
+@pytest.mark.parametrize("start, end", RANGES)
+def test_care_schedule_matches_rule(plants, care, start, end):
+    schedule = DB().get_care_schedule(start, end, care)
+    assert {day: sorted(plant.id for plant in due) for day, due in schedule.items()} == brute_force(plants, start, end, care)
+
+@pytest.mark.parametrize("care", ["water", "fertiliser"])
+def test_plants_due_matches_rule(plants, care):
+    db = DB()
+    for offset in range(0, 120, 7):
+        day = TODAY + timedelta(days=offset)
+        assert sorted(plant.id for plant in db.get_plants_due(day, care)) == brute_force(plants, day, day, care)[day]
+
+@pytest.mark.parametrize("care", ["water", "fertiliser"])
+@pytest.mark.parametrize("start, end", RANGES)
+def test_calendar_matches_rule(plants, calendar, care, start, end):
+    expected = brute_force(plants, start, end, care)
+    days = sorted(expected)
+
+    due = calendar.due_matrix(start, end, care)
+    assert due.shape == (len(plants), len(days))
+    for column, day in enumerate(days):
+        assert sorted(calendar.plant_ids[due[:, column]].tolist()) == expected[day]
+
+    plant_ids, dates = calendar.due_events(start, end, care)
+    events = {day: [] for day in days}
+    for plant_id, day in zip(plant_ids.tolist(), dates.astype(object)):
+        events[day].append(plant_id)
+    assert {day: sorted(ids) for day, ids in events.items()} == expected
+
+    assert calendar.daily_counts(start, end, care).tolist() == [len(expected[day]) for day in days]
+
+@pytest.mark.parametrize("care", ["water", "fertiliser"])
+def test_calendar_due_on_matches_rule(plants, calendar, care):
+    for offset in range(0, 120, 7):
+        day = TODAY + timedelta(days=offset)
+        assert sorted(calendar.due_on(day, care).tolist()) == brute_force(plants, day, day, care)[day]
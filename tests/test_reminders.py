@@ -0,0 +1,69 @@
+# ReminderEngine's heap against plant edits, and ChangeLogFollower picking edits up from the plant_change log
+from datetime import date, datetime, time as day_time
+
+from database import DB
+from reminders import ChangeLogFollower, ReminderEngine
+
+NOW = datetime(2026, 6, 15, 8, 0)       # an hour before the reminders are due
+BIRTH_DATE = date(2026, 6, 1)           # weekly -> due today, every 5 days -> due tomorrow
+
+def at(day:date) -> float:
+    return datetime.combine(day, day_time(9, 0)).timestamp()
+
+def engine() -> ReminderEngine:
+    return ReminderEngine(lambda reminders: None, remind_at=day_time(9, 0), clock=NOW.timestamp)
+
+def fired(reminders) -> list[tuple]:
+    return [(reminder.plant_id, reminder.care, reminder.due_at) for reminder in reminders]
+
+def test_removed_plant_never_fires():
+    reminders = engine()
+    reminders.set_plant(1, "Fern", BIRTH_DATE, 7, 14)
+    assert reminders.next_due() == at(date(2026, 6, 15))
+
+    reminders.remove_plant(1)
+    assert len(reminders) == 0
+    assert reminders.next_due() is None
+    assert reminders.pop_due(at(date(2027, 1, 1))) == []
+
+def test_edit_moving_the_due_day_reschedules_it():
+    reminders = engine()
+    reminders.set_plant(1, "Fern", BIRTH_DATE, 7, None)
+    reminders.set_plant(1, "Fern", BIRTH_DATE, 5, None)
+
+    # the weekly entry is still in the heap, it mustn't fire
+    assert reminders.next_due() == at(date(2026, 6, 16))
+    assert reminders.pop_due(at(date(2026, 6, 15))) == []
+    assert fired(reminders.pop_due(at(date(2026, 6, 16)))) == [(1, "water", datetime(2026, 6, 16, 9, 0))]
+
+def test_fired_reminder_comes_round_again():
+    reminders = engine()
+    reminders.set_plant(1, "Fern", BIRTH_DATE, 7, 14)
+
+    assert fired(reminders.pop_due(at(date(2026, 6, 15)))) == [(1, "fertiliser", datetime(2026, 6, 15, 9, 0)), (1, "water", datetime(2026, 6, 15, 9, 0))]
+    assert reminders.next_due() == at(date(2026, 6, 22))
+
+    # a device that slept through several waterings gets one reminder, then the next one after now
+    assert fired(reminders.pop_due(at(date(2026, 7, 7)))) == [(1, "water", datetime(2026, 6, 22, 9, 0)), (1, "fertiliser", datetime(2026, 6, 29, 9, 0))]
+    assert reminders.next_due() == at(date(2026, 7, 13))
+
+def test_follower_applies_edits_from_the_change_log():
+    db = DB()
+    reminders = engine()
+    follower = ChangeLogFollower(db, reminders)
+    follower.poll()
+    before = len(reminders)
+
+    plant = db.new_plant_record(name="Fern", species="Fern", birth_date=BIRTH_DATE, water_frequency=7, fertiliser_needed=False)
+    assert follower.poll() == 1
+    assert len(reminders) == before + 1
+
+    db.update_plant(plant.id, water_frequency=5)
+    assert follower.poll() == 1
+    assert reminders.pop_due(at(date(2026, 6, 15))) == []
+    assert fired(reminders.pop_due(at(date(2026, 6, 16)))) == [(plant.id, "water", datetime(2026, 6, 16, 9, 0))]
+
+    db.delete_plant(plant.id)
+    assert follower.poll() == 1
+    assert len(reminders) == before
+    assert follower.poll() == 0
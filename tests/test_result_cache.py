@@ -0,0 +1,75 @@
+# AnalysisCache request coalescing: threads asking about the same frame share one compute
+import threading
+
+import numpy as np
+
+from metrics import metrics
+from result_cache import AnalysisCache
+
+def frame(seed:int=0):
+    return np.random.default_rng(seed).integers(0, 255, (64, 64, 3), dtype=np.uint8)
+
+def run_coalesced(cache:AnalysisCache, seed:int, compute_result=None, compute_error:Exception=None) -> tuple[dict, dict]:
+    # owner starts compute, a second thread coalesces onto it, then compute finishes -> what each thread got
+    # (each test uses its own `seed` frame, answers stored by an earlier test would be cache hits)
+    started, release = threading.Event(), threading.Event()
+
+    def compute():
+        started.set()
+        release.wait(5)
+        if compute_error is not None:
+            raise compute_error
+        return compute_result
+
+    def ask(outcome:dict, function):
+        try:
+            outcome["result"] = cache.get_or_compute(frame(seed), "identify", function)
+        except Exception as e:
+            outcome["error"] = e
+
+    owner, waiter = {}, {}
+    owner_thread = threading.Thread(target=ask, args=(owner, compute), daemon=True)
+    owner_thread.start()
+    assert started.wait(5)
+
+    coalesced = metrics.counters.get("cache.coalesced", 0)
+    waiter_thread = threading.Thread(target=ask, args=(waiter, lambda: "second compute"), daemon=True)
+    waiter_thread.start()
+    while metrics.counters.get("cache.coalesced", 0) == coalesced and waiter_thread.is_alive():
+        threading.Event().wait(0.005)
+
+    release.set()
+    owner_thread.join(5)
+    waiter_thread.join(5)
+    assert not owner_thread.is_alive() and not waiter_thread.is_alive(), "a thread is stuck on the in-flight future"
+    return owner, waiter
+
+def test_waiter_gets_the_owners_answer():
+    owner, waiter = run_coalesced(AnalysisCache(), 1, compute_result="Monstera")
+    assert owner == {"result": "Monstera"} and waiter == {"result": "Monstera"}
+
+def test_failed_store_still_answers_everyone():
+    cache = AnalysisCache()
+
+    def store(*args, **kwargs):
+        raise RuntimeError("database is locked")
+    cache.store = store
+
+    owner, waiter = run_coalesced(cache, 2, compute_result="Monstera")
+    assert owner == {"result": "Monstera"} and waiter == {"result": "Monstera"}
+    assert not cache._in_flight
+
+def test_failed_compute_reaches_the_waiter():
+    owner, waiter = run_coalesced(AnalysisCache(), 3, compute_error=TimeoutError("api timed out"))
+    assert isinstance(owner["error"], TimeoutError) and isinstance(waiter["error"], TimeoutError)
+
+def test_expired_entry_is_not_served_after_a_miss():
+    # the entry expires between lookup and the re-check under the lock
+    cache = AnalysisCache()
+    cache.store(frame(4), "health", "Healthy")
+    for entry in cache._entries.values():
+        entry.created_at -= 2 * cache.ttl["health"]
+    cache.lookup = lambda *args: (False, None)
+
+    assert cache.get_or_compute(frame(4), "health", lambda: "Overwatered") == "Overwatered"
+    assert [entry.result for entry in cache._entries.values() if entry.kind == "health"] == ["Overwatered"]
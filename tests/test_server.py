@@ -0,0 +1,33 @@
+# the json_errors middleware: every error response is json, unexpected exceptions included
+import asyncio
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from database import DB
+from metrics import metrics
+from server import PlantServer, create_app
+
+def get(server:PlantServer, path:str) -> tuple[int, str, dict]:
+    # (status, content type, body) of one request against the app
+    async def request():
+        async with TestClient(TestServer(create_app(server))) as client:
+            response = await client.get(path)
+            return response.status, response.content_type, await response.json()
+
+    return asyncio.run(request())
+
+def test_unexpected_error_is_a_json_500(capsys):
+    db = DB()
+    def get_plant_page(*args):
+        raise RuntimeError("database disk image is malformed")
+    db.get_plant_page = get_plant_page
+    errors = metrics.counters.get("server.errors", 0)
+
+    assert get(PlantServer(db, analyser=None), "/plants") == (500, "application/json", {"error": "internal error"})
+    assert metrics.counters["server.errors"] == errors + 1
+    assert "database disk image is malformed" in capsys.readouterr().out       # logged, not sent to the client
+
+def test_http_errors_keep_their_status():
+    server = PlantServer(DB(), analyser=None)
+    assert get(server, "/plants?limit=ten") == (400, "application/json", {"error": "limit must be a whole number"})
+    assert get(server, "/plants/999999") == (404, "application/json", {"error": "no such plant"})
@@ -0,0 +1,37 @@
+# TextureCache when a photo can't be decoded: every card waiting on it still hears back
+import os
+
+from kivy.clock import Clock
+
+from metrics import metrics
+from thumbnails import TextureCache
+
+def wait_for(results:list, count:int) -> None:
+    # the decode runs on the cache's worker, its answer is delivered by the kivy clock
+    for _ in range(500):
+        Clock.tick()
+        if len(results) >= count:
+            return
+        Clock.usleep(2000)
+    raise AssertionError(f"only {len(results)} of {count} callbacks ran")
+
+def test_failed_decode_answers_every_waiter(tmp_path):
+    broken = tmp_path / "plant_1.png"
+    broken.write_bytes(b"not a png")
+    cache = TextureCache()
+    failed = metrics.counters.get("thumbnails.failed", 0)
+
+    results = []
+    for _ in range(3):
+        cache.request(str(broken), 200, results.append)
+    wait_for(results, 3)
+
+    assert results == [None, None, None]
+    assert not cache._waiting and len(cache._textures) == 0
+    assert metrics.counters["thumbnails.failed"] == failed + 1      # one shared decode
+
+    # not remembered as failed, a later request decodes again
+    cache.request(os.path.join(tmp_path, "plant_2.png"), 200, results.append)
+    wait_for(results, 4)
+    assert results[3] is None
+    cache.shutdown()
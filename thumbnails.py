@@ -0,0 +1,129 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import os
+
+from image_store import write_image_atomic
+from metrics import metrics
+
+THUMBNAIL_SIZES = (200, 400)    # plant card, and the same card on a HiDPI screen
+THUMBNAIL_QUALITY = 85
+
+def thumbnail_path(image_path:str, size:int) -> str:
+    # images/plants/0000/plant_12.png -> images/plants/0000/thumbs/plant_12_200.jpg
+    directory, filename = os.path.split(image_path)
+    name = os.path.splitext(filename)[0]
+    return os.path.join(directory, "thumbs", f"{name}_{size}.jpg")
+
+def make_thumbnails(image, image_path:str, sizes=THUMBNAIL_SIZES) -> None:
+    # write every card-sized variant of a freshly saved plant photo
+    import cv2
+
+    for size in sizes:
+        thumbnail = cv2.resize(image, (size, size), interpolation=cv2.INTER_AREA)
+        write_image_atomic(thumbnail_path(image_path, size), thumbnail, [cv2.IMWRITE_JPEG_QUALITY, THUMBNAIL_QUALITY], fsync=False)
+
+def load_thumbnail(image_path:str, size:int):
+    # decoded BGR thumbnail, generated from the full photo the first time it's missing
+    import cv2
+
+    path = thumbnail_path(image_path, size)
+    thumbnail = cv2.imread(path)
+    if thumbnail is not None:
+        return thumbnail
+
+    image = cv2.imread(image_path)
+    if image is None:
+        return None
+
+    make_thumbnails(image, image_path)
+    return cv2.resize(image, (size, size), interpolation=cv2.INTER_AREA)
+
+class TextureCache():
+    """ Decoded plant card textures, kept in an LRU with a byte budget.
+
+    Thumbnails are read and decoded on a worker thread, only the GL upload happens on
+    the UI thread. Several cards asking for the same image while it's loading share the
+    one decode, and all of them hear back even when it fails.
+    """
+
+    def __init__(self, max_bytes:int=32 * 1024 * 1024, workers:int=2):
+        self.max_bytes = max_bytes
+        self.bytes_used = 0
+
+        self._textures = OrderedDict()      # (path, size) -> (texture, bytes), least recently used first
+        self._waiting = {}                  # (path, size) -> callbacks waiting on a decode
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="thumbnail")
+
+    def request(self, image_path:str, size:int, callback) -> None:
+        # callback(texture) on the UI thread, straight away if it's already cached, callback(None) if the photo can't be read
+        key = (image_path, size)
+
+        cached = self._textures.get(key)
+        if cached is not None:
+            self._textures.move_to_end(key)
+            metrics.incr("thumbnails.hit")
+            callback(cached[0])
+            return
+
+        metrics.incr("thumbnails.miss")
+        if key in self._waiting:
+            self._waiting[key].append(callback)
+            return
+
+        self._waiting[key] = [callback]
+        future = self._executor.submit(load_thumbnail, image_path, size)
+        future.add_done_callback(lambda done: self._decoded(key, done))
+
+    def _decoded(self, key:tuple, future) -> None:
+        # worker thread -> hop back to the UI thread for the texture upload
+        from kivy.clock import Clock
+
+        if future.cancelled():
+            return      # shut down, nobody is waiting any more
+
+        error = future.exception()
+        if error is not None:
+            print(f"Couldn't load thumbnail for {key[0]}: {error}")
+
+        frame = future.result() if error is None else None
+        Clock.schedule_once(lambda dt: self._upload(key, frame), 0)
+
+    def _upload(self, key:tuple, frame) -> None:
+        callbacks = self._waiting.pop(key, [])
+        if frame is None:
+            # missing or unreadable, not cached so the next request tries again
+            metrics.incr("thumbnails.failed")
+            for callback in callbacks:
+                callback(None)
+            return
+
+        from kivy.graphics.texture import Texture
+
+        texture = Texture.create(size=(frame.shape[1], frame.shape[0]), colorfmt="bgr")
+        texture.flip_vertical()
+        texture.blit_buffer(frame.reshape(-1), colorfmt="bgr", bufferfmt="ubyte")
+
+        self._store(key, texture, frame.nbytes)
+
+        for callback in callbacks:
+            callback(texture)
+
+    def _store(self, key:tuple, texture, size:int) -> None:
+        self._textures[key] = (texture, size)
+        self.bytes_used += size
+
+        while self.bytes_used > self.max_bytes and len(self._textures) > 1:
+            _, (_, evicted_size) = self._textures.popitem(last=False)
+            self.bytes_used -= evicted_size
+            metrics.incr("thumbnails.evicted")
+
+        metrics.set("thumbnails.bytes", self.bytes_used)
+
+    def invalidate(self, image_path:str) -> None:
+        # drop every cached size of one photo, e.g. after it's been retaken
+        for key in [key for key in self._textures if key[0] == image_path]:
+            _, size = self._textures.pop(key)
+            self.bytes_used -= size
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)